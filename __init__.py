@@ -4,10 +4,18 @@
 A simple agent to help users think through software architecture decisions.
 """
 
-# Import the agents submodule to ensure it's available
-from . import agents
+import importlib
 
-# Import root_agent from agent module
-from .agent import root_agent
 
-__all__ = ['root_agent', 'agents']
\ No newline at end of file
+def __getattr__(name):
+    # root_agent (and the google.adk import it needs) is built on first access,
+    # which is when `adk web` looks it up.
+    if name == 'root_agent':
+        from .agent import root_agent
+        return root_agent
+    if name == 'agents':
+        return importlib.import_module('.agents', __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['root_agent', 'agents']
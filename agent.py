@@ -1,34 +1,44 @@
 # Architecture Assistant - User-Centric Multi-Agent System
 
-from dotenv import load_dotenv
 from google.adk import Agent
 
+from .agents.registry import load_environment
+
+# Load environment variables before any agent reads its configuration
+load_environment()
+
 # Import all agents from the modular architecture
 # When ADK loads this module, it sets up the import path correctly
 from .agents import (
       requirements_discovery_agent,
       project_reality_check_agent,
       education_loop_agent,        architecture_loop_agent,
-      implementation_roadmap_agent
+      implementation_roadmap_agent, deliverable_package_agent
     )
-from .agents.orchestrator import USER_CENTRIC_ORCHESTRATOR_PROMPT
-
-# Load environment variables
-load_dotenv()
+from .agents.orchestrator import USER_CENTRIC_ORCHESTRATOR_PROMPT, ROOT_AGENT_NAME
+from .agents.callbacks import (AFTER_MODEL_CALLBACKS, AFTER_TOOL_CALLBACKS,
+                               BEFORE_MODEL_CALLBACKS, BEFORE_TOOL_CALLBACKS)
+from .agents.models import model_for
+from .agents.routing import route_locally, track_model_routing
 
 # Create root agent - CRITICAL: NO TOOLS!
 root_agent = Agent(
-    model="gemini-2.0-flash",
-    name="architecture_assistant",
+    model=model_for(ROOT_AGENT_NAME),
+    name=ROOT_AGENT_NAME,
     description="Helps non-technical users turn ideas into actionable technical plans",
     instruction=USER_CENTRIC_ORCHESTRATOR_PROMPT,
+    before_model_callback=[route_locally, *BEFORE_MODEL_CALLBACKS],
+    after_model_callback=[*AFTER_MODEL_CALLBACKS, track_model_routing],
+    before_tool_callback=BEFORE_TOOL_CALLBACKS,  # transfer_to_agent
+    after_tool_callback=AFTER_TOOL_CALLBACKS,
     sub_agents=[
         # Note: search_agent removed - now available via AgentTool to sub-agents
         requirements_discovery_agent,
         project_reality_check_agent,
         education_loop_agent,
         architecture_loop_agent,
-        implementation_roadmap_agent
+        implementation_roadmap_agent,
+        deliverable_package_agent
     ]
 )
 
@@ -1,11 +1,21 @@
 # Copyright 2025
 # Architecture Assistant - Agent Module Exports
+#
+# Agents are resolved lazily through the registry: `from .agents import
+# education_loop_agent` only imports (and builds) the education module.
+
+from .registry import AGENT_REGISTRY, get_agent
+
+
+def __getattr__(name):
+    if name in AGENT_REGISTRY:
+        return get_agent(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted([*globals(), *AGENT_REGISTRY])
 
-from .search import search_agent, search_agent_tool
-from .discovery import requirements_discovery_agent, project_reality_check_agent
-from .education import education_loop_agent
-from .planning import implementation_roadmap_agent
-from .technical import architecture_loop_agent
 
 __all__ = [
     'search_agent',
@@ -14,5 +24,6 @@ __all__ = [
     'project_reality_check_agent',
     'education_loop_agent',
     'implementation_roadmap_agent',
-    'architecture_loop_agent'
-]
\ No newline at end of file
+    'architecture_loop_agent',
+    'deliverable_package_agent'
+]
@@ -0,0 +1,152 @@
+# Architecture Assistant - Shared Model Callbacks
+#
+# Callbacks applied to every LLM agent. Agent modules prepend their own
+# agent-specific callbacks; the shared ones run last so they see the final
+# request that will be sent to the model. Shared after_model callbacks run
+# first so they see the raw model response.
+
+import time
+
+from google.adk.models import LlmResponse
+from google.genai import types
+
+from ..services.compaction import compact_history_callback, content_text, is_user_message
+from ..services.handoff import HandoffDetector
+from ..services.prompt_cache import prompt_cache_callback
+from ..services.telemetry import (telemetry_after_model, telemetry_after_tool,
+                                  telemetry_before_model, telemetry_before_tool)
+from .models import (record_model_usage, select_model_tier, start_model_timer,
+                     wait_for_rate_limit)
+from .orchestrator import ROOT_AGENT_NAME
+
+BEFORE_MODEL_CALLBACKS = [
+    select_model_tier,  # Picks the model; prompt caching depends on it
+    compact_history_callback,
+    prompt_cache_callback,  # Must be the last to modify the request
+    wait_for_rate_limit,  # Queues for quota with the agent's priority
+    start_model_timer,  # Latency budgets time the model call only
+    telemetry_before_model,  # Times the model call only
+]
+
+AFTER_MODEL_CALLBACKS = [telemetry_after_model, record_model_usage]  # Observe only; return None
+
+BEFORE_TOOL_CALLBACKS = [telemetry_before_tool]
+AFTER_TOOL_CALLBACKS = [telemetry_after_tool]
+
+
+# ===== AGENT TRANSFERS WITHOUT A MODEL ROUND TRIP =====
+
+def transfer_response(text, agent_name):
+    """Model response that says text and transfers to agent_name.
+
+    ADK executes the transfer_to_agent call locally, exactly as if the model
+    had emitted it, so the target agent takes over in the same invocation.
+    """
+    parts = [types.Part(text=text)] if text else []
+    parts.append(types.Part(function_call=types.FunctionCall(
+        name="transfer_to_agent", args={"agent_name": agent_name})))
+    return LlmResponse(content=types.Content(role="model", parts=parts))
+
+
+def record_transition(state, source, target, trigger, **details):
+    """Append an agent transition to the session's handoff_log."""
+    entry = {"from": source, "to": target, "trigger": trigger,
+             "at": time.time(), **details}
+    state["handoff_log"] = [*state.get("handoff_log", []), entry]
+
+
+def last_user_message(llm_request):
+    """Text of the newest content if it is a fresh user message, else None."""
+    if not llm_request.contents or not is_user_message(llm_request.contents[-1]):
+        return None
+    return content_text(llm_request.contents[-1])
+
+
+def unanswered_user_message(llm_request):
+    """Newest genuine user message this agent hasn't replied to yet, else None.
+
+    Unlike last_user_message this looks past other agents' relabeled replies,
+    e.g. the orchestrator's transfer to this agent.
+    """
+    for content in reversed(llm_request.contents or []):
+        if content.role == "model":
+            return None
+        if is_user_message(content):
+            return content_text(content)
+    return None
+
+
+def capture_output(state_key, marker):
+    """after_model callback keeping the latest reply containing marker in state.
+
+    Unlike output_key, later replies without the marker (handoff messages,
+    follow-up answers) don't overwrite the captured deliverable.
+    """
+    def capture(callback_context, llm_response):
+        if llm_response.partial or not llm_response.content:
+            return None
+        text = content_text(llm_response.content)
+        if marker in text:
+            callback_context.state[state_key] = text
+        return None
+
+    return capture
+
+
+def handoff_callbacks(prompt, marker):
+    """(before_model, after_model) callbacks returning control to root_agent.
+
+    - before_model: once the agent has delivered (written a reply containing
+      marker, its deliverable's heading), a user completion phrase is
+      answered with the agent's handoff message locally (no model call).
+      Before that, "yes" or "got it" answers the agent's questions.
+    - after_model: a reply ending in the handoff message gets a transfer
+      call appended so the orchestrator takes over immediately.
+    """
+    detector = HandoffDetector.from_prompt(prompt)
+
+    def complete_on_user_signal(callback_context, llm_request):
+        agent_name = callback_context.agent_name
+        if agent_name not in callback_context.state.get("delivered_agents", []):
+            return None
+        match = detector.match_completion(last_user_message(llm_request))
+        if match is None:
+            return None
+        record_transition(callback_context.state, agent_name, ROOT_AGENT_NAME,
+                          "user_completion", phrase=match[0], score=round(match[1], 3))
+        return transfer_response(detector.handoff_message, ROOT_AGENT_NAME)
+
+    def transfer_on_handoff(callback_context, llm_response):
+        if llm_response.partial or not llm_response.content:
+            return None
+        parts = llm_response.content.parts or []
+        if any(p.function_call for p in parts):
+            return None
+        text = "\n".join(p.text for p in parts if p.text)
+        if not text:
+            return None
+        agent_name = callback_context.agent_name
+        delivered = callback_context.state.get("delivered_agents", [])
+        if marker in text and agent_name not in delivered:
+            callback_context.state["delivered_agents"] = [*delivered, agent_name]
+        if not detector.is_handoff(text):
+            return None
+        record_transition(callback_context.state, agent_name, ROOT_AGENT_NAME,
+                          "agent_handoff")
+        return transfer_response(text, ROOT_AGENT_NAME)
+
+    return complete_on_user_signal, transfer_on_handoff
+
+
+__all__ = [
+    'AFTER_MODEL_CALLBACKS',
+    'AFTER_TOOL_CALLBACKS',
+    'BEFORE_MODEL_CALLBACKS',
+    'BEFORE_TOOL_CALLBACKS',
+    'capture_output',
+    'handoff_callbacks',
+    'last_user_message',
+    'record_transition',
+    'transfer_response',
+    'unanswered_user_message',
+]
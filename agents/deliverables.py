@@ -0,0 +1,295 @@
+# Architecture Assistant - Deliverable Package Agents
+#
+# Builds the full architecture package (see docs/example_deliverable_package.md)
+# from what the conversation has already produced. Each section has its own
+# writer agent; independent sections run concurrently, so the package takes
+# about as long as the slowest section rather than the sum of all of them.
+# - Writers read structured session state (requirements_summary,
+#   reality_check, architecture_proposal, ...), not the whole conversation
+# - Every section has a timeout; failed or slow sections become placeholders
+#   and the rest of the package is still delivered
+# - An existing roadmap is reused as-is instead of being written again
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+from google.adk import Agent
+from google.adk.agents import BaseAgent
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from ..services.compaction import content_text
+from .callbacks import AFTER_MODEL_CALLBACKS, BEFORE_MODEL_CALLBACKS
+from .models import model_for
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SECTION_TIMEOUT_SECONDS = 90.0
+
+# Session state written by earlier agents -> heading shown to section writers
+MATERIALS = {
+    "requirements_summary": "Requirements (from discovery)",
+    "reality_check": "Feasibility assessment",
+    "tradeoff_decision": "Technology decision explained to the founder",
+    "architecture_proposal": "Proposed architecture",
+    "implementation_roadmap": "Implementation roadmap",
+}
+
+SECTION_WRITER_PROMPT = """You write one section of an architecture package for a non-technical founder.
+
+## RULES
+- Use ONLY the project materials provided; never invent requirements, numbers or decisions
+- Plain English: explain any technical term the first time you use it
+- Be specific to this project (its users, budget, timeline and team)
+- Start directly with the section content; do not repeat the section title
+- Use ### for sub-headings and keep it skimmable
+
+## YOUR SECTION
+{guidance}
+"""
+
+
+@dataclass(frozen=True)
+class DeliverableSection:
+    key: str
+    title: str
+    guidance: str
+    inputs: tuple                # MATERIALS keys given to the writer
+    requires: tuple = ()         # Skip the section unless these exist
+    reuse: str = None            # State key used verbatim when present
+
+
+SECTIONS = [
+    DeliverableSection(
+        "executive_summary", "Executive Summary",
+        "Vision (2-3 sentences), key business outcomes, investment overview "
+        "(MVP cost, monthly running costs, time to first revenue), major "
+        "milestones and the top 3 risks with one-line mitigations.",
+        inputs=tuple(MATERIALS)),
+    DeliverableSection(
+        "architecture_blueprint", "Architecture Blueprint",
+        "A system overview in plain English (what the founder's users see, "
+        "what happens behind the scenes) and each technology choice with what "
+        "it does, why it fits and what it costs.",
+        inputs=("requirements_summary", "architecture_proposal"),
+        requires=("architecture_proposal",)),
+    DeliverableSection(
+        "implementation_roadmap", "Implementation Roadmap",
+        "Phases from validation to scale, each with goal, duration, budget, "
+        "key activities, success metrics and a go/no-go decision point.",
+        inputs=("requirements_summary", "reality_check", "architecture_proposal"),
+        reuse="implementation_roadmap"),
+    DeliverableSection(
+        "technology_decisions", "Technology Decision Record",
+        "The 2-3 most important technology decisions: the options considered, "
+        "the choice, why, and what would make us revisit it.",
+        inputs=("requirements_summary", "tradeoff_decision", "architecture_proposal"),
+        requires=("architecture_proposal",)),
+    DeliverableSection(
+        "risk_assessment", "Risk Assessment & Mitigation Plan",
+        "High and medium risks (business, technical, legal), each with its "
+        "impact, early warning signs and a mitigation plan.",
+        inputs=("requirements_summary", "reality_check", "architecture_proposal")),
+    DeliverableSection(
+        "learning_plan", "Team Learning Plan",
+        "What the founder should learn (and why), and what the developers need "
+        "to get up to speed on, with a realistic time estimate for each.",
+        inputs=("requirements_summary", "architecture_proposal"),
+        requires=("architecture_proposal",)),
+    DeliverableSection(
+        "week_one_checklist", "Getting Started: Week 1 Checklist",
+        "Checklists (- [ ] items) for business setup, technical setup, team "
+        "building, market research and first meetings.",
+        inputs=("requirements_summary", "reality_check", "implementation_roadmap")),
+    DeliverableSection(
+        "glossary", "Glossary & Resources",
+        "Every technical term the founder will hear for this project, each "
+        "explained in one sentence, then a short list of helpful resources.",
+        inputs=("architecture_proposal", "implementation_roadmap"),
+        requires=("architecture_proposal",)),
+]
+
+
+def project_materials(state, keys):
+    """Markdown block with the state entries the section writer needs."""
+    blocks = [f"## {MATERIALS[key]}\n{state[key]}" for key in keys if state.get(key)]
+    return "# Project materials\n\n" + "\n\n".join(blocks)
+
+
+def _materials_callback(section):
+    def add_project_materials(callback_context, llm_request):
+        materials = project_materials(callback_context.state, section.inputs)
+        llm_request.contents.insert(0, types.Content(
+            role="user", parts=[types.Part(text=materials)]))
+        return None
+
+    return add_project_materials
+
+
+def _section_agent(section):
+    return Agent(
+        model=model_for(f"{section.key}_writer"),
+        name=f"{section.key}_writer",
+        description=f"Writes the {section.title} section of the architecture package",
+        instruction=SECTION_WRITER_PROMPT.format(guidance=section.guidance),
+        include_contents="none",  # Works from project materials only
+        before_model_callback=[_materials_callback(section), *BEFORE_MODEL_CALLBACKS],
+        after_model_callback=AFTER_MODEL_CALLBACKS,
+        disallow_transfer_to_parent=True,
+        disallow_transfer_to_peers=True,
+    )
+
+
+def assemble_package(sections, results):
+    """Numbered markdown package; missing sections get a placeholder."""
+    parts = ["# Architecture Package"]
+    incomplete = []
+    for number, section in enumerate(sections, 1):
+        result = results[section.key]
+        if result["status"] in ("ok", "reused"):
+            body = result["text"]
+        else:
+            incomplete.append(section.title)
+            body = f"_{result['detail']}_"
+        parts.append(f"## {number}. {section.title}\n\n{body}")
+    if incomplete:
+        parts.append("> Not included this time: " + ", ".join(incomplete)
+                     + ". Ask me to build the package again to fill them in.")
+    return "\n\n".join(parts)
+
+
+async def _merge(runs):
+    """Interleave several event generators, each driven by its own task.
+
+    Like ParallelAgent, a run waits until its event has been consumed
+    (and appended to the session) before producing the next one.
+    """
+    queue = asyncio.Queue()
+    done = object()
+
+    async def drive(run):
+        try:
+            async for event in run:
+                consumed = asyncio.Event()
+                await queue.put((event, consumed))
+                await consumed.wait()
+        finally:
+            await run.aclose()
+            await queue.put((done, None))
+
+    tasks = [asyncio.create_task(drive(run)) for run in runs]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            event, consumed = await queue.get()
+            if event is done:
+                remaining -= 1
+                continue
+            yield event
+            consumed.set()
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+class DeliverablePackageAgent(BaseAgent):
+    """Writes every package section concurrently, then assembles the package.
+
+    Sections run in parallel (at most max_concurrency at once; 0 = all),
+    each bounded by section_timeout_s. The assembled package is the final
+    event's text and is stored in state["deliverable_package"], with
+    per-section outcomes in state["deliverable_status"].
+    """
+
+    sections: list
+    section_timeout_s: float = DEFAULT_SECTION_TIMEOUT_SECONDS
+    max_concurrency: int = 0
+
+    async def _run_async_impl(self, ctx):
+        state = ctx.session.state
+        if not state.get("requirements_summary"):
+            yield self._reply(ctx, "Before I can put together your architecture package, "
+                                   "let's discover your requirements together. What are "
+                                   "you looking to build?")
+            return
+
+        started = time.perf_counter()
+        limit = self.max_concurrency or len(self.sections)
+        semaphore = asyncio.Semaphore(limit)
+        results, runs = {}, []
+        for section, writer in zip(self.sections, self.sub_agents):
+            missing = [MATERIALS[key].lower() for key in section.requires if not state.get(key)]
+            if section.reuse and state.get(section.reuse):
+                results[section.key] = {"status": "reused", "text": state[section.reuse]}
+            elif missing:
+                results[section.key] = {"status": "skipped",
+                                        "detail": f"Available once we have the {', '.join(missing)}."}
+            else:
+                runs.append(self._run_section(ctx, section, writer, semaphore, results))
+
+        async for event in _merge(runs):
+            yield event
+
+        status = {key: {k: v for k, v in result.items() if k != "text"}
+                  for key, result in results.items()}
+        package = assemble_package(self.sections, results)
+        logger.info("Deliverable package built in %.2fs: %s", time.perf_counter() - started,
+                    {key: s["status"] for key, s in status.items()})
+        yield self._reply(ctx, package, {"deliverable_package": package,
+                                         "deliverable_status": status})
+
+    async def _run_section(self, ctx, section, writer, semaphore, results):
+        """Run one writer with a timeout; record its text or why it failed."""
+        branch = f"{ctx.branch}.{self.name}.{writer.name}" if ctx.branch \
+            else f"{self.name}.{writer.name}"
+        section_ctx = ctx.model_copy(update={"branch": branch})
+        text = ""
+        async with semaphore:
+            started = time.perf_counter()
+            deadline = asyncio.get_running_loop().time() + self.section_timeout_s
+            events = writer.run_async(section_ctx)
+            try:
+                while True:
+                    async with asyncio.timeout_at(deadline):
+                        event = await anext(events)
+                    if not event.partial and event.content and event.author == writer.name:
+                        text = content_text(event.content) or text
+                    yield event
+            except StopAsyncIteration:
+                result = ({"status": "ok", "text": text} if text else
+                          {"status": "error", "detail": "This section came back empty."})
+            except TimeoutError:
+                result = {"status": "timeout",
+                          "detail": "This section took too long and was skipped."}
+            except Exception as e:
+                logger.warning("Section %s failed: %s", section.key, e)
+                result = {"status": "error", "detail": "This section could not be written."}
+            finally:
+                await events.aclose()
+            result["seconds"] = round(time.perf_counter() - started, 3)
+            results[section.key] = result
+
+    def _reply(self, ctx, text, state_delta=None):
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta=state_delta or {}),
+        )
+
+
+deliverable_package_agent = DeliverablePackageAgent(
+    name="deliverable_package_agent",
+    description="Assembles the complete architecture package from the work done so far",
+    sections=SECTIONS,
+    sub_agents=[_section_agent(section) for section in SECTIONS],
+    section_timeout_s=float(os.getenv("DELIVERABLE_SECTION_TIMEOUT_SECONDS",
+                                      DEFAULT_SECTION_TIMEOUT_SECONDS)),
+    max_concurrency=int(os.getenv("DELIVERABLE_MAX_CONCURRENCY", "0")),
+)
+
+__all__ = ['DeliverablePackageAgent', 'SECTIONS', 'assemble_package', 'deliverable_package_agent']
@@ -3,51 +3,38 @@
 # These agents help users discover their true requirements and understand project feasibility
 
 from google.adk import Agent
-from .search import search_agent_tool
+from google.genai import types
+
+from .search import default_prefetcher, search_agent_tool, multi_search
+from .callbacks import (AFTER_MODEL_CALLBACKS, AFTER_TOOL_CALLBACKS, BEFORE_MODEL_CALLBACKS,
+                        BEFORE_TOOL_CALLBACKS, capture_output, handoff_callbacks)
+from .models import model_for
+from .prompts import BATCHED_SEARCH, BOUNDARIES, COMPLETION, HANDOFF, ONLY_JOB, SEARCH, quoted
+from .requirements import store_requirements, structured_input
+from .reuse import reuse_callbacks, reusing
+from ..services.compaction import REQUIREMENTS_MARKER, is_user_message
+from ..services.prompts import compose
 
 # ===== DISCOVERY & UNDERSTANDING AGENTS =====
 
 # Requirements Discovery Agent - Uses Socratic method to uncover real needs
-REQUIREMENTS_DISCOVERY_PROMPT = """You are a friendly business analyst who helps non-technical users discover what they really need for their project.
-
-## YOUR ONLY JOB
-Discover and document the user's business requirements through conversation. Nothing more.
-
-## CRITICAL BOUNDARIES - YOU MUST NEVER:
-- Design technical solutions or architecture
-- Recommend specific technologies or frameworks
-- Estimate costs or timelines in detail
-- Start implementation planning
-- Write any code or technical specifications
-- Give feasibility assessments
-- Make technical decisions
-
-## YOUR APPROACH
-1. **Start with the WHY**: Understand their business problem before any technical discussion
-2. **Use Socratic questioning**: Help them discover requirements they didn't know they had
-3. **Avoid technical jargon**: Keep everything in business terms
-4. **Find hidden needs**: Users often don't know what they don't know
-
-## QUESTION PROGRESSIONS TO EXPLORE
-- Business Model → Users → Problems → Current Solutions → Pain Points
-- User Types → User Journeys → Touch Points → Critical Moments
-- Scale → Growth → Geographic Scope → Timeline → Budget Reality
-- Team → Skills → Gaps → Available Time → External Help
-- Competition → Differentiation → Unique Value → Why Now?
-
-Example questioning flow:
-"Tell me about your idea" → "Who needs this most?" → "What happens if they can't use your solution?" → "How do they solve this today?" → "What frustrates them most about current solutions?"
-
-## WHEN TO USE SEARCH
-When you need to research information about:
-- Similar businesses and their challenges
-- Market size and growth potential
-- Common failure points to avoid
-- Regulatory requirements for their industry
-
-Use the search_agent tool directly to get current information from the web.
-
-## OUTPUT FORMAT
+REQUIREMENTS_DISCOVERY_PROMPT = compose(
+    ONLY_JOB(role="You are a friendly business analyst who helps non-technical users discover what they really need for their project.",
+             job="Discover and document the user's business requirements through conversation."),
+    BOUNDARIES(never=["Design solutions, recommend technologies or make technical decisions",
+                      "Estimate costs or timelines in detail, or assess feasibility",
+                      "Plan the implementation"]),
+    """## YOUR APPROACH
+1. **Start with the WHY**: the business problem before anything technical
+2. **Ask Socratic questions**: help them find requirements they didn't know they had
+3. **Stay in business terms**: no jargon
+4. **Find hidden needs**: users don't know what they don't know
+
+Explore, one question at a time: business model → users and their journeys → today's alternatives and pain points → scale, timeline and budget → team and skills → competition and why now.
+Example: "Tell me about your idea" → "Who needs this most?" → "How do they solve this today?" → "What frustrates them most about that?"
+""",
+    SEARCH(topics="similar businesses, market size, common failure points and industry regulations"),
+    """## OUTPUT FORMAT
 ## What We Discovered Together
 ### Your Business Vision
 - Problem you're solving: [clear statement]
@@ -56,84 +43,77 @@ Use the search_agent tool directly to get current information from the web.
 
 ### Key Requirements
 - Must-haves: [critical features]
-- Nice-to-haves: [future features]  
+- Nice-to-haves: [future features]
 - Not needed: [things to avoid]
 
 ### Reality Factors
 - Timeline: [realistic assessment]
 - Budget: [range and constraints]
-- Team: [who's involved]
+- Team: [who's involved]""",
+    COMPLETION(done="The user confirms the summary captures their vision",
+               phrases=quoted(["Yes, that's exactly right", "That captures it perfectly",
+                               "You've got it", "That's my vision", "Nothing to add",
+                               "Looks good"])),
+    HANDOFF(when="the user confirms the requirements",
+            message="Excellent! I've completed discovering your requirements. Your vision is now clearly documented. Let me hand you back to the main assistant who can help with the next steps in your journey."),
+)
+
+
+
+def capture_requirements_summary(callback_context, llm_response):
+    """Keep the latest "What We Discovered Together" block in session state.
 
-## COMPLETION CRITERIA - YOU ARE DONE WHEN:
-1. User confirms the requirements capture their vision correctly
-2. User says phrases like:
-   - "Yes, that's exactly right"
-   - "That captures it perfectly"
-   - "You've got it"
-   - "That's my vision"
-   - "Nothing to add"
-   - "Looks good"
+    Also stores it as structured requirements for the downstream agents.
+    """
+    if llm_response.partial or not llm_response.content:
+        return None
+    text = "\n".join(p.text for p in llm_response.content.parts or [] if p.text)
+    if REQUIREMENTS_MARKER in text:
+        callback_context.state["requirements_summary"] = text
+        store_requirements(callback_context.state, text)
+        # Research the reality check will need while the user reviews this
+        if (prefetcher := default_prefetcher()) is not None:
+            prefetcher.schedule(callback_context.session.id, text)
+    return None
 
-## MANDATORY HANDOFF MESSAGE
-When the user confirms requirements are complete, you MUST respond with:
-"Excellent! I've completed discovering your requirements. Your vision is now clearly documented. Let me hand you back to the main assistant who can help with the next steps in your journey."
 
-CRITICAL: After this handoff message, you must STOP and wait for the orchestrator to take over. Do not continue the conversation.
-"""
+discovery_completion_check, discovery_handoff = handoff_callbacks(
+    REQUIREMENTS_DISCOVERY_PROMPT, REQUIREMENTS_MARKER)
 
 requirements_discovery_agent = Agent(
-    model="gemini-2.0-flash",
+    model=model_for("requirements_discovery_agent"),
     name="requirements_discovery_agent",
     description="Helps users discover their true requirements through conversation",
     instruction=REQUIREMENTS_DISCOVERY_PROMPT,
+    before_model_callback=[discovery_completion_check, *BEFORE_MODEL_CALLBACKS],
+    after_model_callback=[*AFTER_MODEL_CALLBACKS, capture_requirements_summary,
+                          discovery_handoff],
+    before_tool_callback=BEFORE_TOOL_CALLBACKS,
+    after_tool_callback=AFTER_TOOL_CALLBACKS,
     tools=[search_agent_tool]  # Can use search_agent via AgentTool
 )
 
 # Project Reality Check Agent - Provides honest assessment with encouragement
-PROJECT_REALITY_CHECK_PROMPT = """You are an honest but encouraging advisor who helps users understand project feasibility.
-
-## YOUR ONLY JOB
-Provide honest feasibility assessment with mitigation strategies. Nothing more.
-
-## CRITICAL BOUNDARIES - YOU MUST NEVER:
-- Start designing the solution or architecture
-- Write code or implementation details
-- Create project plans or roadmaps
-- Make technology recommendations
-- Begin implementation or development
-- Take over project management
-- Provide detailed technical specifications
-
-## YOUR APPROACH
-1. **Be honest but supportive**: Point out challenges while showing paths forward
-2. **Use real examples**: Reference similar projects that succeeded/failed
-3. **Quantify when possible**: Use numbers, timelines, costs from real cases
-4. **Always provide mitigation**: For every risk, suggest how to handle it
-
-## AREAS TO ASSESS
-- Technical Complexity vs Team Capability
-- Timeline Expectations vs Reality
-- Budget vs Typical Costs
-- Market Timing and Competition
-- Regulatory and Legal Considerations
-- Scale Ambitions vs Starting Point
-
-## WHEN TO USE SEARCH
-When you need to research:
-- Similar projects' timelines and costs
-- Common failure points for this type of project
-- Minimum viable team compositions
-- Typical pivot points
-
-Use the search_agent tool directly to get current information from the web.
-
-## OUTPUT FORMAT
+PROJECT_REALITY_CHECK_PROMPT = compose(
+    ONLY_JOB(role="You are an honest but encouraging advisor who helps users understand project feasibility.",
+             job="Provide an honest feasibility assessment with mitigation strategies."),
+    BOUNDARIES(never=["Design the solution or recommend technologies",
+                      "Create project plans or roadmaps"]),
+    """## YOUR APPROACH
+1. **Honest but supportive**: name challenges and show paths forward
+2. **Real examples**: similar projects that succeeded or failed
+3. **Quantify**: numbers, timelines and costs from real cases
+4. **Always mitigate**: every risk gets a way to handle it
+
+Assess: complexity vs team capability, timeline vs reality, budget vs typical costs, market timing and competition, regulation and legal, scale ambitions vs starting point.""",
+    SEARCH(topics="similar projects' timelines and costs, common failure points, minimum viable teams and typical pivots"),
+    BATCHED_SEARCH,
+    "If the conversation already includes background research, build on it and only search for what it does not cover.",
+    """## OUTPUT FORMAT
 ## Reality Check: [Project Name]
 
 ### 🟢 Green Lights (You're on the right track!)
-- [Positive factor with why it helps]
-- [Existing advantage you have]
-- [Good timing or market factor]
+- [Advantage, market or timing factor and why it helps]
 
 ### 🟡 Yellow Lights (Things to watch carefully)
 - **[Concern]**: [Why it matters]
@@ -141,41 +121,64 @@ Use the search_agent tool directly to get current information from the web.
 
 ### 🔴 Red Lights (Serious challenges - but not impossible!)
 - **[Major Challenge]**: [Impact if not addressed]
-  → Path Forward: [Specific steps to overcome]
-  → Alternative: [If you can't overcome, try this]
+  → Path Forward: [Specific steps]
+  → Alternative: [If you can't overcome it]
 
 ### Adjusted Recommendations
-Based on this analysis:
-1. [Specific change to approach]
-2. [Timeline adjustment with reasoning]
-3. [Resource adjustment with reasoning]
+1. [Change to approach, timeline or resources, with reasoning]
 
 ### Success Stories Like Yours
-- [Company] started with [similar constraints] and [what happened]
-
-## COMPLETION CRITERIA - YOU ARE DONE WHEN:
-1. User acknowledges understanding the assessment
-2. User says phrases like:
-   - "I understand the challenges"
-   - "That makes sense"
-   - "I see what you mean"
-   - "OK, I get it"
-   - "Thanks for the reality check"
-   - "Got it"
-
-## MANDATORY HANDOFF MESSAGE
-When the user acknowledges the reality check, you MUST respond with:
-"Great! I've completed the feasibility assessment. You now have a realistic understanding of the challenges and opportunities ahead. Let me hand you back to the main assistant who can help you plan the best path forward."
+- [Company] started with [similar constraints] and [what happened]""",
+    COMPLETION(done="The user acknowledges the assessment",
+               phrases=quoted(["I understand the challenges", "That makes sense",
+                               "I see what you mean", "OK, I get it",
+                               "Thanks for the reality check", "Got it"])),
+    HANDOFF(when="the user acknowledges the reality check",
+            message="Great! I've completed the feasibility assessment. You now have a realistic understanding of the challenges and opportunities ahead. Let me hand you back to the main assistant who can help you plan the best path forward."),
+)
 
-CRITICAL: After this handoff message, you must STOP and wait for the orchestrator to take over. Do not continue the conversation or start helping with implementation.
-"""
+async def inject_prefetched_research(callback_context, llm_request):
+    """Add research prefetched during discovery after the latest user message.
+
+    Prefetches still running get a few seconds to finish (they started long
+    before this call); whatever is left is cancelled.
+    """
+    prefetcher = default_prefetcher()
+    if prefetcher is None or reusing(callback_context):
+        return None
+    session_id = callback_context.session.id
+    await prefetcher.wait(session_id)
+    research = prefetcher.results(session_id)
+    if not research:
+        return None
+    blocks = "\n\n".join(f"### {query}\n{result}" for query, result in research)
+    note = types.Content(role="user", parts=[types.Part(text=(
+        "For context: background research gathered while the user reviewed "
+        f"their requirements:\n\n{blocks}"))])
+    contents = llm_request.contents
+    last_user = max((i for i, c in enumerate(contents) if is_user_message(c)), default=-1)
+    contents.insert(last_user + 1, note)
+    return None
+
+
+reality_check_completion_check, reality_check_handoff = handoff_callbacks(
+    PROJECT_REALITY_CHECK_PROMPT, "Reality Check")
+serve_similar_reality_check, attach_similar_reality_check = reuse_callbacks("Reality Check")
 
 project_reality_check_agent = Agent(
-    model="gemini-2.0-flash",
+    model=model_for("project_reality_check_agent"),
     name="project_reality_check_agent",
     description="Provides honest feasibility assessment with mitigation strategies",
     instruction=PROJECT_REALITY_CHECK_PROMPT,
-    tools=[search_agent_tool]  # Can use search_agent via AgentTool
+    before_model_callback=[reality_check_completion_check, structured_input(),
+                           serve_similar_reality_check, inject_prefetched_research,
+                           *BEFORE_MODEL_CALLBACKS],
+    after_model_callback=[*AFTER_MODEL_CALLBACKS, attach_similar_reality_check,
+                          capture_output("reality_check", "Reality Check"),
+                          reality_check_handoff],
+    before_tool_callback=BEFORE_TOOL_CALLBACKS,
+    after_tool_callback=AFTER_TOOL_CALLBACKS,
+    tools=[search_agent_tool, multi_search]  # Single and batched search
 )
 
 __all__ = ['requirements_discovery_agent', 'project_reality_check_agent']
\ No newline at end of file
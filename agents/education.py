@@ -2,41 +2,36 @@
 #
 # These agents help users understand technical concepts through analogies and iterative learning
 
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
 from google.adk import Agent
 from google.adk.agents import LoopAgent
+from google.adk.models import LlmResponse
 from google.adk.tools import exit_loop
+from google.genai import types
+from .callbacks import (AFTER_MODEL_CALLBACKS, AFTER_TOOL_CALLBACKS, BEFORE_MODEL_CALLBACKS,
+                        BEFORE_TOOL_CALLBACKS, capture_output, unanswered_user_message)
+from .models import model_for
+from .prompts import BOUNDARIES, COMPLETION, LOOP_EXIT, ONLY_JOB, quoted
+from ..services.explanation_cache import ExplanationCache
+from ..services.prompts import compose
 
 # ===== EDUCATION & DECISION MAKING AGENTS =====
 
 # Trade-off Educator Agent - Explains technical choices in plain language
-TRADEOFF_EDUCATOR_PROMPT = """You are a technical educator who explains complex decisions using analogies and business impact.
-
-## YOUR ONLY JOB
-Explain technical concepts and trade-offs in plain language. Nothing more.
-
-## CRITICAL BOUNDARIES - YOU MUST NEVER:
-- Make the final decision for the user
-- Start implementing the solution
-- Write code or technical specifications
-- Design the architecture
-- Create project plans
-- Move beyond education into execution
-- Continue after the user understands
-
-## YOUR APPROACH
-1. **Use analogies from everyday life**: Make technical concepts relatable
-2. **Focus on business impact**: Always connect to time, money, or user experience  
-3. **Present balanced views**: Every choice has pros and cons
-4. **Empower decision-making**: Help them choose, don't choose for them
-
-## FOR EACH TECHNICAL DECISION
-1. Identify the business question behind it
-2. Find a relatable analogy
-3. Explain 2-3 options maximum
-4. Show impact on: cost, time, complexity, scalability
-5. Make a recommendation with clear reasoning
-
-## COMMON EXPLANATIONS NEEDED
+TRADEOFF_EDUCATOR_PROMPT = compose(
+    ONLY_JOB(role="You are a technical educator who explains complex decisions using analogies and business impact.",
+             job="Explain technical concepts and trade-offs in plain language."),
+    BOUNDARIES(never=["Make the final decision for the user",
+                      "Design the architecture or create project plans",
+                      "Continue after the user understands"]),
+    """## YOUR APPROACH
+For each decision: find the business question behind it, pick an everyday analogy, explain 2-3 options at most with their impact on cost, time, complexity and scalability, then recommend with clear reasoning - but let the user choose.
+
+Analogies that work:
 - Monolith vs Microservices → Single house vs Apartment complex
 - SQL vs NoSQL → Filing cabinet vs Sticky note board
 - Cloud vs On-premise → Renting vs Buying a house
@@ -54,35 +49,113 @@ Explain technical concepts and trade-offs in plain language. Nothing more.
 - Good for: [Scenarios]
 - Trade-offs: [Time/Cost/Complexity]
 
-**Option B**: [Name]
-- What it's like: [Analogy]
-- Good for: [Scenarios]
-- Trade-offs: [Time/Cost/Complexity]
+[Same for Option B]
 
 ### For Your Situation
-Based on [user's specific context], I'd lean toward [option] because [business reasons].
+Based on [user's specific context], I'd lean toward [option] because [business reasons].""",
+    COMPLETION(done="The user understands, decides or asks to move on",
+               phrases=quoted(["I understand now", "That makes sense", "I get it", "Clear now",
+                               "Thanks for explaining"])),
+    LOOP_EXIT(when="When the user understands or you've explained the concept clearly"),
+)
+
+# ===== PRE-GENERATED EXPLANATIONS =====
+# Common trade-offs are answered from agents/explanations/; the model only
+# writes the short "For Your Situation" section for this user.
 
-## COMPLETION CRITERIA - YOU ARE DONE WHEN:
-1. User indicates they understand the concepts
-2. User says phrases like:
-   - "I understand now"
-   - "That makes sense"
-   - "I get it"
-   - "Clear now"
-   - "Thanks for explaining"
-3. User makes a decision or asks to move on
+EXPLANATIONS_DIR = Path(__file__).parent / "explanations"
+PERSONALIZATION_MAX_TOKENS = 160
 
-## EXIT BEHAVIOR
-When the user understands OR when you've explained the concept clearly, call exit_loop() to signal completion.
+PERSONALIZATION_PROMPT = """You tailor a prepared explanation of a technical trade-off to one user.
 
-CRITICAL: Do not continue explaining after the user indicates understanding. Call exit_loop() immediately.
+The user has just been shown the explanation below. Write ONLY its final section:
+
+### For Your Situation
+Based on [user's specific context], I'd lean toward [option] because [business reasons].
+
+Use 2-4 sentences grounded in what the conversation says about their budget, timeline, team and users. Don't repeat the explanation, don't add other headings, and don't make the final decision for them.
+
+## PREPARED EXPLANATION
+{explanation}
 """
 
+explanation_cache = (ExplanationCache(EXPLANATIONS_DIR)
+                     if os.getenv("EXPLANATION_CACHE_ENABLED", "true").lower() == "true" else None)
+
+_MAX_PENDING = 1024
+_answering = OrderedDict()   # (invocation_id, agent_name) -> {"explanation", "started", "shown"}
+_answered = OrderedDict()    # invocation_id -> explanation key, read by the clarification gate
+
+
+def _remember(store, key, value):
+    store[key] = value
+    while len(store) > _MAX_PENDING:
+        store.popitem(last=False)
+
+
+def serve_prepared_explanation(callback_context, llm_request):
+    """before_model_callback: turn a known trade-off question into a personalization call.
+
+    The request keeps the conversation but gets a short instruction asking
+    only for the "For Your Situation" section, with a small output limit;
+    attach_prepared_explanation puts the stored explanation in front of it.
+    """
+    if explanation_cache is None:
+        return None
+    question = unanswered_user_message(llm_request)
+    if question is None:
+        return None  # A follow-up iteration of the loop
+    explanation = explanation_cache.match(question)
+    _remember(_answering, (callback_context.invocation_id, callback_context.agent_name),
+              {"explanation": explanation, "started": time.perf_counter(), "shown": False})
+    if explanation is None:
+        return None
+    llm_request.config.system_instruction = PERSONALIZATION_PROMPT.format(
+        explanation=explanation.text)
+    llm_request.config.max_output_tokens = PERSONALIZATION_MAX_TOKENS
+    return None
+
+
+def attach_prepared_explanation(callback_context, llm_response):
+    """after_model_callback: prepend the stored explanation to the personalization.
+
+    Edits the response in place and returns None so capture_output still
+    sees the complete explanation. When streaming, the explanation goes out
+    with the first chunk, so the user reads it while the rest is generated.
+    """
+    key = (callback_context.invocation_id, callback_context.agent_name)
+    answering = _answering.get(key)
+    if answering is None:
+        return None
+    explanation = answering["explanation"]
+    if llm_response.partial:
+        if explanation is not None and not answering["shown"] and llm_response.content:
+            answering["shown"] = True
+            llm_response.content.parts.insert(0, types.Part(text=explanation.text + "\n\n"))
+        return None
+    del _answering[key]
+    seconds = time.perf_counter() - answering["started"]
+    if explanation is None:
+        explanation_cache.record_miss(seconds)
+        return None
+    explanation_cache.record_hit(seconds)
+    _remember(_answered, callback_context.invocation_id, explanation.key)
+    content = llm_response.content or types.Content(role="model", parts=[])
+    content.parts = [types.Part(text=explanation.text + "\n\n"), *(content.parts or [])]
+    llm_response.content = content
+    return None
+
+
 tradeoff_educator_agent = Agent(
-    model="gemini-2.0-flash",
+    model=model_for("tradeoff_educator_agent"),
     name="tradeoff_educator_agent",
     description="Explains technical trade-offs in business terms",
     instruction=TRADEOFF_EDUCATOR_PROMPT,
+    before_model_callback=[serve_prepared_explanation, *BEFORE_MODEL_CALLBACKS],
+    after_model_callback=[*AFTER_MODEL_CALLBACKS, attach_prepared_explanation,
+                          capture_output("tradeoff_decision", "Decision:")],
+    before_tool_callback=BEFORE_TOOL_CALLBACKS,
+    after_tool_callback=AFTER_TOOL_CALLBACKS,
     tools=[exit_loop]
 )
 
@@ -97,11 +170,27 @@ When reviewing an explanation:
 Your responses should be brief and focused on whether to continue or exit.
 """
 
+
+def skip_after_prepared_explanation(callback_context, llm_request):
+    """before_model_callback: end the loop locally after a prepared explanation.
+
+    Prepared explanations are complete by construction, so there is nothing
+    for the gatekeeper to judge; the user's next message starts a new turn.
+    """
+    if _answered.pop(callback_context.invocation_id, None) is None:
+        return None
+    return LlmResponse(content=types.Content(role="model", parts=[
+        types.Part(function_call=types.FunctionCall(name="exit_loop", args={}))]))
+
 clarification_agent = Agent(
-    model="gemini-2.0-flash",
+    model=model_for("clarification_agent"),
     name="clarification_agent",
     description="Checks understanding and guides further explanation if needed",
     instruction=CLARIFICATION_AGENT_PROMPT,
+    before_model_callback=[skip_after_prepared_explanation, *BEFORE_MODEL_CALLBACKS],
+    after_model_callback=AFTER_MODEL_CALLBACKS,
+    before_tool_callback=BEFORE_TOOL_CALLBACKS,
+    after_tool_callback=AFTER_TOOL_CALLBACKS,
     tools=[exit_loop]
 )
 
@@ -116,4 +205,5 @@ education_loop_agent = LoopAgent(
     max_iterations=3
 )
 
-__all__ = ['education_loop_agent', 'tradeoff_educator_agent', 'clarification_agent']
\ No newline at end of file
+__all__ = ['education_loop_agent', 'tradeoff_educator_agent', 'clarification_agent',
+           'explanation_cache']
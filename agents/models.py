@@ -0,0 +1,136 @@
+# Architecture Assistant - Model Assignments
+#
+# Which tier each agent runs on and its per-call budget. Gatekeepers that
+# only decide whether to call exit_loop run on the lite tier; conversational
+# and writing agents on standard. Change assignments at runtime with
+# model_registry.assign(agent, tier) or model_registry.set_model(tier, model),
+# or with MODEL_TIER_OVERRIDES / MODEL_TIER_MODELS.
+#
+# When a quota is configured (RATE_LIMIT_RPM / RATE_LIMIT_TPM), every call
+# also waits its turn at the rate limiter, in AGENT_PRIORITIES order.
+
+import time
+from collections import OrderedDict
+
+from ..services.model_tiers import ModelRegistry, TierBudget
+from ..services.rate_limit import (PRIORITY_AGENT, PRIORITY_INTERACTIVE, PRIORITY_SEARCH,
+                                   call_priority, default_rate_limiter)
+from ..services.tokens import estimate_content_tokens, estimate_tokens
+from .orchestrator import ROOT_AGENT_NAME
+
+AGENT_TIERS = {
+    ROOT_AGENT_NAME: "standard",
+    "search_agent": "standard",
+    "requirements_discovery_agent": "standard",
+    "project_reality_check_agent": "standard",
+    "tradeoff_educator_agent": "standard",
+    "clarification_agent": "lite",
+    "analyze_requirements_agent": "standard",
+    "double_check_agent": "lite",
+    "implementation_roadmap_agent": "standard",
+}
+
+# p90 per-call budgets; over budget -> next faster tier for a cooldown
+AGENT_BUDGETS = {
+    ROOT_AGENT_NAME: TierBudget(latency_ms=3000),
+    "search_agent": TierBudget(latency_ms=6000),
+    "requirements_discovery_agent": TierBudget(latency_ms=8000),
+    "project_reality_check_agent": TierBudget(latency_ms=15000),
+    "tradeoff_educator_agent": TierBudget(latency_ms=12000),
+    "clarification_agent": TierBudget(latency_ms=2000),
+    "analyze_requirements_agent": TierBudget(latency_ms=20000, cost_usd=0.02),
+    "double_check_agent": TierBudget(latency_ms=2000),
+    "implementation_roadmap_agent": TierBudget(latency_ms=20000, cost_usd=0.02),
+}
+
+# Rate limiter queue order; unlisted agents get PRIORITY_AGENT. Speculative
+# work overrides this with call_priority (see agents/search.py).
+AGENT_PRIORITIES = {
+    ROOT_AGENT_NAME: PRIORITY_INTERACTIVE,
+    "search_agent": PRIORITY_SEARCH,
+}
+
+model_registry = ModelRegistry.from_env(AGENT_TIERS, AGENT_BUDGETS)
+
+
+def model_for(agent_name):
+    """Model id an agent is built with; callbacks re-resolve it on every call."""
+    return model_registry.model_for(agent_name)
+
+
+# ===== ADK CALLBACKS =====
+
+_MAX_PENDING = 1024
+_started = OrderedDict()   # (invocation_id, agent_name) -> (perf_counter, model)
+
+
+def _key(callback_context):
+    return (callback_context.invocation_id, callback_context.agent_name)
+
+
+def select_model_tier(callback_context, llm_request):
+    """before_model_callback: send this call to the agent's current tier (keep it first)."""
+    llm_request.model = model_registry.model_for(callback_context.agent_name)
+    return None
+
+
+async def wait_for_rate_limit(callback_context, llm_request):
+    """before_model_callback: queue for quota with the agent's priority.
+
+    Reserves one request and the estimated input tokens; runs after the
+    request is final and before the model timer, so waiting for quota
+    doesn't count against latency budgets.
+    """
+    limiter = default_rate_limiter()
+    if limiter is None:
+        return None
+    priority = call_priority.get()
+    if priority is None:
+        priority = AGENT_PRIORITIES.get(callback_context.agent_name, PRIORITY_AGENT)
+    config = llm_request.config
+    tokens = estimate_content_tokens(llm_request.contents)
+    if config is not None and not config.cached_content:
+        tokens += estimate_tokens(str(config.system_instruction or ""))
+    await limiter.acquire(priority, tokens)
+    return None
+
+
+def start_model_timer(callback_context, llm_request):
+    """before_model_callback: start timing just before the model is called."""
+    _started[_key(callback_context)] = (time.perf_counter(), llm_request.model)
+    while len(_started) > _MAX_PENDING:
+        _started.popitem(last=False)
+    return None
+
+
+def record_model_usage(callback_context, llm_response):
+    """after_model_callback: charge the finished call to its budget and the token quota."""
+    if llm_response.partial:
+        return None
+    pending = _started.pop(_key(callback_context), None)
+    if pending is None:
+        return None
+    started, model = pending
+    usage = llm_response.usage_metadata
+    limiter = default_rate_limiter()
+    if limiter is not None and usage is not None:
+        limiter.charge(usage.candidates_token_count or 0)
+    model_registry.record(
+        callback_context.agent_name, model, time.perf_counter() - started,
+        input_tokens=(usage and usage.prompt_token_count) or 0,
+        output_tokens=(usage and usage.candidates_token_count) or 0,
+    )
+    return None
+
+
+__all__ = [
+    'AGENT_BUDGETS',
+    'AGENT_PRIORITIES',
+    'AGENT_TIERS',
+    'model_for',
+    'model_registry',
+    'record_model_usage',
+    'select_model_tier',
+    'start_model_timer',
+    'wait_for_rate_limit',
+]
@@ -3,56 +3,36 @@
 # These agents create actionable roadmaps and implementation plans
 
 from google.adk import Agent
-from .search import search_agent_tool
+from .search import search_agent_tool, multi_search
+from .callbacks import (AFTER_MODEL_CALLBACKS, AFTER_TOOL_CALLBACKS, BEFORE_MODEL_CALLBACKS,
+                        BEFORE_TOOL_CALLBACKS, capture_output, handoff_callbacks)
+from .models import model_for
+from .prompts import BATCHED_SEARCH, BOUNDARIES, COMPLETION, HANDOFF, ONLY_JOB, SEARCH, quoted
+from .replanning import replan_callbacks
+from .requirements import structured_input
+from .reuse import reuse_callbacks
+from ..services.prompts import compose
+from ..services.replanning import ROADMAP_DEPENDENCIES
 
 # ===== PLANNING & ACTION AGENTS =====
 
 # Implementation Roadmap Agent - Creates step-by-step actionable plans
-IMPLEMENTATION_ROADMAP_PROMPT = """You are a practical project planner who creates actionable roadmaps for non-technical founders.
-
-## YOUR ONLY JOB
-Create a phased implementation roadmap with milestones and timelines. Nothing more.
-
-## CRITICAL BOUNDARIES - YOU MUST NEVER:
-- Start implementing or building anything
-- Write code or technical specifications
-- Design the actual solution architecture
-- Take over project execution
-- Make technology decisions
-- Continue after delivering the roadmap
-- Begin development work
-
-## YOUR APPROACH
+IMPLEMENTATION_ROADMAP_PROMPT = compose(
+    ONLY_JOB(role="You are a practical project planner who creates actionable roadmaps for non-technical founders.",
+             job="Create a phased implementation roadmap with milestones and timelines."),
+    BOUNDARIES(never=["Design the solution architecture or make technology decisions",
+                      "Continue after delivering the roadmap"]),
+    """## YOUR APPROACH
 1. **Start small**: MVP thinking, prove the concept first
-2. **Clear milestones**: Each phase has specific, measurable outcomes
-3. **Reality-based**: Account for learning curves and unexpected delays
-4. **Risk-aware**: Identify what could go wrong and plan for it
-
-## ROADMAP STRUCTURE
-- Phase 0: Validation (before building anything)
-- Phase 1: MVP (smallest thing that provides value)
-- Phase 2: Enhancement (based on real user feedback)
-- Phase 3: Scale (only after product-market fit)
-
-## FOR EACH PHASE INCLUDE
-- Goal: One clear business outcome
-- Duration: Realistic timeline with buffer
-- Key Activities: 3-5 specific things to do
-- Success Metrics: How you know it worked
-- Budget Range: Rough costs
-- Team Needs: Who you need
-- Decision Point: Go/no-go criteria
-
-## WHEN TO USE SEARCH
-When you need to research:
-- Typical development timelines
-- Common pitfall patterns
-- Industry-specific requirements
-- Regulatory considerations
-
-Use the search_agent tool directly for accurate planning.
-
-## OUTPUT FORMAT
+2. **Clear milestones**: each phase has specific, measurable outcomes
+3. **Reality-based**: account for learning curves and delays
+4. **Risk-aware**: plan for what could go wrong
+
+Phases: 0 Validation (before building) → 1 MVP (smallest valuable thing) → 2 Enhancement (from real user feedback) → 3 Scale (only after product-market fit).
+Each phase has: one business goal, a duration with buffer, 3-5 key activities, success metrics, a budget range, team needs and a go/no-go decision point.""",
+    SEARCH(topics="typical development timelines, common pitfalls, industry-specific requirements and regulations"),
+    BATCHED_SEARCH,
+    """## OUTPUT FORMAT
 ## Implementation Roadmap: [Project Name]
 
 ### Pre-Development Checklist
@@ -67,41 +47,42 @@ Use the search_agent tool directly for accurate planning.
 
 Key Activities:
 1. [Specific task with why it matters]
-2. [Specific task with why it matters]
 
 Success Looks Like:
-- [Measurable outcome]
-- [User behavior change]
+- [Measurable outcome or user behavior change]
 
 ⚠️ Common Pitfalls:
-- [What typically goes wrong here]
-- [How to avoid/handle it]
-
-[Continue for 3-4 phases...]
-
-## COMPLETION CRITERIA - YOU ARE DONE WHEN:
-1. You've delivered the complete roadmap
-2. User acknowledges or approves the plan
-3. User says phrases like:
-   - "This looks good"
-   - "Perfect roadmap"
-   - "I can work with this"
-   - "Thanks for the plan"
-   - "That's what I needed"
-
-## MANDATORY HANDOFF MESSAGE
-When the user acknowledges the roadmap, you MUST respond with:
-"Excellent! I've created your implementation roadmap. You now have a clear, phased plan to bring your vision to life. Let me hand you back to the main assistant who can help with any other aspects of your project."
+- [What typically goes wrong and how to avoid it]
+
+[Continue for 3-4 phases...]""",
+    COMPLETION(done="You've delivered the complete roadmap and the user acknowledges or approves it",
+               phrases=quoted(["This looks good", "Perfect roadmap", "I can work with this",
+                               "Thanks for the plan", "That's what I needed"])),
+    HANDOFF(when="the user acknowledges the roadmap",
+            message="Excellent! I've created your implementation roadmap. You now have a clear, phased plan to bring your vision to life. Let me hand you back to the main assistant who can help with any other aspects of your project."),
+)
 
-CRITICAL: After this handoff message, you must STOP and wait for the orchestrator to take over. Do not start implementing or continue the conversation.
-"""
+roadmap_completion_check, roadmap_handoff = handoff_callbacks(
+    IMPLEMENTATION_ROADMAP_PROMPT, "Implementation Roadmap")
+serve_similar_roadmap, attach_similar_roadmap = reuse_callbacks("Implementation Roadmap")
+replan_roadmap, splice_roadmap, note_roadmap = replan_callbacks(
+    "implementation_roadmap", "Implementation Roadmap", ROADMAP_DEPENDENCIES, "implementation roadmap")
 
 implementation_roadmap_agent = Agent(
-    model="gemini-2.0-flash",
+    model=model_for("implementation_roadmap_agent"),
     name="implementation_roadmap_agent",
     description="Creates practical, milestone-based implementation plans",
     instruction=IMPLEMENTATION_ROADMAP_PROMPT,
-    tools=[search_agent_tool]  # Can use search_agent via AgentTool
+    before_model_callback=[roadmap_completion_check,
+                           structured_input("reality_check", "architecture_proposal"),
+                           replan_roadmap, serve_similar_roadmap, *BEFORE_MODEL_CALLBACKS],
+    after_model_callback=[*AFTER_MODEL_CALLBACKS, attach_similar_roadmap, splice_roadmap,
+                          capture_output("implementation_roadmap", "Implementation Roadmap"),
+                          roadmap_handoff],
+    after_agent_callback=note_roadmap,
+    before_tool_callback=BEFORE_TOOL_CALLBACKS,
+    after_tool_callback=AFTER_TOOL_CALLBACKS,
+    tools=[search_agent_tool, multi_search]  # Single and batched search
 )
 
 __all__ = ['implementation_roadmap_agent']
\ No newline at end of file
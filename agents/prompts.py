@@ -0,0 +1,88 @@
+# Architecture Assistant - Shared Prompt Fragments and Token Budgets
+#
+# Blocks every specialist prompt repeats. Agent modules compose their
+# instruction from these plus their own sections (see services/prompts.py).
+# The completion and handoff fragments keep the layout parse_handoff_spec
+# reads, so the prompts stay the single source of truth for handoffs.
+# Budgets are enforced by tests/test_prompt_budgets.py and reported by
+# `python -m architecture_assistant.benchmarks.prompt_tokens --check`.
+
+from ..services.prompts import Fragment
+
+ONLY_JOB = Fragment("only_job", 1, """\
+{role}
+
+## YOUR ONLY JOB
+{job} Nothing more.""")
+
+BOUNDARIES = Fragment("boundaries", 1, """\
+## NEVER
+- Write code, technical specifications or implementation details
+- Start building or take over execution
+{never}""")
+
+SEARCH = Fragment("search", 1, """\
+## SEARCH
+Use the search_agent tool for current facts on: {topics}.""")
+
+BATCHED_SEARCH = Fragment("batched_search", 1, """\
+Send several questions together in one multi_search call instead of searching one at a time.""")
+
+COMPLETION = Fragment("completion", 1, """\
+## COMPLETION CRITERIA - YOU ARE DONE WHEN:
+{done}, e.g. the user says:
+{phrases}""")
+
+HANDOFF = Fragment("handoff", 1, """\
+## MANDATORY HANDOFF MESSAGE
+When {when}, reply with exactly:
+"{message}"
+
+Then STOP: the orchestrator takes over. Don't continue the conversation.""")
+
+LOOP_EXIT = Fragment("loop_exit", 1, """\
+## EXIT BEHAVIOR
+{when}, call exit_loop(). Never keep going after that.""")
+
+
+def quoted(phrases):
+    """Completion phrases as the quoted list items COMPLETION expects."""
+    return [f'"{phrase}"' for phrase in phrases]
+
+
+# Estimated tokens per instruction; raise a budget deliberately, not by accident
+PROMPT_TOKEN_BUDGETS = {
+    "architecture_assistant": 2300,
+    "requirements_discovery_agent": 600,
+    "project_reality_check_agent": 650,
+    "tradeoff_educator_agent": 450,
+    "clarification_agent": 100,
+    "analyze_requirements_agent": 250,
+    "double_check_agent": 100,
+    "implementation_roadmap_agent": 625,
+    "search_agent": 100,
+}
+DEFAULT_SECTION_WRITER_BUDGET = 175  # deliverable_package section writers
+
+
+def prompt_token_budget(agent_name):
+    if agent_name in PROMPT_TOKEN_BUDGETS:
+        return PROMPT_TOKEN_BUDGETS[agent_name]
+    if agent_name.endswith("_writer"):
+        return DEFAULT_SECTION_WRITER_BUDGET
+    return None
+
+
+__all__ = [
+    'BATCHED_SEARCH',
+    'BOUNDARIES',
+    'COMPLETION',
+    'DEFAULT_SECTION_WRITER_BUDGET',
+    'HANDOFF',
+    'LOOP_EXIT',
+    'ONLY_JOB',
+    'PROMPT_TOKEN_BUDGETS',
+    'SEARCH',
+    'prompt_token_budget',
+    'quoted',
+]
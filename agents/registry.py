@@ -0,0 +1,44 @@
+# Architecture Assistant - Lazy Agent Registry
+#
+# Declares where every public agent lives without importing it. Agents (and
+# google.adk) are only imported the first time one of them is requested, so
+# importing the package, or a single agent, stays cheap.
+
+import importlib
+
+# Public name -> defining module (relative to this package)
+AGENT_REGISTRY = {
+    'search_agent': 'search',
+    'search_agent_tool': 'search',
+    'requirements_discovery_agent': 'discovery',
+    'project_reality_check_agent': 'discovery',
+    'education_loop_agent': 'education',
+    'implementation_roadmap_agent': 'planning',
+    'architecture_loop_agent': 'technical',
+    'deliverable_package_agent': 'deliverables',
+}
+
+_environment_loaded = False
+
+
+def load_environment():
+    """Load .env once, before the first agent reads its configuration."""
+    global _environment_loaded
+    if not _environment_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _environment_loaded = True
+
+
+def get_agent(name):
+    """Import (building on first use) and return a registered agent."""
+    try:
+        module_name = AGENT_REGISTRY[name]
+    except KeyError:
+        raise KeyError(f"Unknown agent {name!r}; known: {sorted(AGENT_REGISTRY)}") from None
+    load_environment()
+    module = importlib.import_module(f".{module_name}", __package__)
+    return getattr(module, name)
+
+
+__all__ = ['AGENT_REGISTRY', 'get_agent', 'load_environment']
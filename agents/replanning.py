@@ -0,0 +1,158 @@
+# Architecture Assistant - Incremental Re-planning
+#
+# The roadmap and the architecture remember the structured requirements they
+# were written for. When discovery later revises the requirements (a new
+# budget, a dropped feature), the next call to the agent rewrites only the
+# sections that depend on the changed fields (services/replanning.py) and
+# splices them into the existing deliverable; the rest is kept as is.
+# Only revisions that go through discovery's summary trigger this: a change
+# told straight to the roadmap or architecture agent regenerates it in full.
+
+import os
+import time
+from collections import OrderedDict
+
+from google.adk.models import LlmResponse
+from google.genai import types
+
+from ..services.compaction import content_text
+from ..services.replanning import (ReplanStats, affected_sections, describe_changes,
+                                   diff_requirements, splice_sections, split_sections)
+from ..services.requirements import Requirements, RequirementsError
+from .callbacks import unanswered_user_message
+from .requirements import structured_requirements
+
+REPLAN_PROMPT = """You update part of an existing {deliverable} after the project's requirements changed.
+
+Rewrite ONLY the sections listed in the last message, in that order. Start each with its heading line at the same level (update durations or amounts in the heading if they change) and keep the existing format and level of detail. Reflect every change that affects the section.
+
+Don't repeat the other sections, don't add an introduction or closing remarks and don't call tools.
+"""
+
+replan_stats = ReplanStats()
+
+_MAX_PENDING = 1024
+_pending = OrderedDict()   # (invocation_id, agent_name) -> replan in progress
+_unchanged = OrderedDict()   # (invocation_id, agent_name) -> deliverable kept as is
+
+
+def replanning_enabled():
+    return os.getenv("REPLANNING_ENABLED", "true").lower() == "true"
+
+
+def replanning(callback_context):
+    """True while this agent call rewrites sections of an existing deliverable."""
+    return (callback_context.invocation_id, callback_context.agent_name) in _pending
+
+
+def _remember(key, value, store=_pending):
+    store[key] = value
+    while len(store) > _MAX_PENDING:
+        store.popitem(last=False)
+
+
+def _written_for(state, snapshot_key):
+    try:
+        return Requirements.from_state(state.get(snapshot_key))
+    except RequirementsError:
+        return None
+
+
+def replan_callbacks(state_key, marker, dependencies, deliverable):
+    """(before_model, after_model, after_agent) callbacks re-planning state[state_key].
+
+    - before_model: on a fresh user message, if the requirements changed
+      since the deliverable was written and only some of its sections
+      depend on the change, turn the call into rewriting those sections;
+      if none do, reply with the deliverable as is (no model call).
+    - after_model: splice the rewritten sections into the deliverable (in
+      place, so capture_output and output_key store the whole of it) and
+      remember which requirements each full deliverable was written for.
+    - after_agent: when the deliverable was kept as is, say so in a separate
+      event, so output_key doesn't store the note with the deliverable.
+    """
+    snapshot_key = f"{state_key}_requirements"
+    prompt = REPLAN_PROMPT.format(deliverable=deliverable)
+
+    def plan(callback_context, llm_request):
+        state = callback_context.state
+        previous = state.get(state_key)
+        if not replanning_enabled() or not previous:
+            return None
+        if unanswered_user_message(llm_request) is None:
+            return None  # Continuing after a tool call
+        before, after = _written_for(state, snapshot_key), structured_requirements(state)
+        if before is None or after is None:
+            return None
+        changes = diff_requirements(before, after)
+        if not changes:
+            return None
+        preamble, sections = split_sections(previous)
+        if not sections:
+            return None
+        affected = affected_sections(sections, changes, dependencies)
+        if not affected:
+            state[snapshot_key] = state["requirements"]
+            replan_stats.record_replan(len(sections), 0, len(previous), len(previous), 0.0)
+            _remember((callback_context.invocation_id, callback_context.agent_name), True,
+                      store=_unchanged)
+            return LlmResponse(content=types.Content(role="model",
+                                                     parts=[types.Part(text=previous)]))
+        if len(affected) == len(sections):
+            replan_stats.record_full()
+            return None
+        _remember((callback_context.invocation_id, callback_context.agent_name),
+                  {"preamble": preamble, "sections": sections, "affected": affected,
+                   "started": time.perf_counter(), "shown": False})
+        titles = "\n".join(f"- {sections[i].title}" for i in affected)
+        llm_request.contents.append(types.Content(role="user", parts=[types.Part(text=(
+            f"Current {deliverable}:\n\n{previous}\n\nWhat changed in the requirements:\n"
+            f"{describe_changes(changes)}\n\nRewrite only these sections:\n{titles}"))]))
+        config = llm_request.config
+        config.system_instruction = prompt
+        config.tools = None
+        config.tool_config = None
+        return None
+
+    def splice(callback_context, llm_response):
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        pending = _pending.get(key)
+        state = callback_context.state
+        if llm_response.partial:
+            if pending is not None and not pending["shown"] and llm_response.content:
+                # Show the unchanged sections before the first rewritten one
+                pending["shown"] = True
+                kept = pending["sections"][:pending["affected"][0]]
+                llm_response.content.parts.insert(0, types.Part(
+                    text=pending["preamble"] + "".join(s.text + "\n" for s in kept)))
+            return None
+        if not llm_response.content:
+            return None
+        text = content_text(llm_response.content)
+        if pending is None:
+            if marker in text and state.get("requirements"):
+                state[snapshot_key] = state["requirements"]
+            return None
+        if not text or any(p.function_call for p in llm_response.content.parts or []):
+            return None
+        del _pending[key]
+        updated, reused = splice_sections(pending["preamble"], pending["sections"],
+                                          pending["affected"], text)
+        llm_response.content = types.Content(role="model", parts=[types.Part(text=updated)])
+        state[snapshot_key] = state["requirements"]
+        replan_stats.record_replan(len(pending["sections"]), len(pending["affected"]), reused,
+                                   len(updated), time.perf_counter() - pending["started"])
+        return None
+
+    def note(callback_context):
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        if _unchanged.pop(key, None) is None:
+            return None
+        return types.Content(role="model", parts=[types.Part(text=(
+            f"Nothing in the {deliverable} above depends on what changed, so it "
+            f"still applies as is."))])
+
+    return plan, splice, note
+
+
+__all__ = ['replan_callbacks', 'replan_stats', 'replanning']
@@ -0,0 +1,102 @@
+# Architecture Assistant - Structured Requirements for Downstream Agents
+#
+# Discovery's summary is parsed into a Requirements object
+# (services/requirements.py) and stored in session state. The reality check,
+# the architecture loop and the roadmap then get that object (plus the
+# outputs of earlier agents they build on) as one compact block, followed by
+# only the latest turns of the conversation, instead of the whole
+# discovery transcript.
+
+import logging
+import os
+
+from google.genai import types
+
+from ..services.compaction import REQUIREMENTS_MARKER, content_text, split_turns
+from ..services.requirements import Requirements, RequirementsError, parse_requirements
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEEP_RECENT_TURNS = 2
+
+# Session state written by earlier agents -> heading in the structured input
+PRIOR_OUTPUTS = {
+    "reality_check": "Feasibility assessment",
+    "tradeoff_decision": "Technology decision explained to the founder",
+    "architecture_proposal": "Proposed architecture",
+}
+
+STRUCTURED_INPUT_HEADER = "For context: the project so far, in structured form"
+
+
+def structured_input_enabled():
+    return os.getenv("STRUCTURED_REQUIREMENTS_ENABLED", "true").lower() == "true"
+
+
+def store_requirements(state, summary):
+    """Parse a discovery summary into state["requirements"].
+
+    A summary that doesn't validate clears the structured copy, so
+    downstream agents fall back to the conversation rather than use
+    requirements the user has since revised.
+    """
+    try:
+        state["requirements"] = parse_requirements(summary).to_state()
+    except RequirementsError as e:
+        logger.warning("Requirements summary not structured: %s", e)
+        state["requirements"] = None
+
+
+def structured_requirements(state):
+    """Validated Requirements from session state, or None."""
+    try:
+        return Requirements.from_state(state.get("requirements"))
+    except RequirementsError as e:
+        logger.warning("Ignoring invalid structured requirements: %s", e)
+        return None
+
+
+def structured_input(*prior_outputs, keep_recent_turns=None):
+    """before_model callback replacing older history with structured input.
+
+    When discovery produced structured requirements, the request contents
+    become one block with the requirements and the prior_outputs (keys of
+    PRIOR_OUTPUTS) present in state, followed by the last keep_recent_turns
+    turns. Copies of the markdown summary or of those outputs in the kept
+    turns are dropped.
+    """
+    keep = keep_recent_turns or int(os.getenv("STRUCTURED_INPUT_KEEP_TURNS",
+                                              DEFAULT_KEEP_RECENT_TURNS))
+
+    def use_structured_requirements(callback_context, llm_request):
+        if not structured_input_enabled():
+            return None
+        state = callback_context.state
+        requirements = structured_requirements(state)
+        if requirements is None:
+            return None
+        outputs = {key: state[key] for key in prior_outputs if state.get(key)}
+        blocks = [f"## Requirements (from discovery)\n{requirements.render()}"]
+        blocks += [f"## {PRIOR_OUTPUTS[key]}\n{text}" for key, text in outputs.items()]
+        recent = []
+        for content in (c for turn in split_turns(llm_request.contents)[-keep:] for c in turn):
+            text = content_text(content)
+            if REQUIREMENTS_MARKER in text or any(o in text for o in outputs.values()):
+                continue
+            recent.append(content)
+        llm_request.contents = [
+            types.Content(role="user", parts=[types.Part(
+                text=f"{STRUCTURED_INPUT_HEADER}:\n\n" + "\n\n".join(blocks))]),
+            *recent,
+        ]
+        return None
+
+    return use_structured_requirements
+
+
+__all__ = [
+    'PRIOR_OUTPUTS',
+    'store_requirements',
+    'structured_input',
+    'structured_requirements',
+]
@@ -0,0 +1,182 @@
+# Architecture Assistant - Reusing Deliverables Across Similar Projects
+#
+# Many founders describe nearly the same project, yet the reality check and
+# the roadmap were written from scratch every time. With a semantic cache
+# hit (services/response_cache.py), the stored deliverable is shown at once
+# and the model only writes a short "Adjustments for Your Project" section
+# for the differences. Misses run the agent as usual and store its output.
+# Only projects with structured requirements take part, so budget, timeline
+# and team can be compared, and stored deliverables don't keep the project's
+# name.
+
+import os
+import re
+import time
+from collections import OrderedDict
+
+from google.genai import types
+
+from ..services.compaction import content_text
+from ..services.response_cache import SCALE_FIELDS, ResponseCache
+from .callbacks import unanswered_user_message
+from .replanning import replanning
+from .requirements import structured_requirements
+
+REUSE_MAX_TOKENS = 220
+
+REUSE_PROMPT = """You adapt a deliverable written for a very similar project to this user's project.
+
+The user has just been shown the prepared deliverable in the last message. Write ONLY this section:
+
+### Adjustments for Your Project
+- 2-5 bullets on where this project differs (budget, timeline, features, team, location, users) and what changes because of it
+
+If nothing differs meaningfully, write one sentence saying the deliverable applies as is. Don't repeat the deliverable, don't add other headings and don't call tools.
+"""
+
+_UNSET = object()
+_default_response_cache = _UNSET
+
+_MAX_PENDING = 1024
+_pending = OrderedDict()   # (invocation_id, agent_name) -> {"hit", "requirements", "started", "shown"}
+
+
+def default_response_cache():
+    """Process-wide response cache, or None when RESPONSE_CACHE_ENABLED=false."""
+    global _default_response_cache
+    if _default_response_cache is _UNSET:
+        enabled = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+        _default_response_cache = ResponseCache.from_env() if enabled else None
+    return _default_response_cache
+
+
+def requirements_key(state):
+    """The requirements a deliverable depends on, as text (None before discovery).
+
+    The structured rendering when there is one: it leaves out the summary's
+    wording and headings, so only the requirements themselves are compared.
+    """
+    requirements = structured_requirements(state)
+    return requirements.render() if requirements else state.get("requirements_summary")
+
+
+def requirement_facts(state):
+    """{field: text} of SCALE_FIELDS from the structured requirements, or None."""
+    requirements = structured_requirements(state)
+    if requirements is None:
+        return None
+    return {field: getattr(requirements, field) for field in SCALE_FIELDS}
+
+
+def _retitle(text, marker):
+    """Drop the other project's name from the deliverable's title line."""
+    return re.sub(rf"^(#+\s*{re.escape(marker)})\s*:.*$", r"\1", text, count=1, flags=re.MULTILINE)
+
+
+def anonymize(text, marker):
+    """The deliverable without the project's name (taken from its title line)."""
+    title = re.search(rf"^#+\s*{re.escape(marker)}\s*:\s*(.+?)\s*$", text, flags=re.MULTILINE)
+    text = _retitle(text, marker)
+    if title is None:
+        return text
+
+    def replace(match):
+        before = text[:match.start()].rstrip(" -*#>")
+        return "Your project" if not before or before[-1] in ".!?:\n" else "your project"
+
+    return re.sub(rf"\b{re.escape(title.group(1))}\b", replace, text)
+
+
+def _remember(key, value):
+    _pending[key] = value
+    while len(_pending) > _MAX_PENDING:
+        _pending.popitem(last=False)
+
+
+def reusing(callback_context):
+    """True while this agent call is personalizing a reused deliverable."""
+    pending = _pending.get((callback_context.invocation_id, callback_context.agent_name))
+    return pending is not None and pending["hit"] is not None
+
+
+def reuse_callbacks(marker):
+    """(before_model, after_model) callbacks reusing the deliverable titled marker.
+
+    - before_model: on the agent's first call for a new user message, look
+      up its deliverable for similar requirements; on a hit, turn the call
+      into a short personalization without tools.
+    - after_model: on a hit, put the stored deliverable in front of the
+      personalization (in place, so capture_output sees all of it); on a
+      miss, store the reply containing marker once the agent writes it.
+    """
+    def serve(callback_context, llm_request):
+        cache = default_response_cache()
+        agent_name = callback_context.agent_name
+        if cache is None or agent_name in callback_context.state.get("delivered_agents", []):
+            return None
+        if unanswered_user_message(llm_request) is None or replanning(callback_context):
+            return None  # Continuing after a tool call, or updating an existing deliverable
+        # Without structured requirements budget, timeline and team can't be
+        # compared, so nothing is served or stored
+        facts = requirement_facts(callback_context.state)
+        requirements = requirements_key(callback_context.state)
+        if not requirements or facts is None:
+            return None
+        hit = cache.lookup(agent_name, requirements, facts)
+        _remember((callback_context.invocation_id, agent_name),
+                  {"hit": hit, "requirements": requirements, "facts": facts,
+                   "started": time.perf_counter(), "shown": False})
+        if hit is None:
+            return None
+        llm_request.contents.append(types.Content(role="user", parts=[types.Part(text=(
+            f"Prepared deliverable for a similar project (similarity {hit.similarity:.2f}):\n\n"
+            f"{hit.response}\n\nThis project's requirements:\n\n{requirements}"))]))
+        config = llm_request.config
+        config.system_instruction = REUSE_PROMPT
+        config.max_output_tokens = REUSE_MAX_TOKENS
+        config.tools = None
+        config.tool_config = None
+        return None
+
+    def attach(callback_context, llm_response):
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        pending = _pending.get(key)
+        if pending is None:
+            return None
+        hit = pending["hit"]
+        if llm_response.partial:
+            if hit is not None and not pending["shown"] and llm_response.content:
+                pending["shown"] = True
+                llm_response.content.parts.insert(
+                    0, types.Part(text=_retitle(hit.response, marker) + "\n\n"))
+            return None
+        cache = default_response_cache()
+        seconds = time.perf_counter() - pending["started"]
+        if hit is not None:
+            del _pending[key]
+            cache.record_hit(seconds)
+            content = llm_response.content or types.Content(role="model", parts=[])
+            content.parts = [types.Part(text=_retitle(hit.response, marker) + "\n\n"),
+                             *(content.parts or [])]
+            llm_response.content = content
+            return None
+        text = content_text(llm_response.content) if llm_response.content else ""
+        if marker not in text:
+            return None  # A tool call or question; the deliverable comes later
+        del _pending[key]
+        cache.record_miss(seconds)
+        cache.put(callback_context.agent_name, pending["requirements"], anonymize(text, marker),
+                  pending["facts"])
+        return None
+
+    return serve, attach
+
+
+__all__ = [
+    'anonymize',
+    'default_response_cache',
+    'requirement_facts',
+    'requirements_key',
+    'reuse_callbacks',
+    'reusing',
+]
@@ -0,0 +1,195 @@
+# Architecture Assistant - Local Routing for the Root Orchestrator
+#
+# Most routing decisions are predictable ("how much will this cost" goes to
+# the reality check, "should I use microservices" goes to education). The
+# router below handles those locally and lets the orchestrator model decide
+# everything else.
+
+import logging
+import os
+
+from ..services.intent_router import DEFAULT_MIN_MARGIN, DEFAULT_THRESHOLD, IntentRouter
+from .callbacks import last_user_message, record_transition, transfer_response
+from .orchestrator import ROOT_AGENT_NAME
+
+logger = logging.getLogger(__name__)
+
+ROUTE_EXAMPLES = {
+    "requirements_discovery_agent": [
+        "I want to build an app like Uber but for dog walking",
+        "I have an idea for helping restaurants reduce food waste",
+        "I want to build a website for my friend",
+        "I need an app for my small business",
+        "Help me create a marketplace for tutors",
+        "I need to modernize my business but don't know where to start",
+        "My idea is a platform that connects farmers with local buyers",
+    ],
+    "project_reality_check_agent": [
+        "How much will this cost?",
+        "How much should I budget for building an MVP?",
+        "How long will it take to build?",
+        "Is my idea technically feasible?",
+        "Is this realistic with my budget?",
+        "What are the biggest risks for a project like this?",
+        "Can I build this with a team of two?",
+    ],
+    "education_loop_agent": [
+        "Should I use microservices?",
+        "Should I build a mobile app or web app first?",
+        "What's the difference between SQL and NoSQL?",
+        "What do you mean by cloud? Where does my app actually live?",
+        "Explain monolith vs microservices",
+        "What's the real difference between hiring freelancers vs an agency?",
+        "Agile or waterfall, which is better for me?",
+    ],
+    "architecture_loop_agent": [
+        "Design the technical architecture for my app",
+        "What tech stack should we use?",
+        "Can you propose a system architecture?",
+        "What technology should my developers build this with?",
+        "Create the technical design for this",
+    ],
+    "implementation_roadmap_agent": [
+        "Create an implementation roadmap",
+        "What are the next steps to build this?",
+        "Give me a step by step plan",
+        "What should I do first?",
+        "Break this into phases with milestones",
+        "When do I need to worry about scaling?",
+    ],
+    "deliverable_package_agent": [
+        "Put together the full architecture package",
+        "Can I get everything in one document?",
+        "Generate the complete deliverable package",
+        "Compile all of this into a final report I can share",
+        "Give me the whole package for my developers and investors",
+    ],
+}
+
+ROUTE_KEYWORDS = {
+    "requirements_discovery_agent": [
+        r"\bi (want|need|plan) to (build|create|make|launch)\b",
+        r"\bi have an idea\b", r"\bhelp me (build|create|make)\b",
+        r"\b(app|website|platform) (like|for)\b",
+    ],
+    "project_reality_check_agent": [
+        r"\bhow much\b", r"\bcost\b", r"\bbudget\b", r"\bhow long\b",
+        r"\bfeasib", r"\brealistic\b", r"\brisks?\b",
+    ],
+    "education_loop_agent": [
+        r"\bshould i use\b", r"\bvs\.?\b", r"\bversus\b", r"\bdifference between\b",
+        r"\bwhat(?:'s| is| does) (?:a |an |the )?\w+ mean\b", r"\bwhat do you mean\b",
+        r"\bexplain\b",
+    ],
+    "architecture_loop_agent": [
+        r"\barchitecture\b", r"\btech(nology)? stack\b", r"\btechnical design\b",
+        r"\bsystem design\b",
+    ],
+    "implementation_roadmap_agent": [
+        r"\broadmap\b", r"\bnext steps?\b", r"\bstep[- ]by[- ]step\b",
+        r"\bmilestones?\b", r"\bphases?\b", r"\bwhat should i do first\b",
+    ],
+    "deliverable_package_agent": [
+        r"\bpackage\b", r"\bdeliverables?\b", r"\bone document\b",
+        r"\b(final|full|complete) (report|document)\b",
+    ],
+}
+
+# Same wording the orchestrator prompt uses when it delegates
+DELEGATION_MESSAGES = {
+    "requirements_discovery_agent": "I'll have the requirements_discovery_agent help us explore your idea together. They'll ONLY focus on understanding your needs, then hand back to me.",
+    "project_reality_check_agent": "Great question - let's get realistic about what's involved. I'll have the project_reality_check_agent give us an honest assessment. They'll ONLY analyze feasibility, not start planning or building.",
+    "education_loop_agent": "There's an important choice here. Let me have the education_loop_agent explain your options in plain English. They'll help you understand, not make the decision for you.",
+    "architecture_loop_agent": "I'll have the architecture team design the technical architecture for your requirements, then we'll review it together.",
+    "implementation_roadmap_agent": "I'll have the implementation_roadmap_agent create your action plan. They'll ONLY create the roadmap, not start implementing.",
+    "deliverable_package_agent": "I'll put everything we've worked out together into your architecture package. All the sections are written at once, so this won't take long.",
+}
+
+# Messages for IntentRouter.evaluate(), none of them in ROUTE_EXAMPLES: the
+# user turns of benchmarks/scenarios/pawpals.json (as the orchestrator sees
+# them) plus held-out phrasings. None marks messages that must fall back to
+# the model: acknowledgements, answers to an agent's questions, and requests
+# that negate or qualify what they mention.
+ROUTING_EVAL_SET = [
+    # pawpals.json
+    ("I want to build an app like Uber but for dog walking", "requirements_discovery_agent"),
+    ("Busy professionals in Austin who need reliable walkers. Walkers would be vetted "
+     "college students. I'm a solo founder with about $50k.", None),
+    ("Yes, that's exactly right", None),
+    ("How much will this cost and how long will it take?", "project_reality_check_agent"),
+    ("Got it", None),
+    ("What's the difference between a native app and a web app for us?", "education_loop_agent"),
+    ("That makes sense", None),
+    ("Let's design the architecture now", "architecture_loop_agent"),
+    ("Can you give me a roadmap with milestones?", "implementation_roadmap_agent"),
+    ("This looks good", None),
+    # Held out
+    ("I'd love to make a booking tool for hair salons", "requirements_discovery_agent"),
+    ("My idea is a subscription box for home bakers", "requirements_discovery_agent"),
+    ("What would a developer charge to build something like this?",
+     "project_reality_check_agent"),
+    ("Can a two-person team realistically pull this off by summer?",
+     "project_reality_check_agent"),
+    ("Is NoSQL or SQL a better fit for us?", "education_loop_agent"),
+    ("What does serverless actually mean?", "education_loop_agent"),
+    ("Which tech stack would you pick for this?", "architecture_loop_agent"),
+    ("Can you propose an architecture for the MVP?", "architecture_loop_agent"),
+    ("What are the next steps to get started?", "implementation_roadmap_agent"),
+    ("Give me the final report to share with my developers", "deliverable_package_agent"),
+    ("Thanks! That explains the risks well", None),
+    ("Thank you, that's really helpful", None),
+    ("Ok, sounds good", None),
+    ("Perfect, I understand the trade-offs now", None),
+    ("Our budget is around $10k and we want to launch in 3 months", None),
+    ("Mostly pet owners in big cities, and they'd pay per walk", None),
+    ("I dont want microservices, just tell me the next steps", None),
+    ("We don't need a mobile app, is the architecture still fine?", None),
+    ("No, the budget is not fixed yet", None),
+]
+
+router = IntentRouter(
+    ROUTE_EXAMPLES,
+    ROUTE_KEYWORDS,
+    threshold=float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", DEFAULT_THRESHOLD)),
+    min_margin=float(os.getenv("ROUTER_MIN_MARGIN", DEFAULT_MIN_MARGIN)),
+)
+
+
+def route_locally(callback_context, llm_request):
+    """before_model_callback for root_agent: skip the routing model call."""
+    message = last_user_message(llm_request)
+    if not message or os.getenv("ROUTER_ENABLED", "true").lower() == "false":
+        return None
+    decision = router.classify(message)
+    if not decision.confident:
+        callback_context.state["temp:router_prediction"] = decision.target
+        return None
+    router.record_local(decision)
+    record_transition(callback_context.state, ROOT_AGENT_NAME, decision.target,
+                      "local_router", confidence=round(decision.confidence, 3))
+    logger.debug("Routed %r to %s (%.2f)", message, decision.target, decision.confidence)
+    return transfer_response(DELEGATION_MESSAGES[decision.target], decision.target)
+
+
+def track_model_routing(callback_context, llm_response):
+    """after_model_callback for root_agent: score our guess against the model's."""
+    predicted = callback_context.state.get("temp:router_prediction")
+    if predicted is None or llm_response.partial or not llm_response.content:
+        return None
+    actual = None
+    for part in llm_response.content.parts or []:
+        if part.function_call and part.function_call.name == "transfer_to_agent":
+            actual = (part.function_call.args or {}).get("agent_name")
+    router.record_fallback(predicted, actual)
+    callback_context.state["temp:router_prediction"] = None
+    return None
+
+
+__all__ = [
+    'ROUTE_EXAMPLES',
+    'ROUTE_KEYWORDS',
+    'ROUTING_EVAL_SET',
+    'router',
+    'route_locally',
+    'track_model_routing',
+]
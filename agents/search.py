@@ -2,11 +2,49 @@
 #
 # This module provides the centralized search service for all other agents
 
+import asyncio
+import contextvars
+import logging
+import os
+
 from google.adk import Agent
-from google.adk.tools import google_search, AgentTool
+from google.adk.tools import google_search, AgentTool, ToolContext
+from google.genai import types
+
+from ..services.hedging import DeadlineExceeded, Hedger
+from ..services.knowledge_index import KnowledgeIndex
+from ..services.prefetch import SpeculativePrefetcher
+from ..services.rate_limit import PRIORITY_BACKGROUND, call_priority
+from ..services.search_cache import default_search_cache, normalize_query
+from ..services.text import normalize_text
+from .callbacks import AFTER_MODEL_CALLBACKS, BEFORE_MODEL_CALLBACKS
+from .models import model_for
+
+logger = logging.getLogger(__name__)
 
 # All other agents must request searches through this agent
 
+
+class SearchFailed(RuntimeError):
+    """search_agent ended with a model error instead of findings."""
+
+
+# Model errors seen by the search attempt running in this context
+_search_errors = contextvars.ContextVar("search_errors", default=None)
+
+
+def record_search_error(callback_context, llm_response):
+    """after_model callback noting search_agent errors for the running attempt.
+
+    AgentTool returns the error message as the tool result, which must not
+    be cached like findings.
+    """
+    errors = _search_errors.get()
+    if errors is not None and (llm_response.error_code or llm_response.error_message):
+        errors.append(f"{llm_response.error_code}: {llm_response.error_message}")
+    return None
+
+
 SEARCH_AGENT_PROMPT = """You are a research assistant that performs web searches for other agents.
 
 When asked to search for information:
@@ -19,14 +57,289 @@ Return concise, factual results that directly answer the search request.
 """
 
 search_agent = Agent(
-    model="gemini-2.0-flash",
+    model=model_for("search_agent"),
     name="search_agent",
     description="Performs web searches for all other agents in the system",
     instruction=SEARCH_AGENT_PROMPT,
+    before_model_callback=BEFORE_MODEL_CALLBACKS,
+    after_model_callback=[*AFTER_MODEL_CALLBACKS, record_search_error],
     tools=[google_search]  # ONLY agent with google_search tool
 )
 
+
+SEARCH_TIMEOUT_NOTE = ("Search timed out with no results for: {request}. "
+                       "Continue without it and say the figures are unverified.")
+
+_UNSET = object()
+
+
+class CachedAgentTool(AgentTool):
+    """AgentTool that answers repeated requests from a SearchCache.
+
+    Hits skip the wrapped agent (and its model and google_search calls)
+    entirely. Misses are answered from the local knowledge index when it
+    covers the request; otherwise they run the agent, hedged and bounded by
+    a deadline (see default_search_hedger), and store its summarized result.
+    """
+
+    def __init__(self, agent, cache=None, hedger=_UNSET, **kwargs):
+        super().__init__(agent=agent, **kwargs)
+        self._cache = cache
+        self._hedger = hedger
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            self._cache = default_search_cache()
+        return self._cache
+
+    @property
+    def hedger(self):
+        if self._hedger is _UNSET:
+            return default_search_hedger()
+        return self._hedger
+
+    async def run_async(self, *, args, tool_context):
+        try:
+            return await self.search(args=args, tool_context=tool_context)
+        except DeadlineExceeded as e:
+            request = args.get("request", "")
+            logger.warning("Search deadline exceeded for %r: %s", request, e)
+            return SEARCH_TIMEOUT_NOTE.format(request=request)
+        except SearchFailed as e:
+            logger.warning("Search failed for %r: %s", args.get("request", ""), e)
+            return str(e)
+
+    async def search(self, *, args, tool_context, deadline_at=None):
+        """run_async, but raises DeadlineExceeded or SearchFailed instead of returning a note.
+
+        Args:
+            deadline_at: Absolute event-loop time shared by a batch of searches.
+        """
+        request = args.get("request", "")
+        cached = self.cache.get(request)
+        hedger = self.hedger
+        if cached is None and (prefetch := _inflight_prefetch(request)) is not None:
+            # Same search already running in the background: wait for it, but
+            # no longer than a search usually takes (it queues behind
+            # foreground calls) and at most half the time left before the
+            # deadline, then search as usual with the rest
+            loop = asyncio.get_running_loop()
+            if deadline_at is None and hedger is not None and hedger.deadline_s:
+                deadline_at = loop.time() + hedger.deadline_s
+            waits = [(deadline_at - loop.time()) / 2] if deadline_at is not None else []
+            if hedger is not None and (delay := hedger.hedge_delay()) is not None:
+                waits.append(delay)
+            await asyncio.wait([prefetch], timeout=max(0.0, min(waits)) if waits else None)
+            cached = self.cache.get(request)
+        if cached is not None:
+            logger.debug("Search cache hit: %r", request)
+            if (prefetcher := default_prefetcher()) is not None:
+                prefetcher.record_lookup(request)
+            return cached
+        if (local := knowledge_answer(request)) is not None:
+            return local
+
+        async def attempt():
+            errors = []
+            token = _search_errors.set(errors)
+            try:
+                result = await super(CachedAgentTool, self).run_async(
+                    args=args, tool_context=tool_context)
+            finally:
+                _search_errors.reset(token)
+            if errors:
+                raise SearchFailed(result or errors[-1])
+            return result
+
+        if hedger is None:
+            result = await attempt()
+        else:
+            result = await hedger.run(attempt, deadline_at=deadline_at)
+        if result:
+            self.cache.put(request, result)
+        return result
+
+
 # Create AgentTool from search_agent for other agents to use
-search_agent_tool = AgentTool(agent=search_agent)
+search_agent_tool = CachedAgentTool(agent=search_agent)
+
+DEFAULT_SEARCH_CONCURRENCY = 4
+
+
+async def run_search(query):
+    """Run search_agent outside any conversation; returns its summarized text.
+
+    Used for background (speculative) searches, which have no tool_context.
+    The result has the same shape as search_agent_tool's. Its model calls
+    queue behind everything else at the rate limiter. Raises SearchFailed
+    when the agent ends with a model error.
+    """
+    if (local := knowledge_answer(query)) is not None:
+        return local
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+
+    runner = Runner(app_name=search_agent.name, agent=search_agent,
+                    session_service=InMemorySessionService())
+    session = await runner.session_service.create_session(
+        app_name=search_agent.name, user_id="prefetch")
+    last_content = None
+    priority = call_priority.set(PRIORITY_BACKGROUND)
+    try:
+        async for event in runner.run_async(
+                user_id=session.user_id, session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part(text=query)])):
+            if event.error_code or event.error_message:
+                raise SearchFailed(f"{event.error_code}: {event.error_message}")
+            if event.content:
+                last_content = event.content
+    finally:
+        call_priority.reset(priority)
+        await runner.close()
+    if last_content is None:
+        return ""
+    return "\n".join(p.text for p in last_content.parts or [] if p.text and not p.thought)
+
+
+_default_prefetcher = _UNSET
+_default_hedger = _UNSET
+_default_knowledge_index = _UNSET
+
+# Curated documents the knowledge index is built from (KNOWLEDGE_DIRS adds more)
+KNOWLEDGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge")
+
+
+def default_prefetcher():
+    """Process-wide research prefetcher, or None when PREFETCH_ENABLED=false."""
+    global _default_prefetcher
+    if _default_prefetcher is _UNSET:
+        enabled = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+        _default_prefetcher = (SpeculativePrefetcher.from_env(run_search, default_search_cache())
+                               if enabled else None)
+    return _default_prefetcher
+
+
+def default_search_hedger():
+    """Process-wide search Hedger (Hedger.from_env; SEARCH_HEDGING_ENABLED=false
+    keeps the deadline but never starts duplicates)."""
+    global _default_hedger
+    if _default_hedger is _UNSET:
+        _default_hedger = Hedger.from_env()
+    return _default_hedger
+
+
+def default_knowledge_index():
+    """Process-wide knowledge index, brought up to date on first use.
+
+    None when KNOWLEDGE_INDEX_ENABLED=false or the index can't be written.
+    """
+    global _default_knowledge_index
+    if _default_knowledge_index is _UNSET:
+        _default_knowledge_index = None
+        if os.getenv("KNOWLEDGE_INDEX_ENABLED", "true").lower() == "true":
+            extra = [d for d in os.getenv("KNOWLEDGE_DIRS", "").split(os.pathsep) if d]
+            index = KnowledgeIndex.from_env()
+            try:
+                index.build([KNOWLEDGE_DIR, *extra])
+            except OSError as e:
+                logger.warning("Knowledge index disabled: %s", e)
+            else:
+                _default_knowledge_index = index
+    return _default_knowledge_index
+
+
+def knowledge_answer(request):
+    """Passages from the knowledge index if they cover request, else None."""
+    index = default_knowledge_index()
+    return index.answer(request) if index is not None else None
+
+
+def _inflight_prefetch(query):
+    prefetcher = default_prefetcher()
+    return prefetcher.inflight(query) if prefetcher is not None else None
+
+
+def merge_search_results(results):
+    """Merge (query, text) pairs into one block, dropping repeated lines."""
+    seen = set()
+    sections = []
+    for query, text in results:
+        lines = []
+        for line in str(text).splitlines():
+            key = normalize_text(line.strip(" -*•\t"))
+            if not key:
+                continue
+            if key in seen:
+                continue
+            seen.add(key)
+            lines.append(line.rstrip())
+        if lines:
+            sections.append(f"### {query}\n" + "\n".join(lines))
+    return "\n\n".join(sections)
+
+
+async def multi_search(queries: list[str], tool_context: ToolContext) -> dict:
+    """Runs several web searches at once and returns one merged result.
+
+    Use this instead of calling search_agent repeatedly when you need to
+    research more than one question (e.g. timelines, costs, failure points
+    and regulations for the same project).
+
+    Args:
+        queries: The individual search requests, one question each.
+
+    Returns:
+        A dict with the merged, deduplicated findings, any failed queries and
+        any queries that ran out of time (the findings are then partial).
+    """
+    unique = {}
+    for query in queries:
+        if query.strip():
+            unique.setdefault(normalize_query(query), query)
+    unique = list(unique.values())
+    limit = int(os.getenv("SEARCH_MAX_CONCURRENCY", DEFAULT_SEARCH_CONCURRENCY))
+    semaphore = asyncio.Semaphore(max(1, limit))
+    # One deadline for the whole batch, so queued queries can't extend it
+    hedger = search_agent_tool.hedger
+    deadline_at = None
+    if hedger is not None and hedger.deadline_s:
+        deadline_at = asyncio.get_running_loop().time() + hedger.deadline_s
+
+    async def run_one(query):
+        async with semaphore:
+            return await search_agent_tool.search(
+                args={"request": query}, tool_context=tool_context, deadline_at=deadline_at
+            )
+
+    outcomes = await asyncio.gather(
+        *(run_one(q) for q in unique), return_exceptions=True
+    )
+    succeeded, failed, timed_out = [], [], []
+    for query, outcome in zip(unique, outcomes):
+        if isinstance(outcome, DeadlineExceeded):
+            timed_out.append(query)
+        elif isinstance(outcome, BaseException):   # Includes a cancelled search
+            logger.warning("Search failed for %r: %r", query, outcome)
+            failed.append(query)
+        else:
+            succeeded.append((query, outcome))
+    if timed_out:
+        logger.warning("Searches timed out: %s", timed_out)
+    return {"results": merge_search_results(succeeded), "failed_queries": failed,
+            "timed_out_queries": timed_out}
+
 
-__all__ = ['search_agent', 'search_agent_tool']
\ No newline at end of file
+__all__ = [
+    'search_agent',
+    'search_agent_tool',
+    'CachedAgentTool',
+    'SearchFailed',
+    'default_prefetcher',
+    'default_knowledge_index',
+    'default_search_hedger',
+    'knowledge_answer',
+    'multi_search',
+    'merge_search_results',
+    'run_search',
+]
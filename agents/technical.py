@@ -4,57 +4,58 @@
 
 from google.adk import Agent
 from google.adk.agents import LoopAgent
+from google.adk.models import LlmResponse
 from google.adk.tools import exit_loop
+from google.genai import types
 from .search import search_agent_tool
+from .callbacks import (AFTER_MODEL_CALLBACKS, AFTER_TOOL_CALLBACKS, BEFORE_MODEL_CALLBACKS,
+                        BEFORE_TOOL_CALLBACKS)
+from .models import model_for
+from .replanning import replan_callbacks
+from .requirements import structured_input
+from .prompts import BOUNDARIES, ONLY_JOB
+from ..services.architecture_rules import APPROVE, REJECT, validate_architecture
+from ..services.prompts import compose
+from ..services.replanning import ARCHITECTURE_DEPENDENCIES
 
 # ===== TECHNICAL DESIGN AGENTS (keeping existing capability) =====
 
 # Core Architecture Analyzer (simplified from original)
-ARCHITECTURE_ANALYZER_PROMPT = """You are an architecture expert who translates business requirements into technical designs.
-
-## YOUR ONLY JOB
-Create a technical architecture design based on requirements. Nothing more.
-
-## CRITICAL BOUNDARIES - YOU MUST NEVER:
-- Start implementing or coding the solution
-- Create detailed technical specifications
-- Write actual code snippets
-- Begin building components
-- Take over development work
-- Continue after architecture is defined
-- Move into execution phase
-
-## YOUR APPROACH
-When given requirements:
-1. Use the search_agent tool to research current best practices and patterns
-2. Propose architecture that balances simplicity with scalability
-3. Focus on what can actually be built by the team
-4. Explain technical choices in business terms
-
-## OUTPUT SHOULD INCLUDE
-- Recommended architecture pattern
-- Technology stack with justifications  
-- Key design decisions
-- Implementation approach
-
-Keep explanations clear and avoid overwhelming technical detail.
-
-## COMPLETION CRITERIA - YOU ARE DONE WHEN:
-1. You've delivered the architecture design
-2. The double_check_agent will validate your work
-3. Focus on completing the design, not continuing conversation
-
-## EXIT BEHAVIOR
-Complete your architecture proposal and wait for validation. Do not continue beyond your architectural recommendations.
-
-CRITICAL: Stay within the bounds of architecture design. Do not venture into implementation.
-"""
+ARCHITECTURE_ANALYZER_PROMPT = compose(
+    ONLY_JOB(role="You are an architecture expert who translates business requirements into technical designs.",
+             job="Create a technical architecture design based on requirements."),
+    BOUNDARIES(never=["Continue after the architecture is defined"]),
+    """## YOUR APPROACH
+1. Research current best practices and patterns with the search_agent tool
+2. Balance simplicity with scalability
+3. Design what this team can actually build
+4. Explain technical choices in business terms, without overwhelming detail
+
+## OUTPUT FORMAT
+## Recommended Architecture Pattern
+## Technology Stack
+[Each technology with its justification]
+## Key Design Decisions
+## Implementation Approach""",
+    """## COMPLETION CRITERIA - YOU ARE DONE WHEN:
+You've delivered the architecture design. The double_check_agent validates it; don't continue the conversation.""",
+)
+
+replan_architecture, splice_architecture, note_architecture = replan_callbacks(
+    "architecture_proposal", "Technology Stack", ARCHITECTURE_DEPENDENCIES, "architecture")
 
 analyze_requirements_agent = Agent(
-    model="gemini-2.0-flash",
+    model=model_for("analyze_requirements_agent"),
     name="analyze_requirements_agent",
     description="Translates requirements into technical architecture",
     instruction=ARCHITECTURE_ANALYZER_PROMPT,
+    before_model_callback=[structured_input("reality_check", "tradeoff_decision"),
+                           replan_architecture, *BEFORE_MODEL_CALLBACKS],
+    after_model_callback=[*AFTER_MODEL_CALLBACKS, splice_architecture],
+    after_agent_callback=note_architecture,
+    before_tool_callback=BEFORE_TOOL_CALLBACKS,
+    after_tool_callback=AFTER_TOOL_CALLBACKS,
+    output_key="architecture_proposal",  # Read by prevalidate_architecture
     tools=[search_agent_tool]  # Can use search_agent via AgentTool
 )
 
@@ -71,11 +72,42 @@ If appropriate, call exit_loop() to approve.
 If not, provide specific, actionable feedback.
 """
 
+
+def prevalidate_architecture(callback_context, llm_request):
+    """Approve or reject clear-cut proposals without calling the validator LLM.
+
+    Approval replies with a local exit_loop() call so the loop ends exactly as
+    if the model had approved; rejection replies with the rule feedback so
+    analyze_requirements_agent revises on the next iteration. Ambiguous
+    proposals return None and go to the model as before.
+    """
+    result = validate_architecture(
+        callback_context.state.get("architecture_proposal"),
+        callback_context.state.get("requirements_summary"),
+    )
+    if result.verdict == APPROVE:
+        parts = [
+            types.Part(text="Architecture approved: all required sections are "
+                            "present and the stack covers the stated requirements."),
+            types.Part(function_call=types.FunctionCall(name="exit_loop", args={})),
+        ]
+    elif result.verdict == REJECT:
+        parts = [types.Part(text="Please revise the architecture:\n" + result.feedback())]
+    else:
+        return None
+    return LlmResponse(content=types.Content(role="model", parts=parts))
+
+
 double_check_agent = Agent(
-    model="gemini-2.0-flash",
+    model=model_for("double_check_agent"),
     name="double_check_agent",
     description="Validates architecture proposals",
     instruction=ARCHITECTURE_VALIDATOR_PROMPT,
+    before_model_callback=[prevalidate_architecture, structured_input(),
+                           *BEFORE_MODEL_CALLBACKS],
+    after_model_callback=AFTER_MODEL_CALLBACKS,
+    before_tool_callback=BEFORE_TOOL_CALLBACKS,
+    after_tool_callback=AFTER_TOOL_CALLBACKS,
     tools=[exit_loop]
 )
 
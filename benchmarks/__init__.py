@@ -0,0 +1,5 @@
+# Copyright 2025
+# Architecture Assistant - Performance Benchmarks
+#
+# Offline measurement scripts. Run from the directory that contains the
+# package, e.g. `python -m architecture_assistant.benchmarks.import_time`.
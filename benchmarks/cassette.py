@@ -0,0 +1,385 @@
+# Architecture Assistant - Record/Replay Cassettes
+#
+# A cassette holds every model call (request fingerprint, streamed responses
+# and when each arrived) and every search_agent_tool / prefetch search of a
+# harness run through root_agent, gzipped JSON. Replaying it answers the same
+# conversations offline without any model or search: at full speed, or with
+# each response delayed as long as it took when recorded. Turn counts, tokens
+# and (with recorded latency) timings then only change when the
+# orchestration does, so runs can be compared without network access.
+#
+#   python -m architecture_assistant.benchmarks.harness --record pawpals.cassette.json.gz
+#   python -m architecture_assistant.benchmarks.harness --record live.cassette.json.gz --live
+#   python -m architecture_assistant.benchmarks.harness --replay pawpals.cassette.json.gz
+#   python -m architecture_assistant.benchmarks.harness --replay pawpals.cassette.json.gz \
+#       --replay-latency recorded
+
+import contextvars
+import gzip
+import hashlib
+import json
+import time
+from collections import defaultdict
+from typing import Any
+
+from google.adk.models import BaseLlm, LlmResponse
+from google.genai import errors
+
+from ..services.hedging import DeadlineExceeded
+from ..services.search_cache import normalize_query
+from ..services.tokens import estimate_content_tokens
+from .fake_llm import FakeBackend, FakeLlm, LatencyModel, current_script, iter_agents
+
+CASSETTE_VERSION = 1
+
+# Search record the current model calls run under (recording only)
+_current_search = contextvars.ContextVar("current_search", default=None)
+
+
+class CassetteMiss(LookupError):
+    """Replay asked for a model call or search the cassette doesn't hold."""
+
+
+def request_key(llm_request):
+    """Fingerprint of what a model call answers: its last content.
+
+    Text, function calls and function responses by name only; ids are
+    random per run and results are already fixed by the cassette.
+    """
+    content = llm_request.contents[-1] if llm_request.contents else None
+    parts = []
+    for part in (content.parts or []) if content else []:
+        if part.text:
+            parts.append(part.text)
+        if part.function_call:
+            parts.append(f"call:{part.function_call.name}")
+        if part.function_response:
+            parts.append(f"response:{part.function_response.name}")
+    return hashlib.sha1("\n".join(parts).encode()).hexdigest()[:16]
+
+
+def _conversation():
+    script = current_script.get()
+    return script.conversation_id if script else None
+
+
+def _dump_response(response):
+    return response.model_dump(mode="json", exclude_none=True)
+
+
+def _load_response(data):
+    # JSON validation, so base64 bytes (thought signatures) decode
+    return LlmResponse.model_validate_json(json.dumps(data))
+
+
+def _error_record(exc):
+    if isinstance(exc, errors.APIError):
+        return {"code": exc.code, "status": exc.status, "message": exc.message}
+    return {"code": None, "status": type(exc).__name__, "message": str(exc)}
+
+
+def _raise_recorded(error):
+    code = error.get("code")
+    if code is None:
+        raise RuntimeError(f"{error['status']}: {error['message']}")
+    body = {"error": {"code": code, "status": error.get("status"), "message": error.get("message")}}
+    raise (errors.ClientError if code < 500 else errors.ServerError)(code, body)
+
+
+class Cassette:
+    """Recorded model calls and searches of one harness run.
+
+    calls: {"conversation", "agent", "model", "key", "input_tokens",
+        "duration_ms", "responses": [{"at_ms", "response"}], "error"}, in the
+        order the calls started.
+    searches: {"conversation", "kind" ("tool" or "prefetch"), "request",
+        "duration_ms", "result", "error", "calls"}; calls are the
+        search_agent model calls it made, logged (not run) on replay.
+    """
+
+    def __init__(self, scenario=None, turns=None, conversations=1, calls=None, searches=None,
+                 meta=None):
+        self.scenario = scenario
+        self.turns = list(turns or [])
+        self.conversations = conversations
+        self.calls = calls if calls is not None else []
+        self.searches = searches if searches is not None else []
+        self.meta = meta or {}
+        self._queues = None
+        self._search_queues = None
+        self.replayed_calls = 0
+        self.replayed_searches = 0
+        self.misses = 0
+
+    def to_dict(self):
+        return {"version": CASSETTE_VERSION, "scenario": self.scenario, "turns": self.turns,
+                "conversations": self.conversations, "meta": self.meta,
+                "calls": self.calls, "searches": self.searches}
+
+    def save(self, path):
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"{path}: cassette version {data.get('version')!r}, "
+                             f"expected {CASSETTE_VERSION}")
+        return cls(data["scenario"], data["turns"], data["conversations"], data["calls"],
+                   data["searches"], data.get("meta"))
+
+    def scenario_dict(self):
+        """Scenario for run_benchmark: the recorded user turns, nothing scripted."""
+        return {"name": self.scenario, "turns": self.turns, "responses": {}}
+
+    def next_call(self, conversation, agent, key):
+        """The first unplayed call of agent in conversation, preferring the same key."""
+        if self._queues is None:
+            self._queues = defaultdict(list)
+            for call in self.calls:
+                self._queues[(call["conversation"], call["agent"])].append(call)
+        queue = self._queues.get((conversation, agent))
+        if not queue:
+            self.misses += 1
+            raise CassetteMiss(f"no recorded {agent} call left in conversation {conversation}")
+        index = next((i for i, call in enumerate(queue) if call["key"] == key), 0)
+        self.replayed_calls += 1
+        return queue.pop(index)
+
+    def next_search(self, conversation, kind, request):
+        """The first unplayed search for request, from this conversation if possible."""
+        if self._search_queues is None:
+            self._search_queues = defaultdict(list)
+            for search in self.searches:
+                self._search_queues[(search["kind"], normalize_query(search["request"]))].append(search)
+        queue = self._search_queues.get((kind, normalize_query(request)))
+        if not queue:
+            self.misses += 1
+            raise CassetteMiss(f"no recorded {kind} search for {request!r}")
+        index = next((i for i, s in enumerate(queue) if s["conversation"] == conversation), 0)
+        self.replayed_searches += 1
+        return queue.pop(index)
+
+    def stats(self):
+        left = sum(len(q) for q in (self._queues or {}).values())
+        return {"recorded_calls": len(self.calls), "recorded_searches": len(self.searches),
+                "replayed_calls": self.replayed_calls,
+                "replayed_searches": self.replayed_searches,
+                "unplayed_calls": left if self._queues is not None else len(self.calls),
+                "misses": self.misses}
+
+
+class RecordingLlm(BaseLlm):
+    """Passes calls through to inner and writes them into the cassette.
+
+    log: Call list to append harness-style records to (for live models;
+    FakeLlm keeps its own).
+    """
+
+    model: str
+    agent_name: str
+    inner: Any
+    cassette: Any
+    log: Any = None
+
+    async def generate_content_async(self, llm_request, stream=False):
+        record = {"conversation": _conversation(), "agent": self.agent_name,
+                  "model": llm_request.model or self.model, "key": request_key(llm_request),
+                  "input_tokens": estimate_content_tokens(llm_request.contents),
+                  "responses": []}
+        search = _current_search.get()
+        # Now, so the cassette keeps start order
+        (search["calls"] if search is not None else self.cassette.calls).append(record)
+        started = time.perf_counter()
+        usage = None
+        try:
+            async for response in self.inner.generate_content_async(llm_request, stream=stream):
+                elapsed = time.perf_counter() - started
+                usage = response.usage_metadata or usage
+                record["responses"].append({"at_ms": round(elapsed * 1000, 1),
+                                            "response": _dump_response(response)})
+                yield response
+        except Exception as exc:
+            record["error"] = _error_record(exc)
+            raise
+        finally:
+            record["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            if usage is not None and usage.prompt_token_count:
+                record["input_tokens"] = usage.prompt_token_count
+        if self.log is not None:
+            self.log.append(_call_log(record))
+
+
+def _call_log(record):
+    """Harness call record (see FakeLlm) for a recorded call."""
+    seconds = record["duration_ms"] / 1000
+    usage = next((r["response"]["usage_metadata"] for r in reversed(record["responses"])
+                  if "usage_metadata" in r["response"]), None)
+    ttft = next((r["at_ms"] / 1000 for r in record["responses"] if "content" in r["response"]),
+                None)
+    return {"agent": record["agent"], "model": record["model"],
+            "conversation": record["conversation"], "input_tokens": record["input_tokens"],
+            "cached_tokens": (usage or {}).get("cached_content_token_count", 0),
+            "output_tokens": (usage or {}).get("candidates_token_count", 0),
+            "simulated_s": seconds, "wall_s": seconds, "ttft_s": ttft}
+
+
+def _searched(call):
+    """Whether a recorded search_agent call ran google_search (local tool or grounding)."""
+    for item in call["responses"]:
+        response = item["response"]
+        if "grounding_metadata" in response:
+            return True
+        for part in response.get("content", {}).get("parts", []):
+            if part.get("function_call", {}).get("name") == "google_search":
+                return True
+    return False
+
+
+class ReplayBackend(FakeBackend):
+    """Call log and clock for a replay.
+
+    time_scale 0 replays at full speed, 1 with the recorded latencies.
+    """
+
+    def __init__(self, cassette, time_scale=0.0):
+        super().__init__(latency=LatencyModel(0.0, sigma=0.0), time_scale=time_scale)
+        self.cassette = cassette
+
+
+class ReplayLlm(BaseLlm):
+    """BaseLlm answering from a cassette instead of a model."""
+
+    model: str = "replay"
+    agent_name: str
+    backend: Any
+
+    async def generate_content_async(self, llm_request, stream=False):
+        backend = self.backend
+        record = backend.cassette.next_call(_conversation(), self.agent_name,
+                                            request_key(llm_request))
+        started = time.perf_counter()
+        ttft = None
+        previous_ms = 0.0
+        try:
+            for item in record["responses"]:
+                await backend.sleep((item["at_ms"] - previous_ms) / 1000)
+                previous_ms = item["at_ms"]
+                response = _load_response(item["response"])
+                if ttft is None and response.content:
+                    ttft = time.perf_counter() - started
+                yield response
+            if record.get("error"):
+                await backend.sleep((record["duration_ms"] - previous_ms) / 1000)
+                _raise_recorded(record["error"])
+        finally:
+            # Also when the caller stops reading after the last response
+            backend.calls.append({**_call_log(record), "ttft_s": ttft,
+                                  "wall_s": time.perf_counter() - started})
+
+
+def _wrap_searches(record_search):
+    """Route search_agent_tool.search and the prefetcher's search through record_search.
+
+    record_search(kind, request, run) -> awaitable result; run() does the
+    original search. Installing again replaces the earlier wrappers.
+    """
+    from ..agents.search import default_prefetcher, search_agent_tool
+
+    original = getattr(search_agent_tool.search, "original", search_agent_tool.search)
+
+    async def search(*, args, tool_context, deadline_at=None):
+        return await record_search("tool", args.get("request", ""), lambda: original(
+            args=args, tool_context=tool_context, deadline_at=deadline_at))
+
+    search.original = original
+    search_agent_tool.search = search
+    prefetcher = default_prefetcher()
+    if prefetcher is not None:
+        prefetch = getattr(prefetcher.search, "original", prefetcher.search)
+
+        async def prefetch_search(query):
+            return await record_search("prefetch", query, lambda: prefetch(query))
+
+        prefetch_search.original = prefetch
+        prefetcher.search = prefetch_search
+
+
+def install_recorder(root_agent, cassette, log=None):
+    """Record every model call (and search_agent's) and every search into cassette.
+
+    Wraps the models in place: FakeLlm instances from install_fakes, or the
+    agents' configured models (live recording). Pass log to collect call
+    records for models that don't keep their own.
+    """
+    from google.adk.models.registry import LLMRegistry
+
+    from ..agents.search import search_agent
+
+    for agent in [*iter_agents(root_agent), search_agent]:
+        if not hasattr(agent, "model"):
+            continue
+        inner = agent.model
+        if isinstance(inner, RecordingLlm):
+            inner = inner.inner
+        if isinstance(inner, str):
+            inner = LLMRegistry.new_llm(inner)
+        agent.model = RecordingLlm(model=inner.model, agent_name=agent.name, inner=inner,
+                                   cassette=cassette,
+                                   log=None if isinstance(inner, FakeLlm) else log)
+
+    async def record_search(kind, request, run):
+        record = {"conversation": _conversation(), "kind": kind, "request": request,
+                  "calls": []}
+        started = time.perf_counter()
+        token = _current_search.set(record)
+        try:
+            record["result"] = await run()
+            return record["result"]
+        except Exception as exc:
+            record["error"] = _error_record(exc)
+            raise
+        finally:
+            _current_search.reset(token)
+            record["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            cassette.searches.append(record)
+
+    _wrap_searches(record_search)
+
+
+def install_replay(root_agent, backend):
+    """Answer every model call and search from backend.cassette."""
+    from ..agents.search import search_agent
+
+    for agent in [*iter_agents(root_agent), search_agent]:
+        if hasattr(agent, "model"):
+            agent.model = ReplayLlm(agent_name=agent.name, backend=backend)
+
+    async def replay_search(kind, request, run):
+        record = backend.cassette.next_search(_conversation(), kind, request)
+        await backend.sleep(record["duration_ms"] / 1000)
+        # The search_agent calls the recorded search made, without running them
+        backend.calls.extend(_call_log(call) for call in record["calls"])
+        backend.search_calls.extend(request for call in record["calls"] if _searched(call))
+        if record.get("error"):
+            if record["error"]["status"] == "DeadlineExceeded":
+                raise DeadlineExceeded(record["error"]["message"])
+            _raise_recorded(record["error"])
+        return record["result"]
+
+    _wrap_searches(replay_search)
+
+
+__all__ = [
+    'Cassette',
+    'CassetteMiss',
+    'ReplayBackend',
+    'ReplayLlm',
+    'RecordingLlm',
+    'install_recorder',
+    'install_replay',
+    'request_key',
+]
@@ -0,0 +1,103 @@
+# Architecture Assistant - Deliverable Package Benchmark
+#
+# Builds the PawPals architecture package with the scripted fake models, once
+# with all section writers running concurrently and once one at a time, and
+# compares wall time with the slowest and the summed section times.
+#
+#   python -m architecture_assistant.benchmarks.deliverables
+#   python -m architecture_assistant.benchmarks.deliverables --slow glossary --timeout 2
+
+import argparse
+import asyncio
+import json
+import time
+
+from .fake_llm import ConversationScript, FakeBackend, LatencyModel, current_script, install_fakes
+from .harness import APP_NAME, configure_offline_environment, load_scenario
+
+# Scenario replies that become session state, as capture callbacks would store them
+STATE_FROM_SCENARIO = {
+    "requirements_summary": ("requirements_discovery_agent", 1),
+    "reality_check": ("project_reality_check_agent", 1),
+    "tradeoff_decision": ("tradeoff_educator_agent", 0),
+    "architecture_proposal": ("analyze_requirements_agent", 1),
+    "implementation_roadmap": ("implementation_roadmap_agent", 1),
+}
+
+
+def scenario_state(scenario, with_roadmap=False):
+    state = {key: scenario["responses"][agent][index]["text"]
+             for key, (agent, index) in STATE_FROM_SCENARIO.items()}
+    if not with_roadmap:
+        del state["implementation_roadmap"]
+    return state
+
+
+async def build_package(agent, state, max_concurrency):
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    agent.max_concurrency = max_concurrency
+    current_script.set(ConversationScript({}))
+    runner = InMemoryRunner(agent=agent, app_name=APP_NAME)
+    session = await runner.session_service.create_session(
+        app_name=APP_NAME, user_id="bench", state=state)
+    started = time.perf_counter()
+    async for _ in runner.run_async(
+            user_id=session.user_id, session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(
+                text="Put together the full architecture package")])):
+        pass
+    wall = time.perf_counter() - started
+    session = await runner.session_service.get_session(
+        app_name=APP_NAME, user_id=session.user_id, session_id=session.id)
+    status = session.state["deliverable_status"]
+    seconds = [s["seconds"] for s in status.values() if "seconds" in s]
+    return {
+        "wall_s": round(wall, 3),
+        "slowest_section_s": round(max(seconds, default=0.0), 3),
+        "sum_of_sections_s": round(sum(seconds), 3),
+        "sections": {key: s["status"] for key, s in status.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deliverable package benchmark")
+    parser.add_argument("--scenario", default="pawpals")
+    parser.add_argument("--median-ms", type=float, default=2000.0,
+                        help="Median simulated latency per section writer")
+    parser.add_argument("--time-scale", type=float, default=0.5)
+    parser.add_argument("--with-roadmap", action="store_true",
+                        help="Reuse the scenario's roadmap instead of writing one")
+    parser.add_argument("--slow", help="Section key whose writer is 10x slower")
+    parser.add_argument("--timeout", type=float, help="Per-section timeout in seconds")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    configure_offline_environment()
+    from ..agents.deliverables import deliverable_package_agent as agent
+
+    if args.timeout:
+        agent.section_timeout_s = args.timeout
+    agent_latency = {}
+    if args.slow:
+        agent_latency[f"{args.slow}_writer"] = LatencyModel(args.median_ms * 10, sigma=0.0)
+    backend = FakeBackend(latency=LatencyModel(args.median_ms, sigma=0.4),
+                          agent_latency=agent_latency, time_scale=args.time_scale)
+    install_fakes(agent, backend)
+    state = scenario_state(load_scenario(args.scenario), args.with_roadmap)
+
+    asyncio.run(build_package(agent, state, 0))  # Warm-up: first-use imports and setup
+    results = {}
+    for mode, concurrency in (("parallel", 0), ("sequential", 1)):
+        r = results[mode] = asyncio.run(build_package(agent, state, concurrency))
+        print(f"{mode:<11} wall {r['wall_s']:>7.3f}s  slowest section "
+              f"{r['slowest_section_s']:>7.3f}s  sum of sections {r['sum_of_sections_s']:>7.3f}s")
+    print("sections:", results["parallel"]["sections"])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
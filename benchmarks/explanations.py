@@ -0,0 +1,113 @@
+# Architecture Assistant - Pre-generated Explanation Benchmark
+#
+# Asks education_loop_agent about each stored trade-off with the scripted
+# fake models, once generating every explanation from scratch and once
+# serving the stored explanation plus a short personalization. Simulated
+# latency grows with output tokens, so the saving comes from generating a
+# paragraph instead of the whole explanation. Reports turn wall time, time
+# to first text and the cache's hit rate.
+#
+#   python -m architecture_assistant.benchmarks.explanations
+#   python -m architecture_assistant.benchmarks.explanations --repeats 5 --stream
+
+import argparse
+import asyncio
+import json
+import time
+
+from .fake_llm import ConversationScript, FakeBackend, LatencyModel, current_script, install_fakes
+from .harness import APP_NAME, configure_offline_environment, percentile
+
+QUESTIONS = {
+    "monolith_vs_microservices": "Should we go with microservices or keep it as one app?",
+    "sql_vs_nosql": "Do we need SQL or NoSQL for our data?",
+    "cloud_vs_on_premise": "Should we host in the cloud or on our own servers?",
+    "native_vs_web_app": "What's the difference between a native app and a web app for us?",
+    "agile_vs_waterfall": "Is agile or waterfall better for a fixed budget?",
+}
+
+SITUATION = ("### For Your Situation\nBased on your $50k budget and solo-founder team, "
+             "I'd lean toward the simpler, cheaper option for launch because it gets you "
+             "to paying users sooner and keeps the door open to switch once demand is proven.")
+
+
+async def ask(runner, question, explanation_text, run_config):
+    from google.genai import types
+
+    # A model writing from scratch produces the whole explanation; with the
+    # cache the output limit cuts this down to the personalization
+    current_script.set(ConversationScript(
+        {"tradeoff_educator_agent": [{"text": f"{explanation_text}\n\n{SITUATION}"}]},
+        {"clarification_agent": {"call": {"name": "exit_loop", "args": {}}}}))
+    session = await runner.session_service.create_session(app_name=APP_NAME, user_id="bench")
+    started = time.perf_counter()
+    ttft = None
+    async for event in runner.run_async(
+            user_id=session.user_id, session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text=question)]),
+            run_config=run_config):
+        if ttft is None and event.content and any(p.text for p in event.content.parts or []):
+            ttft = time.perf_counter() - started
+    return time.perf_counter() - started, ttft
+
+
+async def run_mode(agent, explanations, repeats, run_config):
+    from google.adk.runners import InMemoryRunner
+
+    runner = InMemoryRunner(agent=agent, app_name=APP_NAME)
+    walls, ttfts = [], []
+    for _ in range(repeats):
+        for key, question in QUESTIONS.items():
+            wall, ttft = await ask(runner, question, explanations[key].text, run_config)
+            walls.append(wall)
+            if ttft is not None:
+                ttfts.append(ttft)
+    return {
+        "turn_p50_ms": round(percentile(walls, 50) * 1000, 1),
+        "turn_p95_ms": round(percentile(walls, 95) * 1000, 1),
+        "ttft_p50_ms": round(percentile(ttfts, 50) * 1000, 1) if ttfts else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generated explanation benchmark")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--median-ms", type=float, default=400.0,
+                        help="Simulated latency before the first output token")
+    parser.add_argument("--per-token-ms", type=float, default=10.0,
+                        help="Simulated generation time per output token")
+    parser.add_argument("--time-scale", type=float, default=0.5)
+    parser.add_argument("--stream", action="store_true", help="Use SSE streaming")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    configure_offline_environment()
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+
+    from ..agents import education
+    from ..services.explanation_cache import ExplanationCache
+
+    cache = ExplanationCache(education.EXPLANATIONS_DIR)
+    backend = FakeBackend(latency=LatencyModel(args.median_ms, sigma=0.3,
+                                               per_output_token_ms=args.per_token_ms),
+                          time_scale=args.time_scale)
+    install_fakes(education.education_loop_agent, backend)
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE) if args.stream else None
+
+    results = {}
+    for mode, explanation_cache in (("generated", None), ("prepared", cache)):
+        education.explanation_cache = explanation_cache
+        r = results[mode] = asyncio.run(run_mode(education.education_loop_agent,
+                                                 cache.explanations, args.repeats, run_config))
+        ttft = f"  first text p50 {r['ttft_p50_ms']:>7.1f} ms" if args.stream else ""
+        print(f"{mode:<10} turn p50 {r['turn_p50_ms']:>7.1f} ms  p95 {r['turn_p95_ms']:>7.1f} ms{ttft}")
+    results["cache"] = cache.stats()
+    print(f"hit rate {results['cache']['hit_rate']}  "
+          f"p50 personalized {results['cache']['personalized_p50_ms']} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
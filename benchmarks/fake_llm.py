@@ -0,0 +1,302 @@
+# Architecture Assistant - Scripted Fake Model and Search
+#
+# Deterministic stand-ins for Gemini and google_search so whole conversations
+# can be driven through root_agent offline. Each agent gets its own FakeLlm;
+# responses come from the scripted queue of the conversation currently
+# running (tracked with a ContextVar so conversations can run concurrently).
+
+import asyncio
+import contextvars
+import copy
+import math
+import random
+import time
+from collections import deque
+from typing import Any
+
+from google.adk.models import BaseLlm, LlmResponse
+from google.adk.tools import FunctionTool
+from google.genai import errors, types
+
+from ..services.tokens import CHARS_PER_TOKEN, estimate_content_tokens, estimate_tokens
+
+current_script = contextvars.ContextVar("current_script", default=None)
+
+DEFAULT_RESPONSE = {"text": "Understood."}
+
+
+class LatencyModel:
+    """Log-normal latency: median_ms scaled by exp(N(0, sigma)).
+
+    With tail_probability, that share of calls is tail_factor times slower
+    (a stuck backend or a slow upstream page), which log-normal alone misses.
+    per_input_token_ms models prompt processing, per_output_token_ms decoding.
+    """
+
+    def __init__(self, median_ms=800.0, sigma=0.5, per_output_token_ms=0.0,
+                 tail_probability=0.0, tail_factor=1.0, per_input_token_ms=0.0):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.per_output_token_ms = per_output_token_ms
+        self.per_input_token_ms = per_input_token_ms
+        self.tail_probability = tail_probability
+        self.tail_factor = tail_factor
+
+    def sample(self, rng, output_tokens=0, input_tokens=0):
+        base = self.median_ms * math.exp(rng.gauss(0.0, self.sigma))
+        if self.tail_probability and rng.random() < self.tail_probability:
+            base *= self.tail_factor
+        return (base + self.per_output_token_ms * output_tokens
+                + self.per_input_token_ms * input_tokens) / 1000.0
+
+
+class ConversationScript:
+    """Per-conversation queues of scripted responses, keyed by agent name."""
+
+    def __init__(self, responses, defaults=None, conversation_id=None):
+        self.conversation_id = conversation_id
+        self.queues = {agent: list(items) for agent, items in responses.items()}
+        self.defaults = defaults or {}
+
+    def next_response(self, agent_name, skip_calls=False):
+        queue = self.queues.get(agent_name)
+        while queue:
+            spec = queue.pop(0)
+            if not (skip_calls and spec.get("call")):
+                return spec
+        default = self.defaults.get(agent_name, DEFAULT_RESPONSE)
+        return DEFAULT_RESPONSE if skip_calls and default.get("call") else default
+
+
+class FakeQuota:
+    """Rolling-window request and token quota, like the Gemini API enforces.
+
+    Calls over quota raise the API's 429 RESOURCE_EXHAUSTED ClientError.
+    Tokens are counted at admission (input only). A limit of 0 means unlimited.
+    """
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0, window_s=60.0):
+        self.window_s = window_s
+        self.max_requests = requests_per_minute * window_s / 60.0
+        self.max_tokens = tokens_per_minute * window_s / 60.0
+        self._admitted = deque()   # (time, tokens)
+        self.rejected = 0
+
+    def admit(self, tokens):
+        now = time.monotonic()
+        while self._admitted and self._admitted[0][0] <= now - self.window_s:
+            self._admitted.popleft()
+        over_requests = self.max_requests and len(self._admitted) + 1 > self.max_requests
+        over_tokens = (self.max_tokens
+                       and sum(t for _, t in self._admitted) + tokens > self.max_tokens)
+        if over_requests or over_tokens:
+            self.rejected += 1
+            raise errors.ClientError(429, {"error": {
+                "code": 429, "status": "RESOURCE_EXHAUSTED",
+                "message": "Quota exceeded (fake endpoint)"}})
+        self._admitted.append((now, tokens))
+
+
+class FakeBackend:
+    """Shared latency/token models, search results and the call log.
+
+    Args:
+        latency: LatencyModel for model calls.
+        agent_latency: {agent name: LatencyModel}; overrides everything else.
+        model_latency: {model id: LatencyModel}; e.g. per model tier.
+        search_latency: LatencyModel for fake google_search calls.
+        time_scale: Multiplier applied to simulated sleeps (0 = don't sleep).
+        search_results: {keyword: result text} used by the fake google_search.
+        seed: Random seed; identical seeds give identical runs.
+        quota: FakeQuota the model calls must fit in (None = unlimited).
+    """
+
+    def __init__(self, latency=None, agent_latency=None, search_latency=None,
+                 time_scale=1.0, search_results=None, seed=0, stream_chunks=4,
+                 model_latency=None, quota=None):
+        self.latency = latency or LatencyModel()
+        self.agent_latency = agent_latency or {}
+        self.model_latency = model_latency or {}
+        self.search_latency = search_latency or LatencyModel(median_ms=400.0, sigma=0.6)
+        self.time_scale = time_scale
+        self.search_results = search_results or {}
+        self.rng = random.Random(seed)
+        self.stream_chunks = stream_chunks
+        self.quota = quota
+        self.calls = []
+        self.search_calls = []
+
+    async def sleep(self, seconds):
+        if self.time_scale > 0:
+            await asyncio.sleep(seconds * self.time_scale)
+
+    def search(self, query):
+        query_lc = query.lower()
+        hits = [text for keyword, text in self.search_results.items() if keyword in query_lc]
+        return hits or [f"No specific data found for: {query}"]
+
+
+def _last_user_text(llm_request):
+    for content in reversed(llm_request.contents or []):
+        if content.role == "user":
+            texts = [p.text for p in content.parts or [] if p.text]
+            if texts:
+                return "\n".join(texts)
+    return ""
+
+
+def _last_function_response(llm_request):
+    if not llm_request.contents:
+        return None
+    for part in llm_request.contents[-1].parts or []:
+        if part.function_response:
+            return part.function_response
+    return None
+
+
+def _search_agent_response(llm_request):
+    """search_agent: call google_search once, then summarize its results."""
+    response = _last_function_response(llm_request)
+    if response is None:
+        return {"call": {"name": "google_search",
+                         "args": {"query": _last_user_text(llm_request)}}}
+    results = response.response.get("result", response.response)
+    return {"text": "Key findings:\n" + "\n".join(f"- {r}" for r in results)}
+
+
+def _cached_prefix_tokens(name):
+    """Size of a prefix registered with the local prompt-cache stand-in."""
+    from ..services.prompt_cache import default_prompt_cache
+
+    cache = default_prompt_cache()
+    resolve = getattr(cache.backend, "resolve", None) if cache else None
+    entry = resolve(name) if resolve else None
+    return estimate_tokens(str(entry["system_instruction"])) if entry else 0
+
+
+def _build_content(spec):
+    parts = []
+    if spec.get("text"):
+        parts.append(types.Part(text=spec["text"]))
+    if spec.get("transfer"):
+        parts.append(types.Part(function_call=types.FunctionCall(
+            name="transfer_to_agent", args={"agent_name": spec["transfer"]})))
+    if spec.get("call"):
+        parts.append(types.Part(function_call=types.FunctionCall(
+            name=spec["call"]["name"], args=copy.deepcopy(spec["call"].get("args", {})))))
+    return types.Content(role="model", parts=parts)
+
+
+class FakeLlm(BaseLlm):
+    """BaseLlm that replays scripted responses with simulated latency."""
+
+    model: str = "fake-llm"
+    agent_name: str
+    backend: Any
+
+    async def generate_content_async(self, llm_request, stream=False):
+        backend = self.backend
+        script = current_script.get()
+        config = llm_request.config
+        cached_tokens = 0
+        input_tokens = estimate_content_tokens(llm_request.contents)
+        if config is not None and config.cached_content:
+            cached_tokens = _cached_prefix_tokens(config.cached_content)
+        elif config is not None:
+            input_tokens += estimate_tokens(str(config.system_instruction or ""))
+        if backend.quota is not None:
+            # Before taking a scripted response, so a rejected call can be retried
+            backend.quota.admit(input_tokens)
+
+        if self.agent_name == "search_agent":
+            spec = _search_agent_response(llm_request)
+        else:
+            spec = script.next_response(self.agent_name) if script else DEFAULT_RESPONSE
+            if spec.get("call") and not (config and (config.tools or config.cached_content)) and script:
+                # A request without tools can't produce the scripted call (with
+                # a prompt cache, the tools are in the cached content)
+                spec = script.next_response(self.agent_name, skip_calls=True)
+        limit = config.max_output_tokens if config is not None else None
+        if limit and estimate_tokens(spec.get("text", "")) > limit:
+            # Like a real model, stop at the output limit
+            spec = {**spec, "text": spec["text"][:limit * CHARS_PER_TOKEN],
+                    "output_tokens": min(spec.get("output_tokens") or limit, limit)}
+        content = _build_content(spec)
+        output_tokens = spec.get("output_tokens") or estimate_tokens(spec.get("text", "")) or 1
+        if limit:
+            output_tokens = min(output_tokens, limit)
+
+        latency_model = (backend.agent_latency.get(self.agent_name)
+                         or backend.model_latency.get(llm_request.model, backend.latency))
+        simulated = latency_model.sample(backend.rng, output_tokens, input_tokens)
+        record = {"agent": self.agent_name, "model": llm_request.model,
+                  "conversation": script.conversation_id if script else None,
+                  "input_tokens": input_tokens, "cached_tokens": cached_tokens,
+                  "output_tokens": output_tokens, "simulated_s": simulated,
+                  "started": time.perf_counter()}
+        usage = types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=input_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=input_tokens + output_tokens,
+            cached_content_token_count=cached_tokens or None,
+        )
+
+        text = spec.get("text", "")
+        if stream and text and backend.stream_chunks > 1:
+            # First chunk after ~20% of the latency (time to first token).
+            await backend.sleep(simulated * 0.2)
+            record["ttft_s"] = time.perf_counter() - record["started"]
+            step = max(1, math.ceil(len(text) / backend.stream_chunks))
+            for i in range(0, len(text), step):
+                yield LlmResponse(content=types.Content(
+                    role="model", parts=[types.Part(text=text[i:i + step])]), partial=True)
+                await backend.sleep(simulated * 0.8 / backend.stream_chunks)
+        else:
+            await backend.sleep(simulated)
+        record["wall_s"] = time.perf_counter() - record["started"]
+        backend.calls.append(record)
+        yield LlmResponse(content=content, usage_metadata=usage)
+
+
+def make_fake_google_search(backend):
+    """A local google_search function tool backed by backend.search_results."""
+
+    async def google_search(query: str) -> dict:
+        """Searches the web and returns result snippets.
+
+        Args:
+            query: The search query.
+        """
+        await backend.sleep(backend.search_latency.sample(backend.rng))
+        backend.search_calls.append(query)
+        return {"result": backend.search(query)}
+
+    return FunctionTool(google_search)
+
+
+def iter_agents(agent):
+    yield agent
+    for sub_agent in agent.sub_agents:
+        yield from iter_agents(sub_agent)
+
+
+def install_fakes(root_agent, backend):
+    """Point every LLM agent (and search_agent) at fake models and search."""
+    from ..agents.search import search_agent
+
+    for agent in [*iter_agents(root_agent), search_agent]:
+        if hasattr(agent, "model"):
+            agent.model = FakeLlm(agent_name=agent.name, backend=backend)
+    search_agent.tools = [make_fake_google_search(backend)]
+
+
+__all__ = [
+    'ConversationScript',
+    'FakeBackend',
+    'FakeLlm',
+    'FakeQuota',
+    'LatencyModel',
+    'current_script',
+    'install_fakes',
+    'iter_agents',
+]
@@ -0,0 +1,377 @@
+# Architecture Assistant - Offline Conversation Benchmark
+#
+# Drives scripted multi-turn conversations through root_agent with fake
+# models and a fake google_search, then reports throughput, model calls,
+# tokens, per-agent latency percentiles and loop iteration counts. Results
+# are written as JSON so runs can be compared between commits.
+#
+#   python -m architecture_assistant.benchmarks.harness --conversations 5
+#   python -m architecture_assistant.benchmarks.harness --compare old.json
+#   python -m architecture_assistant.benchmarks.harness --record run.cassette.json.gz
+#   python -m architecture_assistant.benchmarks.harness --replay run.cassette.json.gz
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+
+from .fake_llm import (ConversationScript, FakeBackend, LatencyModel,
+                       current_script, install_fakes)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCENARIO_DIR = os.path.join(BENCH_DIR, "scenarios")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+APP_NAME = "architecture_assistant_bench"
+
+# Loop agent -> the sub-agent that starts each iteration
+LOOP_AGENTS = {
+    "architecture_loop_agent": "analyze_requirements_agent",
+    "education_loop_agent": "tradeoff_educator_agent",
+}
+
+
+def configure_offline_environment():
+    """Keep every service local; must run before the agents are imported."""
+    os.environ.setdefault("PROMPT_CACHE_BACKEND", "local")
+    os.environ.setdefault("SEARCH_CACHE_PATH", ":memory:")
+    os.environ.setdefault("RESPONSE_CACHE_PATH", ":memory:")
+    os.environ.setdefault("KNOWLEDGE_INDEX_PATH",
+                          os.path.join(tempfile.gettempdir(), "architecture_assistant_knowledge"))
+
+
+def load_scenario(name_or_path):
+    path = name_or_path
+    if not os.path.exists(path):
+        path = os.path.join(SCENARIO_DIR, f"{name_or_path}.json")
+    with open(path) as f:
+        return json.load(f)
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def count_loop_iterations(events):
+    """Iterations per loop, counted from switches to its first sub-agent."""
+    iterations = defaultdict(int)
+    previous = None
+    for event in events:
+        for loop, first in LOOP_AGENTS.items():
+            if event.author == first and previous != first:
+                iterations[loop] += 1
+        previous = event.author
+    return dict(iterations)
+
+
+def _has_text(event):
+    return bool(event.content and any(p.text for p in event.content.parts or []))
+
+
+async def run_conversation(runner, scenario, conversation_id, run_config=None):
+    from google.genai import types
+
+    script = ConversationScript(scenario["responses"], scenario.get("defaults"),
+                                conversation_id)
+    current_script.set(script)
+    session = await runner.session_service.create_session(
+        app_name=APP_NAME, user_id=f"user-{conversation_id}")
+    turns = []
+    for index, message in enumerate(scenario["turns"]):
+        started = time.perf_counter()
+        events = []
+        ttft = None
+        error = None
+        try:
+            async for event in runner.run_async(
+                    user_id=session.user_id, session_id=session.id,
+                    new_message=types.Content(role="user", parts=[types.Part(text=message)]),
+                    run_config=run_config):
+                if ttft is None and event.author != "user" and _has_text(event):
+                    ttft = time.perf_counter() - started
+                if not event.partial:
+                    events.append(event)
+        except Exception as exc:  # e.g. quota errors; the conversation goes on
+            error = f"{type(exc).__name__}: {exc}"[:200]
+        turns.append({
+            "conversation": conversation_id,
+            "turn": index,
+            "wall_s": time.perf_counter() - started,
+            "ttft_s": ttft,
+            "events": len(events),
+            "authors": sorted({e.author for e in events if e.author != "user"}),
+            "loop_iterations": count_loop_iterations(events),
+            "error": error,
+        })
+    return turns
+
+
+async def run_benchmark(scenario, conversations=1, concurrency=1, backend=None,
+                        root_agent=None, run_config=None, record=None, live=False):
+    """Run the scenario and return the results dict.
+
+    Args:
+        backend: A FakeBackend, or a cassette.ReplayBackend to answer every
+            model call and search from its cassette.
+        record: Cassette to record the run's model calls and searches into.
+        live: Keep the agents' real models and search (for recording).
+    """
+    from google.adk.agents.run_config import StreamingMode
+    from google.adk.runners import InMemoryRunner
+
+    from .cassette import ReplayBackend, install_recorder, install_replay
+
+    if root_agent is None:
+        from ..agent import root_agent
+    backend = backend or FakeBackend(search_results=scenario.get("search_results"))
+    if isinstance(backend, ReplayBackend):
+        install_replay(root_agent, backend)
+    elif not live:
+        install_fakes(root_agent, backend)
+    if record is not None:
+        install_recorder(root_agent, record, log=backend.calls if live else None)
+    runner = InMemoryRunner(agent=root_agent, app_name=APP_NAME)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def bounded(conversation_id):
+        async with semaphore:
+            return await run_conversation(runner, scenario, conversation_id, run_config)
+
+    started = time.perf_counter()
+    per_conversation = await asyncio.gather(*(bounded(i) for i in range(conversations)))
+    wall = time.perf_counter() - started
+    turns = [t for conv in per_conversation for t in conv]
+    streaming = bool(run_config and run_config.streaming_mode != StreamingMode.NONE)
+    results = summarize(scenario, turns, backend, wall, conversations, concurrency, streaming)
+    if isinstance(backend, ReplayBackend):
+        results["summary"]["cassette"] = backend.cassette.stats()
+    return results
+
+
+def summarize(scenario, turns, backend, wall, conversations, concurrency, streaming=False):
+    calls = backend.calls
+    per_agent = defaultdict(list)
+    for call in calls:
+        per_agent[call["agent"]].append(call)
+
+    loops = defaultdict(list)
+    for turn in turns:
+        for loop, count in turn["loop_iterations"].items():
+            loops[loop].append(count)
+
+    def ms(values, pct):
+        value = percentile(values, pct)
+        return None if value is None else round(value * 1000, 2)
+
+    turn_walls = [t["wall_s"] for t in turns]
+    turn_ttfts = [t["ttft_s"] for t in turns if t["ttft_s"] is not None]
+    tokens_in = sum(c["input_tokens"] for c in calls)
+    tokens_out = sum(c["output_tokens"] for c in calls)
+    return {
+        "scenario": scenario["name"],
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {
+            "conversations": conversations,
+            "concurrency": concurrency,
+            "time_scale": backend.time_scale,
+            "median_latency_ms": backend.latency.median_ms,
+            "latency_sigma": backend.latency.sigma,
+            "streaming": streaming,
+        },
+        "summary": {
+            "turns": len(turns),
+            "failed_turns": sum(1 for t in turns if t.get("error")),
+            "wall_s": round(wall, 4),
+            "turns_per_second": round(len(turns) / wall, 3) if wall else None,
+            "model_calls": len(calls),
+            "model_calls_per_turn": round(len(calls) / len(turns), 3) if turns else None,
+            "search_calls": len(backend.search_calls),
+            "prefetch": _prefetch_stats(),
+            "explanations": _explanation_stats(),
+            "rate_limit": _rate_limit_stats(),
+            "search_hedging": _search_hedging_stats(),
+            "knowledge": _knowledge_stats(),
+            "response_cache": _response_cache_stats(),
+            "replanning": _replanning_stats(),
+            "input_tokens_per_conversation": tokens_in // max(1, conversations),
+            "cached_tokens_per_conversation": sum(c["cached_tokens"] for c in calls) // max(1, conversations),
+            "output_tokens_per_conversation": tokens_out // max(1, conversations),
+            "turn_latency_p50_ms": ms(turn_walls, 50),
+            "turn_latency_p95_ms": ms(turn_walls, 95),
+            "turn_latency_p99_ms": ms(turn_walls, 99),
+            "turn_ttft_p50_ms": ms(turn_ttfts, 50),
+            "turn_ttft_p95_ms": ms(turn_ttfts, 95),
+        },
+        "per_agent": {
+            agent: {
+                "calls": len(agent_calls),
+                "p50_ms": ms([c["wall_s"] for c in agent_calls], 50),
+                "p95_ms": ms([c["wall_s"] for c in agent_calls], 95),
+                "p99_ms": ms([c["wall_s"] for c in agent_calls], 99),
+                "input_tokens": sum(c["input_tokens"] for c in agent_calls),
+                "output_tokens": sum(c["output_tokens"] for c in agent_calls),
+            }
+            for agent, agent_calls in sorted(per_agent.items())
+        },
+        "loop_iterations": {
+            loop: {"runs": len(counts), "mean": statistics.mean(counts), "max": max(counts)}
+            for loop, counts in sorted(loops.items())
+        },
+        "turns": turns,
+    }
+
+
+def _prefetch_stats():
+    from ..agents.search import default_prefetcher
+
+    prefetcher = default_prefetcher()
+    return prefetcher.stats() if prefetcher is not None else None
+
+
+def _explanation_stats():
+    from ..agents.education import explanation_cache
+
+    return explanation_cache.stats() if explanation_cache is not None else None
+
+
+def _response_cache_stats():
+    from ..agents.reuse import default_response_cache
+
+    cache = default_response_cache()
+    return cache.stats() if cache is not None else None
+
+
+def _replanning_stats():
+    from ..agents.replanning import replan_stats
+
+    return replan_stats.stats()
+
+
+def _knowledge_stats():
+    from ..agents.search import default_knowledge_index
+
+    index = default_knowledge_index()
+    return index.stats() if index is not None else None
+
+
+def _search_hedging_stats():
+    from ..agents.search import search_agent_tool
+
+    hedger = search_agent_tool.hedger
+    return hedger.stats() if hedger is not None else None
+
+
+def _rate_limit_stats():
+    from ..services.rate_limit import default_rate_limiter
+
+    limiter = default_rate_limiter()
+    return limiter.stats() if limiter is not None else None
+
+
+def compare(current, baseline):
+    """Print summary metrics side by side with a baseline result file."""
+    print(f"\n{'metric':<34}{'baseline':>14}{'current':>14}{'change':>10}")
+    for key, value in current["summary"].items():
+        old = baseline.get("summary", {}).get(key)
+        if not isinstance(value, (int, float)) or not isinstance(old, (int, float)):
+            continue
+        change = f"{(value - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"{key:<34}{old:>14}{value:>14}{change:>10}")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline conversation benchmark")
+    parser.add_argument("--scenario", default="pawpals")
+    parser.add_argument("--conversations", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--median-ms", type=float, default=800.0)
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--time-scale", type=float, default=0.01,
+                        help="Multiplier on simulated latency (0 = no sleeping)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stream", action="store_true",
+                        help="Use SSE streaming (reports time to first token per turn)")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/)")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    cassettes = parser.add_mutually_exclusive_group()
+    cassettes.add_argument("--record", metavar="CASSETTE",
+                           help="Also record every model call and search into this cassette")
+    cassettes.add_argument("--replay", metavar="CASSETTE",
+                           help="Replay a recorded cassette offline instead of the fakes")
+    parser.add_argument("--live", action="store_true",
+                        help="With --record: use the real models and search (needs API access)")
+    parser.add_argument("--replay-latency", choices=("none", "recorded"), default="none",
+                        help="With --replay: full speed, or wait as long as each recorded "
+                             "response took")
+    args = parser.parse_args()
+    if args.live and not args.record:
+        parser.error("--live needs --record")
+
+    from .cassette import Cassette, ReplayBackend
+
+    configure_offline_environment()
+    record = None
+    if args.replay:
+        cassette = Cassette.load(args.replay)
+        scenario = cassette.scenario_dict()
+        args.conversations = cassette.conversations
+        backend = ReplayBackend(cassette, time_scale=1.0 if args.replay_latency == "recorded"
+                                else 0.0)
+    else:
+        scenario = load_scenario(args.scenario)
+        backend = FakeBackend(
+            latency=LatencyModel(args.median_ms, args.sigma),
+            time_scale=0.0 if args.live else args.time_scale,
+            search_results=scenario.get("search_results"),
+            seed=args.seed,
+        )
+        if args.record:
+            record = Cassette(scenario["name"], scenario["turns"], args.conversations,
+                              meta={"commit": _git_commit(), "live": args.live,
+                                    "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S")})
+    run_config = None
+    if args.stream:
+        from google.adk.agents.run_config import RunConfig, StreamingMode
+        run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+    results = asyncio.run(run_benchmark(scenario, args.conversations,
+                                        args.concurrency, backend, run_config=run_config,
+                                        record=record, live=args.live))
+    if record is not None:
+        record.save(args.record)
+        print(f"Recorded {len(record.calls)} model calls and {len(record.searches)} searches "
+              f"to {args.record}")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{scenario['name']}-{results['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(json.dumps({k: results[k] for k in ("summary", "per_agent", "loop_iterations")},
+                     indent=2))
+    print(f"\nSaved {output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
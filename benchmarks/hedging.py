@@ -0,0 +1,103 @@
+# Architecture Assistant - Hedged Search Benchmark
+#
+# Runs scripted conversations with a heavy-tailed fake google_search (a few
+# percent of searches take --tail-factor times the median) without and with
+# hedging of search_agent_tool calls, then hedged with a per-search deadline.
+# Reports per-search p50/p90/p99, how often a duplicate was started and won,
+# the extra search_agent model calls the duplicates cost, and searches cut
+# off by the deadline (those fall back to partial results).
+#
+#   python -m architecture_assistant.benchmarks.hedging
+#   python -m architecture_assistant.benchmarks.hedging --tail-probability 0.1 --deadline-s 10
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+
+from .fake_llm import FakeBackend, LatencyModel
+from .harness import configure_offline_environment, load_scenario, run_benchmark
+
+
+def run_mode(hedging, deadline_s, scenario, args):
+    from ..agents import search
+    from ..services.hedging import Hedger
+
+    search._default_hedger = Hedger(hedging=hedging, min_samples=args.min_samples,
+                                    max_hedge_fraction=args.max_hedge_fraction,
+                                    deadline_s=deadline_s * args.time_scale or None)
+    backend = FakeBackend(
+        latency=LatencyModel(args.median_ms),
+        search_latency=LatencyModel(args.search_median_ms, sigma=0.4,
+                                    tail_probability=args.tail_probability,
+                                    tail_factor=args.tail_factor),
+        time_scale=args.time_scale, search_results=scenario.get("search_results"),
+        seed=args.seed)
+    result = asyncio.run(run_benchmark(scenario, args.conversations, args.concurrency,
+                                       backend=backend))
+    summary = result["summary"]
+    return {
+        **summary["search_hedging"],
+        "search_model_calls": sum(1 for c in backend.calls if c["agent"] == "search_agent"),
+        "turn_latency_p95_ms": summary["turn_latency_p95_ms"],
+        "failed_turns": summary["failed_turns"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hedged search benchmark")
+    parser.add_argument("--scenario", default="pawpals")
+    parser.add_argument("--conversations", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--median-ms", type=float, default=800.0, help="Model call median")
+    parser.add_argument("--search-median-ms", type=float, default=1500.0)
+    parser.add_argument("--tail-probability", type=float, default=0.06)
+    parser.add_argument("--tail-factor", type=float, default=15.0)
+    parser.add_argument("--min-samples", type=int, default=20)
+    parser.add_argument("--max-hedge-fraction", type=float, default=0.2)
+    parser.add_argument("--deadline-s", type=float, default=12.0,
+                        help="Per-search deadline in simulated seconds for the last mode")
+    parser.add_argument("--time-scale", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    # Every search should reach search_agent: no prefetching, no cache, index or
+    # reused-deliverable hits
+    os.environ.setdefault("PREFETCH_ENABLED", "false")
+    os.environ.setdefault("KNOWLEDGE_INDEX_ENABLED", "false")
+    os.environ.setdefault("SEARCH_CACHE_TTL_SECONDS", "0")
+    os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+    configure_offline_environment()
+    from ..agents import search
+
+    search.logger.setLevel(logging.ERROR)  # Deadline warnings are expected
+    scenario = load_scenario(args.scenario)
+    results = {}
+    modes = (("baseline", False, 0), ("hedged", True, 0), ("deadline", True, args.deadline_s))
+    for mode, hedging, deadline_s in modes:
+        r = results[mode] = run_mode(hedging, deadline_s, scenario, args)
+        print(f"{mode:<9} searches {r['calls']:>4}  p50 {r['p50_ms']:>7.1f} ms  "
+              f"p90 {r['p90_ms']:>7.1f} ms  p99 {r['p99_ms']:>7.1f} ms  "
+              f"hedges {r['hedges']:>3} (won {r['hedge_wins']:>3})  "
+              f"deadline {r['deadlines_exceeded']:>2}  search model calls {r['search_model_calls']:>4}")
+    base, hedged = results["baseline"], results["hedged"]
+    if base["p99_ms"] and hedged["p99_ms"]:
+        extra = hedged["search_model_calls"] / max(1, base["search_model_calls"]) - 1
+        change = hedged["p99_ms"] / base["p99_ms"] - 1
+        print(f"p99 {base['p99_ms']:.0f} -> {hedged['p99_ms']:.0f} ms "
+              f"({abs(change):.0%} {'higher' if change > 0 else 'lower'}); duplicates started for "
+              f"{hedged['duplicate_overhead']:.0%} of searches, {extra:+.0%} search model calls")
+    if hedged["calls"] < args.min_samples:
+        print(f"warning: only {hedged['calls']} searches in the hedged run; the learned hedge "
+              f"delay needs --min-samples ({args.min_samples}), so hedging barely ran")
+    elif not hedged["hedges"]:
+        print("warning: no hedges were started, so these figures don't measure hedging")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Architecture Assistant - Import-Time Benchmark
+#
+# Reports cold-start milliseconds per module. Every sample runs in a fresh
+# interpreter so nothing is already cached in sys.modules.
+#
+#   python -m architecture_assistant.benchmarks.import_time [--runs 5] [--json out.json]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = os.path.basename(PACKAGE_DIR)
+
+# (label, statement) pairs; each is timed in its own interpreter
+TARGETS = [
+    ("package", f"import {PACKAGE}"),
+    ("package.agents", f"import {PACKAGE}.agents"),
+    ("agents.orchestrator (prompts only)", f"import {PACKAGE}.agents.orchestrator"),
+    ("agents.search", f"import {PACKAGE}.agents.search"),
+    ("agents.education", f"import {PACKAGE}.agents.education"),
+    ("agents.technical", f"import {PACKAGE}.agents.technical"),
+    ("agents.discovery", f"import {PACKAGE}.agents.discovery"),
+    ("agents.planning", f"import {PACKAGE}.agents.planning"),
+    ("agent (root_agent, full tree)", f"import {PACKAGE}.agent"),
+    ("google.adk Agent (baseline)", "from google.adk import Agent"),
+]
+
+_SNIPPET = """
+import sys, time
+sys.path.insert(0, {path!r})
+start = time.perf_counter()
+{statement}
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def time_import(statement, runs):
+    samples = []
+    for _ in range(runs):
+        code = _SNIPPET.format(path=os.path.dirname(PACKAGE_DIR), statement=statement)
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                             text=True, check=True)
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples),
+            "max_ms": max(samples), "runs": runs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for label, statement in TARGETS:
+        results[label] = time_import(statement, args.runs)
+        r = results[label]
+        print(f"{label:<40} {r['median_ms']:8.1f} ms  (min {r['min_ms']:.1f}, max {r['max_ms']:.1f})")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# Architecture Assistant - Knowledge Index Benchmark
+#
+# Index build time (cold, unchanged, one file edited) over the curated
+# documents replicated --copies times, query latency, and the share of web
+# searches the index avoids in scripted conversations (index off vs. on).
+#
+#   python -m architecture_assistant.benchmarks.knowledge
+#   python -m architecture_assistant.benchmarks.knowledge --copies 200 --embeddings off
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from .fake_llm import FakeBackend, LatencyModel
+from .harness import configure_offline_environment, load_scenario, run_benchmark
+
+# Research questions agents ask besides the scenario's own searches
+EXTRA_QUERIES = [
+    "how many developers do I need for an MVP",
+    "freelancers vs agency for building an app",
+    "how much does hosting cost for an MVP",
+    "monthly running costs of a marketplace app",
+    "when should a startup move to microservices",
+    "typical SaaS MVP timeline with billing",
+    "GDPR rules for storing health data in Germany",
+    "app store review times for new apps",
+]
+
+
+def make_corpus(directory, copies):
+    from ..agents.search import KNOWLEDGE_DIR
+
+    for copy in range(copies):
+        for name in os.listdir(KNOWLEDGE_DIR):
+            stem, ext = os.path.splitext(name)
+            shutil.copy(os.path.join(KNOWLEDGE_DIR, name),
+                        os.path.join(directory, f"{stem}_{copy}{ext}"))
+
+
+def bench_build(args, workdir):
+    from ..services.embeddings import embedder_from_env
+    from ..services.knowledge_index import KnowledgeIndex
+
+    corpus = os.path.join(workdir, "corpus")
+    os.makedirs(corpus)
+    make_corpus(corpus, args.copies)
+    index = KnowledgeIndex(os.path.join(workdir, "index"), embedder=embedder_from_env())
+    builds = {"cold": index.build([corpus]), "unchanged": index.build([corpus])}
+    edited = os.path.join(corpus, sorted(os.listdir(corpus))[0])
+    with open(edited, "a") as f:
+        f.write("\n\n## Update\nAdded after the first build.\n")
+    builds["one_file_edited"] = index.build([corpus])
+    started = time.perf_counter()
+    KnowledgeIndex(index.path, embedder=index.embedder).load()
+    builds["load_s"] = round(time.perf_counter() - started, 4)
+    return index, builds
+
+
+def bench_queries(index, queries, repeat):
+    timings = []
+    for _ in range(repeat):
+        for query in queries:
+            started = time.perf_counter()
+            index.answer(query)
+            timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {
+        "queries": len(timings),
+        "p50_ms": round(statistics.median(timings) * 1000, 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(0.99 * len(timings)))] * 1000, 3),
+        "answered_rate": round(index.answered / index.lookups, 3),
+    }
+
+
+def run_mode(enabled, scenario, args):
+    from ..agents import search
+    from ..services.search_cache import default_search_cache
+
+    default_search_cache().clear()
+    os.environ["KNOWLEDGE_INDEX_ENABLED"] = "true" if enabled else "false"
+    search._default_knowledge_index = search._UNSET
+    search._default_prefetcher = search._UNSET  # Its semaphore belongs to the previous loop
+    backend = FakeBackend(latency=LatencyModel(args.median_ms), time_scale=args.time_scale,
+                          search_results=scenario.get("search_results"))
+    result = asyncio.run(run_benchmark(scenario, args.conversations, args.concurrency,
+                                       backend=backend))
+    summary = result["summary"]
+    return {
+        "web_searches": len(backend.search_calls),
+        "search_model_calls": sum(1 for c in backend.calls if c["agent"] == "search_agent"),
+        "model_calls": summary["model_calls"],
+        "turn_latency_p50_ms": summary["turn_latency_p50_ms"],
+        "turn_latency_p95_ms": summary["turn_latency_p95_ms"],
+        "knowledge": summary["knowledge"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge index benchmark")
+    parser.add_argument("--scenario", default="pawpals")
+    parser.add_argument("--copies", type=int, default=50,
+                        help="Times the curated documents are replicated for the build test")
+    parser.add_argument("--embeddings", choices=["local", "off"], default="local")
+    parser.add_argument("--conversations", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--median-ms", type=float, default=800.0)
+    parser.add_argument("--time-scale", type=float, default=0.05)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    os.environ["EMBEDDINGS_BACKEND"] = args.embeddings
+    configure_offline_environment()
+    scenario = load_scenario(args.scenario)
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        index, results["build"] = bench_build(args, workdir)
+        for name, b in results["build"].items():
+            if isinstance(b, dict):
+                print(f"build {name:<16} {b['files']:>5} files  {b['changed']:>5} changed  "
+                      f"{b['chunks']:>6} chunks  {b['seconds'] * 1000:>8.1f} ms")
+        print(f"load index            {results['build']['load_s'] * 1000:>8.1f} ms")
+        queries = [*_scenario_queries(scenario), *EXTRA_QUERIES]
+        r = results["queries"] = bench_queries(index, queries, repeat=20)
+        print(f"query ({r['queries']} lookups)  p50 {r['p50_ms']:.3f} ms  p99 {r['p99_ms']:.3f} ms  "
+              f"answered locally {r['answered_rate']:.0%}")
+
+    for mode, enabled in (("web only", False), ("index first", True)):
+        r = results[mode] = run_mode(enabled, scenario, args)
+        print(f"{mode:<12} web searches {r['web_searches']:>4}  search model calls "
+              f"{r['search_model_calls']:>4}  turn p50 {r['turn_latency_p50_ms']:>7.1f} ms  "
+              f"p95 {r['turn_latency_p95_ms']:>7.1f} ms")
+    before, after = results["web only"]["web_searches"], results["index first"]["web_searches"]
+    if before:
+        print(f"web searches avoided: {1 - after / before:.0%}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+def _scenario_queries(scenario):
+    """Search requests the scenario's scripted agents send."""
+    queries = []
+    for items in scenario.get("responses", {}).values():
+        for item in items:
+            call_args = item.get("call", {}).get("args", {}) if isinstance(item, dict) else {}
+            queries.extend(call_args.get("queries", []))
+            if "request" in call_args:
+                queries.append(call_args["request"])
+    return queries
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# Architecture Assistant - Multi-Process Load Test
+#
+# Starts the cluster front end (server/cluster.py) with 1, 2, 4... workers,
+# each serving root_agent with the scripted fake models, and drives many
+# concurrent simulated founders through a scenario over SSE. Reports turns
+# per second and turn latency per worker count, to show how throughput
+# scales with processes on one machine.
+#
+#   python -m architecture_assistant.benchmarks.load_test --workers 1,2,4 --users 40
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from .fake_llm import ConversationScript, FakeBackend, LatencyModel, current_script
+from .harness import configure_offline_environment, load_scenario, percentile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE = __package__.rsplit(".", 1)[0]
+PACKAGE_PARENT = os.path.dirname(os.path.dirname(BENCH_DIR))
+
+
+class ScriptPerSession:
+    """ASGI wrapper giving each session its own copy of the scenario script."""
+
+    def __init__(self, app, scenario):
+        self.app = app
+        self.scenario = scenario
+        self.scripts = {}
+
+    async def __call__(self, scope, receive, send):
+        parts = scope.get("path", "").split("/")
+        if scope["type"] in ("http", "websocket") and len(parts) > 2 and parts[1] == "sessions":
+            script = self.scripts.get(parts[2])
+            if script is None:
+                script = self.scripts[parts[2]] = ConversationScript(
+                    self.scenario["responses"], self.scenario.get("defaults"), parts[2])
+            current_script.set(script)
+        await self.app(scope, receive, send)
+
+
+def fake_app():
+    """Worker app factory: the streaming app with fake models and search."""
+    configure_offline_environment()
+    from ..agent import root_agent
+    from ..server.streaming import create_app
+    from .fake_llm import install_fakes
+
+    scenario = load_scenario(os.getenv("LOAD_TEST_SCENARIO", "pawpals"))
+    backend = FakeBackend(
+        latency=LatencyModel(float(os.getenv("LOAD_TEST_MEDIAN_MS", "800"))),
+        time_scale=float(os.getenv("LOAD_TEST_TIME_SCALE", "0.01")),
+        search_results=scenario.get("search_results"),
+    )
+    install_fakes(root_agent, backend)
+    return ScriptPerSession(create_app(root_agent), scenario)
+
+
+async def run_user(client, base_url, scenario, turns):
+    session = (await client.post(f"{base_url}/sessions", json={})).json()
+    for message in scenario["turns"]:
+        started = time.perf_counter()
+        done, errors = None, 0
+        async with client.stream("POST", f"{base_url}/sessions/{session['session_id']}/messages",
+                                 json={"message": message}) as response:
+            async for line in response.aiter_lines():
+                if line.startswith("data:"):
+                    payload = json.loads(line[5:])
+                    if payload["type"] == "done":
+                        done = payload
+                    errors += payload["type"] == "error"
+        turns.append({"wall_s": time.perf_counter() - started,
+                      "ttft_ms": done and done["ttft_ms"], "errors": errors})
+
+
+async def drive(base_url, scenario, users):
+    turns = []
+    async with httpx.AsyncClient(timeout=None, limits=httpx.Limits(max_connections=None)) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(run_user(client, base_url, scenario, turns)
+                               for _ in range(users)))
+        wall = time.perf_counter() - started
+    walls = [t["wall_s"] for t in turns]
+    ttfts = [t["ttft_ms"] for t in turns if t["ttft_ms"] is not None]
+    return {
+        "turns": len(turns),
+        "errors": sum(t["errors"] for t in turns),
+        "wall_s": round(wall, 3),
+        "turns_per_second": round(len(turns) / wall, 2),
+        "turn_p50_ms": round(percentile(walls, 50) * 1000, 1),
+        "turn_p95_ms": round(percentile(walls, 95) * 1000, 1),
+        "ttft_p50_ms": percentile(ttfts, 50),
+    }
+
+
+def wait_healthy(base_url, process, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Cluster exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/healthz").json().get("status") == "ok":
+                return
+        except (httpx.TransportError, ValueError):
+            pass
+        time.sleep(0.2)
+    raise TimeoutError("Cluster did not become healthy")
+
+
+def run_cluster(workers, args, scenario):
+    base_url = f"http://127.0.0.1:{args.port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ,
+               "SESSION_DB_PATH": os.path.join(tmp, "sessions.sqlite3"),
+               "LOAD_TEST_SCENARIO": args.scenario,
+               "LOAD_TEST_TIME_SCALE": str(args.time_scale),
+               "LOAD_TEST_MEDIAN_MS": str(args.median_ms),
+               "PYTHONPATH": os.pathsep.join(filter(None, [PACKAGE_PARENT,
+                                                           os.getenv("PYTHONPATH")]))}
+        process = subprocess.Popen(
+            [sys.executable, "-m", f"{PACKAGE}.server.cluster", "--workers", str(workers),
+             "--port", str(args.port), "--worker-base-port", str(args.port + 100),
+             "--app-factory", f"{__package__}.load_test:fake_app"],
+            cwd=PACKAGE_PARENT, env=env)
+        try:
+            wait_healthy(base_url, process)
+            return asyncio.run(drive(base_url, scenario, args.users))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-process load test")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--users", type=int, default=40, help="Concurrent simulated users")
+    parser.add_argument("--scenario", default="pawpals")
+    parser.add_argument("--time-scale", type=float, default=0.01,
+                        help="Multiplier on simulated model latency (0 = CPU only)")
+    parser.add_argument("--median-ms", type=float, default=800.0)
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario)
+    results, baseline = {}, None
+    for workers in [int(w) for w in args.workers.split(",")]:
+        r = results[workers] = run_cluster(workers, args, scenario)
+        baseline = baseline or r["turns_per_second"]
+        print(f"{workers:>2} workers  {r['turns_per_second']:>8.2f} turns/s  "
+              f"(x{r['turns_per_second'] / baseline:.2f})  p50 {r['turn_p50_ms']} ms  "
+              f"p95 {r['turn_p95_ms']} ms  ttft p50 {r['ttft_p50_ms']} ms  errors {r['errors']}")
+    print(f"CPUs available: {os.cpu_count()}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
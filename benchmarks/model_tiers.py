@@ -0,0 +1,98 @@
+# Architecture Assistant - Model Tier Benchmark
+#
+# Runs a scenario with every agent on one tier, and with the tiered
+# assignments from agents/models.py, using per-model simulated latency.
+# Reports loop wall time (the education and architecture loops, where the
+# lite gatekeepers sit), overall turn latency, estimated model cost and how
+# often budgets forced a fallback.
+#
+#   python -m architecture_assistant.benchmarks.model_tiers
+#   python -m architecture_assistant.benchmarks.model_tiers --degrade standard=6
+
+import argparse
+import asyncio
+import json
+
+from .fake_llm import FakeBackend, LatencyModel
+from .harness import configure_offline_environment, load_scenario, percentile, run_benchmark
+
+# Simulated median latency per tier (ms)
+TIER_LATENCY_MS = {"lite": 350.0, "standard": 800.0, "advanced": 2500.0}
+
+
+def make_registry(config, time_scale):
+    """Fresh registry for a config; latency budgets follow the time scale."""
+    from ..agents.models import AGENT_BUDGETS, AGENT_TIERS
+    from ..services.model_tiers import ModelRegistry, TierBudget
+
+    if config == "tiered":
+        assignments = dict(AGENT_TIERS)
+    else:
+        assignments = {agent: config for agent in AGENT_TIERS}
+    budgets = {agent: TierBudget(budget.latency_ms and budget.latency_ms * time_scale,
+                                 budget.cost_usd)
+               for agent, budget in AGENT_BUDGETS.items()}
+    return ModelRegistry(assignments=assignments, budgets=budgets, default_tier="standard",
+                         min_calls=2)
+
+
+def run_config(config, scenario, args, degrade):
+    from ..agents import models
+    from ..services.search_cache import default_search_cache
+
+    default_search_cache().clear()  # Every config starts cold
+    registry = models.model_registry = make_registry(config, args.time_scale)
+    model_latency = {tier.model: LatencyModel(TIER_LATENCY_MS[tier.name]
+                                              * degrade.get(tier.name, 1.0))
+                     for tier in registry.tiers}
+    backend = FakeBackend(model_latency=model_latency, time_scale=args.time_scale,
+                          search_results=scenario.get("search_results"))
+    # One conversation at a time, so latency reflects the models, not CPU contention
+    result = asyncio.run(run_benchmark(scenario, args.conversations, 1, backend=backend))
+    loop_walls = {}
+    for turn in result["turns"]:
+        for loop in turn["loop_iterations"]:
+            loop_walls.setdefault(loop, []).append(turn["wall_s"])
+    cost = sum(registry.cost(c["model"], c["input_tokens"], c["output_tokens"])
+               for c in backend.calls)
+    return {
+        "loop_turn_p50_ms": {loop: round(percentile(walls, 50) * 1000, 1)
+                             for loop, walls in sorted(loop_walls.items())},
+        "turn_latency_p50_ms": result["summary"]["turn_latency_p50_ms"],
+        "cost_usd_per_conversation": round(cost / args.conversations, 5),
+        "fallbacks": sum(s["fallbacks"] for s in registry.stats().values()),
+        "calls_per_model": {model: sum(c["model"] == model for c in backend.calls)
+                            for model in sorted({c["model"] for c in backend.calls})},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model tier benchmark")
+    parser.add_argument("--scenario", default="pawpals")
+    parser.add_argument("--conversations", type=int, default=10)
+    parser.add_argument("--configs", default="standard,tiered,lite",
+                        help="Comma-separated: a tier name (all agents) or 'tiered'")
+    parser.add_argument("--time-scale", type=float, default=0.2)
+    parser.add_argument("--degrade", default="",
+                        help="tier=factor pairs slowing a tier down, e.g. standard=6")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    configure_offline_environment()
+    scenario = load_scenario(args.scenario)
+    degrade = {k: float(v) for k, v in
+               (pair.split("=") for pair in args.degrade.split(",") if "=" in pair)}
+    results = {}
+    for config in args.configs.split(","):
+        r = results[config] = run_config(config, scenario, args, degrade)
+        loops = "  ".join(f"{loop.removesuffix('_loop_agent')} {ms:>7.1f} ms"
+                          for loop, ms in r["loop_turn_p50_ms"].items())
+        print(f"{config:<9} loop turn p50: {loops}  turn p50 {r['turn_latency_p50_ms']:>7.1f} ms  "
+              f"${r['cost_usd_per_conversation']:.5f}/conversation  fallbacks {r['fallbacks']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Architecture Assistant - Prompt Token Report
+#
+# Tokens in every LLM agent's instruction, against the budgets in
+# agents/prompts.py. Instructions are sent with every model call, so each
+# token here is paid on every turn. --check exits non-zero when an agent is
+# over budget; --compare shows the change against a saved report.
+#
+#   python -m architecture_assistant.benchmarks.prompt_tokens
+#   python -m architecture_assistant.benchmarks.prompt_tokens --check
+#   python -m architecture_assistant.benchmarks.prompt_tokens --json new.json --compare old.json
+#   python -m architecture_assistant.benchmarks.prompt_tokens --tokenizer gemini  # needs sentencepiece
+
+import argparse
+import json
+import sys
+
+from .fake_llm import iter_agents
+
+
+def make_counter(tokenizer):
+    if tokenizer == "gemini":
+        # Gemini's own tokenizer; downloads its vocabulary on first use
+        from google.genai.local_tokenizer import LocalTokenizer
+
+        local = LocalTokenizer(model_name="gemini-2.0-flash")
+        return lambda text: local.count_tokens(text).total_tokens
+    from ..services.tokens import estimate_tokens
+
+    return estimate_tokens
+
+
+def instructions():
+    """{agent name: instruction} for every LLM agent with a static instruction."""
+    from ..agent import root_agent
+    from ..agents.search import search_agent
+
+    return {agent.name: agent.instruction
+            for agent in [*iter_agents(root_agent), search_agent]
+            if isinstance(getattr(agent, "instruction", None), str) and agent.instruction}
+
+
+def prompt_report(count):
+    from ..agents import education, discovery, planning, technical
+    from ..agents.prompts import prompt_token_budget
+    from ..services.prompts import CompiledPrompt
+
+    # Agents keep plain strings; the compiled prompts carry the fragment list
+    compiled = {p: p.fragments for module in (education, discovery, planning, technical)
+                for p in vars(module).values() if isinstance(p, CompiledPrompt)}
+    report = {}
+    for name, instruction in instructions().items():
+        tokens = count(instruction)
+        budget = prompt_token_budget(name)
+        report[name] = {
+            "tokens": tokens,
+            "budget": budget,
+            "over_budget": budget is not None and tokens > budget,
+            "fragments": list(compiled.get(instruction, ())),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt token report")
+    parser.add_argument("--tokenizer", choices=["estimate", "gemini"], default="estimate")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with status 1 if any agent is over its budget")
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--compare", help="Earlier report JSON to compare against")
+    args = parser.parse_args()
+
+    report = prompt_report(make_counter(args.tokenizer))
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print(f"{'agent':<32}{'before':>8}{'tokens':>8}{'budget':>8}  fragments")
+    for name, r in report.items():
+        before = baseline.get(name, {}).get("tokens", "")
+        flag = "  OVER BUDGET" if r["over_budget"] else ""
+        print(f"{name:<32}{before:>8}{r['tokens']:>8}{r['budget'] or '':>8}  "
+              f"{', '.join(r['fragments'])}{flag}")
+    total = sum(r["tokens"] for r in report.values())
+    total_before = sum(baseline[n]["tokens"] for n in report if n in baseline)
+    print(f"{'total':<32}{total_before or '':>8}{total:>8}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    over = [name for name, r in report.items() if r["over_budget"]]
+    if args.check and over:
+        print(f"Over budget: {', '.join(over)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
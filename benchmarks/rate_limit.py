@@ -0,0 +1,83 @@
+# Architecture Assistant - Rate Limiter Benchmark
+#
+# Runs concurrent scripted conversations against a fake model endpoint that
+# enforces a requests/tokens quota (429 RESOURCE_EXHAUSTED when exceeded),
+# without and with the priority rate limiter. Reports failed turns, turn
+# latency and, per priority, how long calls waited for quota. The quota
+# window is shortened (--window-s) so a short run actually reaches it.
+#
+#   python -m architecture_assistant.benchmarks.rate_limit
+#   python -m architecture_assistant.benchmarks.rate_limit --rpm 300 --conversations 12
+
+import argparse
+import asyncio
+import json
+import logging
+
+from .fake_llm import FakeBackend, FakeQuota, LatencyModel
+from .harness import configure_offline_environment, load_scenario, run_benchmark
+
+
+def run_mode(limited, scenario, args):
+    from ..agents import search
+    from ..services import rate_limit
+    from ..services.search_cache import default_search_cache
+
+    default_search_cache().clear()  # Same number of searches in every mode
+    search._default_prefetcher = search._UNSET  # Fresh prefetch budget and stats per mode
+    rate_limit._default_limiter = (
+        rate_limit.RateLimiter(rate_limit.LocalQuota(args.rpm, args.tpm, window_s=args.window_s),
+                               aging_s=args.aging_s)
+        if limited else None)
+    quota = FakeQuota(args.rpm, args.tpm, window_s=args.window_s)
+    backend = FakeBackend(latency=LatencyModel(args.median_ms), time_scale=args.time_scale,
+                          search_results=scenario.get("search_results"), quota=quota)
+    result = asyncio.run(run_benchmark(scenario, args.conversations, args.concurrency,
+                                       backend=backend))
+    summary = result["summary"]
+    return {
+        "failed_turns": summary["failed_turns"],
+        "rejected_calls": quota.rejected,
+        "model_calls": summary["model_calls"],
+        "wall_s": summary["wall_s"],
+        "turn_latency_p50_ms": summary["turn_latency_p50_ms"],
+        "turn_latency_p95_ms": summary["turn_latency_p95_ms"],
+        "rate_limit": summary["rate_limit"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate limiter benchmark")
+    parser.add_argument("--scenario", default="pawpals")
+    parser.add_argument("--conversations", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rpm", type=float, default=600.0, help="Requests per minute quota")
+    parser.add_argument("--tpm", type=float, default=0.0, help="Tokens per minute quota (0 = none)")
+    parser.add_argument("--window-s", type=float, default=2.0,
+                        help="Quota window; the per-minute limits are scaled to it")
+    parser.add_argument("--aging-s", type=float, default=1.0)
+    parser.add_argument("--median-ms", type=float, default=800.0)
+    parser.add_argument("--time-scale", type=float, default=0.05)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    configure_offline_environment()
+    logging.getLogger("google_adk").setLevel(logging.CRITICAL)  # 429 tracebacks are expected
+    scenario = load_scenario(args.scenario)
+    results = {}
+    for mode, limited in (("unlimited", False), ("limited", True)):
+        r = results[mode] = run_mode(limited, scenario, args)
+        print(f"{mode:<10} failed turns {r['failed_turns']:>3}  429s {r['rejected_calls']:>4}  "
+              f"calls {r['model_calls']:>4}  wall {r['wall_s']:>6.2f}s  "
+              f"turn p50 {r['turn_latency_p50_ms']:>8.1f} ms  p95 {r['turn_latency_p95_ms']:>8.1f} ms")
+    for priority, s in (results["limited"]["rate_limit"] or {}).items():
+        print(f"  {priority:<12} granted {s['granted']:>4}  throttled {s['throttled']:>4}  "
+              f"max queued {s['max_queued']:>3}  wait p50 {s['wait_p50_ms']:>7.1f} ms  "
+              f"p95 {s['wait_p95_ms']:>7.1f} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
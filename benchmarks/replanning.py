@@ -0,0 +1,239 @@
+# Architecture Assistant - Incremental Re-planning Benchmark
+#
+# Starts from an existing roadmap and architecture for the PawPals
+# requirements, changes one requirement at a time (budget, a dropped
+# must-have, a dropped nice-to-have, the city, the timeline) and asks the
+# agent to update its deliverable: once with a full regeneration and once
+# with only the affected sections rewritten. The scripted model writes the
+# sections it is asked for; simulated latency grows with output tokens.
+# Reports sections rewritten, the share of content reused and the
+# simulated latency of both.
+#
+#   python -m architecture_assistant.benchmarks.replanning
+#   python -m architecture_assistant.benchmarks.replanning --per-token-ms 25
+
+import argparse
+import asyncio
+import json
+import os
+
+from .fake_llm import ConversationScript, FakeBackend, LatencyModel, current_script, install_fakes
+from .harness import APP_NAME, configure_offline_environment
+from .response_cache import BASE_REQUIREMENTS
+
+ROADMAP = """## Implementation Roadmap: PawPals
+
+### Pre-Development Checklist
+- [ ] Interviewed 20+ dog owners in Austin about walker reliability
+- [ ] Confirmed $50k budget availability, with $8k held back as contingency
+- [ ] Identified a freelance React Native developer and a part-time designer
+
+### Phase 0: Foundation & Validation (Weeks 1-4)
+**Goal**: Prove owners will book and walkers will show up
+**Budget**: $2,000 - $3,000
+**Team**: Founder, part-time designer
+
+Key Activities:
+1. Run a concierge service by text message with 10 owners and 5 student walkers
+2. Draft vetting steps (background check, meet and greet, trial walk)
+3. Test pricing at $20 and $25 per walk
+
+Success Looks Like:
+- 50 walks booked, fewer than 2% cancelled by walkers
+
+⚠️ Common Pitfalls:
+- Recruiting walkers before there is demand to keep them busy
+
+### Phase 1: Basic Booking MVP (Weeks 5-12)
+**Goal**: Owners can book vetted walkers in the app
+**Budget**: $15,000 - $20,000
+**Team**: Freelance React Native developer, founder as product owner
+
+Key Activities:
+1. Owner and walker apps with profiles and walker vetting status
+2. Booking with instant confirmation and same-day slots
+3. In-app payments with same-day walker payouts
+4. Live tracking of walks on a map
+
+Success Looks Like:
+- 100 owners booking at least twice a week
+
+⚠️ Common Pitfalls:
+- Building recurring bookings before single bookings work reliably
+
+### Phase 2: Automation & Retention (Weeks 13-20)
+**Goal**: Owners come back without being reminded
+**Budget**: $10,000 - $12,000
+**Team**: Same developer, part-time support
+
+Key Activities:
+1. Recurring walks
+2. Ratings for walkers and owners
+3. Photo updates during walks
+
+Success Looks Like:
+- 60% of owners on recurring walks
+
+⚠️ Common Pitfalls:
+- Letting ratings inflate until they stop meaning anything
+
+### Phase 3: Scale to a Second City (Weeks 21-28)
+**Goal**: Repeat the launch playbook in one more city
+**Budget**: $8,000 - $10,000
+**Team**: Add a city manager
+
+Key Activities:
+1. Document walker recruiting and vetting as a playbook
+2. Launch partnerships with two universities
+
+Success Looks Like:
+- Second city at 50 weekly walks within 6 weeks
+
+⚠️ Common Pitfalls:
+- Expanding before the first city is profitable per walk
+
+### Key Risks
+- Walker supply drops during exam weeks; recruit from two universities
+- Trust incidents; insurance and a 24/7 support line from day one
+"""
+
+ARCHITECTURE = """## Recommended Architecture Pattern
+A modular monolith backed by managed services. One codebase is simpler to build, test and change while the product is still finding its shape, and managed services remove most server operations.
+
+## Technology Stack
+- React Native: one codebase for the owner and walker apps on iOS and Android
+- Firebase (Auth, Firestore): sign-in, profiles and bookings without running servers
+- Firebase Realtime Database: live location updates during walks
+- Stripe Connect: in-app payments and same-day walker payouts
+- Google Maps SDK: maps and routes for live tracking
+- Checkr API: background checks for walker vetting
+
+## Key Design Decisions
+- Managed services over custom servers so a solo founder with freelancers isn't on call
+- Payments through Stripe Connect so PawPals never stores card details
+- Vetting status stored on the walker profile and checked before every booking
+
+## Implementation Approach
+Build sign-up and vetting first, then booking and payments, then live tracking, in three releases of about four weeks each. Each release goes to the concierge-test owners before the next one starts.
+"""
+
+CHANGES = {
+    "budget": BASE_REQUIREMENTS.replace("About $50k", "About $30k"),
+    "drop_feature": BASE_REQUIREMENTS.replace(", live tracking", ""),
+    "drop_nice_to_have": BASE_REQUIREMENTS.replace("Recurring walks, ", ""),
+    "other_city": BASE_REQUIREMENTS.replace("Austin", "Denver"),
+    "timeline": BASE_REQUIREMENTS.replace("MVP in 3-4 months", "MVP in 6 months"),
+}
+
+# agent -> (state key, deliverable, dependency table name, user message)
+DELIVERABLES = {
+    "implementation_roadmap_agent": ("implementation_roadmap", ROADMAP, "ROADMAP_DEPENDENCIES",
+                                     "My requirements changed, can you update the roadmap?"),
+    "analyze_requirements_agent": ("architecture_proposal", ARCHITECTURE,
+                                   "ARCHITECTURE_DEPENDENCIES",
+                                   "My requirements changed, can you update the architecture?"),
+}
+
+
+def rewritten_sections(deliverable, changed, table):
+    """What the model writes when asked for the affected sections only."""
+    from ..services import replanning
+    from ..services.requirements import parse_requirements
+
+    changes = replanning.diff_requirements(parse_requirements(BASE_REQUIREMENTS),
+                                           parse_requirements(changed))
+    _, sections = replanning.split_sections(deliverable)
+    affected = replanning.affected_sections(sections, changes, getattr(replanning, table))
+    return affected, len(sections), "".join(sections[i].text + "\n" for i in affected)
+
+
+async def update(agent, state_key, deliverable, message, changed, response, backend):
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    from ..services.requirements import parse_requirements
+
+    runner = InMemoryRunner(agent=agent, app_name=APP_NAME)
+    current_script.set(ConversationScript({agent.name: [{"text": response}]}))
+    original = parse_requirements(BASE_REQUIREMENTS).to_state()
+    session = await runner.session_service.create_session(
+        app_name=APP_NAME, user_id="bench",
+        state={"requirements_summary": changed,
+               "requirements": parse_requirements(changed).to_state(),
+               state_key: deliverable, f"{state_key}_requirements": original,
+               "delivered_agents": [agent.name]})
+    calls_before = len(backend.calls)
+    async for _ in runner.run_async(
+            user_id=session.user_id, session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text=message)])):
+        pass
+    session = await runner.session_service.get_session(
+        app_name=APP_NAME, user_id=session.user_id, session_id=session.id)
+    simulated = sum(c["simulated_s"] for c in backend.calls[calls_before:])
+    return simulated, session.state.get(state_key) or ""
+
+
+async def run(args, agents, backend):
+    from ..agents.replanning import replan_stats
+
+    rows = []
+    for agent_name, (state_key, deliverable, table, message) in DELIVERABLES.items():
+        headings = [line for line in deliverable.splitlines() if line.startswith("#")]
+        for change, changed in CHANGES.items():
+            affected, total, sections = rewritten_sections(deliverable, changed, table)
+            os.environ["REPLANNING_ENABLED"] = "false"
+            full_s, _ = await update(agents[agent_name], state_key, deliverable, message,
+                                     changed, deliverable, backend)
+            os.environ["REPLANNING_ENABLED"] = "true"
+            reused_before, total_before = replan_stats.reused_chars, replan_stats.total_chars
+            partial_s, updated = await update(agents[agent_name], state_key, deliverable, message,
+                                              changed, sections if len(affected) < total
+                                              else deliverable, backend)
+            total_chars = replan_stats.total_chars - total_before
+            rows.append({"agent": agent_name, "change": change, "sections": total,
+                         "rewritten": len(affected),
+                         "reused_fraction": round((replan_stats.reused_chars - reused_before)
+                                                  / total_chars, 3) if total_chars else 0.0,
+                         "full_s": full_s, "incremental_s": partial_s,
+                         "intact": all(line in updated for line in headings)})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental re-planning benchmark")
+    parser.add_argument("--median-ms", type=float, default=1500.0,
+                        help="Simulated latency before the first output token")
+    parser.add_argument("--per-token-ms", type=float, default=15.0)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+    configure_offline_environment()
+    from ..agents.planning import implementation_roadmap_agent
+    from ..agents.replanning import replan_stats
+    from ..agents.technical import analyze_requirements_agent
+
+    agents = {a.name: a for a in (implementation_roadmap_agent, analyze_requirements_agent)}
+    backend = FakeBackend(latency=LatencyModel(args.median_ms, sigma=0.0,
+                                               per_output_token_ms=args.per_token_ms),
+                          time_scale=0.0)
+    for agent in agents.values():
+        install_fakes(agent, backend)
+
+    rows = asyncio.run(run(args, agents, backend))
+    for r in rows:
+        print(f"{r['agent']:<30} {r['change']:<18} rewrote {r['rewritten']}/{r['sections']} sections  "
+              f"reused {r['reused_fraction']:>4.0%}  full {r['full_s'] * 1000:>6.0f} ms  "
+              f"incremental {r['incremental_s'] * 1000:>6.0f} ms"
+              f"{'' if r['intact'] else '  (sections missing!)'}")
+    full = sum(r["full_s"] for r in rows)
+    incremental = sum(r["incremental_s"] for r in rows)
+    print(f"total simulated {full:.1f}s full vs {incremental:.1f}s incremental "
+          f"({1 - incremental / full:.0%} saved); {replan_stats.stats()}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"rows": rows, "replanning": replan_stats.stats()}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
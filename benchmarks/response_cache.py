@@ -0,0 +1,192 @@
+# Architecture Assistant - Semantic Response Cache Benchmark
+#
+# Asks implementation_roadmap_agent and project_reality_check_agent for
+# their deliverable for a series of projects: one written from scratch,
+# then near-duplicates (another city, another budget, reworded, a sibling
+# market), the same project at a tenth of the budget and timeline (worded
+# alike, but the deliverable must not be reused) and an unrelated project. Runs once without and once with the
+# response cache. Simulated latency grows with output tokens, so a full
+# roadmap takes ~15s and a reused one only needs the short adjustments.
+# Reports per-project similarity, hit/miss, turn time and time to first text.
+#
+#   python -m architecture_assistant.benchmarks.response_cache
+#   python -m architecture_assistant.benchmarks.response_cache --threshold 0.9
+
+import argparse
+import asyncio
+import json
+import time
+
+from .fake_llm import ConversationScript, FakeBackend, LatencyModel, current_script, install_fakes
+from .harness import APP_NAME, configure_offline_environment, load_scenario, percentile
+
+BASE_REQUIREMENTS = """## What We Discovered Together
+### Your Business Vision
+- Problem you're solving: Busy professionals can't find reliable, trusted dog walkers on short notice
+- Who you're helping: Dog owners working long hours in Austin; college students who want flexible income
+- How you're different: Vetted walkers, live GPS tracking and instant booking
+
+### Key Requirements
+- Must-haves: Mobile app for owners and walkers, booking, in-app payments, live tracking, walker vetting
+- Nice-to-haves: Recurring walks, ratings, photo updates
+- Not needed: Grooming, vet services
+
+### Reality Factors
+- Timeline: MVP in 3-4 months
+- Budget: About $50k, limited budget
+- Team: Solo founder, will hire freelancers"""
+
+PROJECTS = {
+    "original": BASE_REQUIREMENTS,
+    "other_city": BASE_REQUIREMENTS.replace("Austin", "Denver"),
+    "other_budget": BASE_REQUIREMENTS.replace("About $50k", "About $70k")
+                                     .replace("3-4 months", "4-5 months"),
+    "much_smaller": BASE_REQUIREMENTS.replace("About $50k", "About $5k")
+                                     .replace("3-4 months", "2 weeks"),
+    "reworded": BASE_REQUIREMENTS.replace(
+        "Busy professionals can't find reliable, trusted dog walkers on short notice",
+        "Working people struggle to find dependable dog walkers at short notice").replace(
+        "Recurring walks, ratings, photo updates", "Ratings, repeat bookings, photos after each walk"),
+    "pet_sitting": BASE_REQUIREMENTS.replace("dog walkers", "pet sitters")
+                                    .replace("walkers", "sitters")
+                                    .replace("Recurring walks", "Overnight stays"),
+    "tutoring": """## What We Discovered Together
+### Your Business Vision
+- Problem you're solving: Parents can't find qualified math tutors for their kids on short notice
+- Who you're helping: Parents of high school students in Chicago; university students who tutor
+- How you're different: Vetted tutors, video sessions and instant booking
+
+### Key Requirements
+- Must-haves: Web app for parents and tutors, booking, payments, video calls, tutor vetting
+- Nice-to-haves: Progress reports, ratings
+- Not needed: Group classes
+
+### Reality Factors
+- Timeline: MVP in 4 months
+- Budget: About $40k
+- Team: Two founders, one technical""",
+}
+
+AGENTS = {
+    "implementation_roadmap_agent": "Can you give me a roadmap with milestones?",
+    "project_reality_check_agent": "How much will this cost and how long will it take?",
+}
+
+
+async def ask(runner, agent_name, message, requirements, responses, run_config):
+    from google.genai import types
+
+    from ..services.requirements import parse_requirements
+
+    current_script.set(ConversationScript({agent_name: list(responses)}))
+    session = await runner.session_service.create_session(
+        app_name=APP_NAME, user_id="bench",
+        state={"requirements_summary": requirements,
+               "requirements": parse_requirements(requirements).to_state()})
+    started = time.perf_counter()
+    ttft = None
+    async for event in runner.run_async(
+            user_id=session.user_id, session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text=message)]),
+            run_config=run_config):
+        if ttft is None and event.content and any(p.text for p in event.content.parts or []):
+            ttft = time.perf_counter() - started
+    return time.perf_counter() - started, ttft
+
+
+async def run_mode(agents, scenario, args, run_config):
+    from google.adk.runners import InMemoryRunner
+
+    from ..agents import reuse
+
+    rows = []
+    for agent_name, message in AGENTS.items():
+        runner = InMemoryRunner(agent=agents[agent_name], app_name=APP_NAME)
+        # The scripted deliverable stands for a full-length one
+        responses = [{**r, "output_tokens": args.deliverable_tokens} if "text" in r else r
+                     for r in scenario["responses"][agent_name]]
+        for project, requirements in PROJECTS.items():
+            cache = reuse.default_response_cache()
+            hits_before = cache.stats()["hits"] if cache else 0
+            wall, ttft = await ask(runner, agent_name, message, requirements, responses, run_config)
+            rows.append({"agent": agent_name, "project": project,
+                         "hit": bool(cache and cache.stats()["hits"] > hits_before),
+                         "wall_s": wall / args.time_scale, "ttft_s": (ttft or wall) / args.time_scale})
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantic response cache benchmark")
+    parser.add_argument("--scenario", default="pawpals")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="Similarity threshold (default: RESPONSE_CACHE_THRESHOLD or 0.85)")
+    parser.add_argument("--deliverable-tokens", type=int, default=900)
+    parser.add_argument("--median-ms", type=float, default=1500.0,
+                        help="Simulated latency before the first output token")
+    parser.add_argument("--per-token-ms", type=float, default=15.0)
+    parser.add_argument("--time-scale", type=float, default=0.2)
+    parser.add_argument("--no-stream", action="store_true", help="Don't use SSE streaming")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    configure_offline_environment()
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+
+    from ..agents import reuse
+    from ..agents.discovery import project_reality_check_agent
+    from ..agents.planning import implementation_roadmap_agent
+    from ..services.embeddings import cosine, embedder_from_env, HashingEmbedder
+    from ..services.requirements import parse_requirements
+    from ..services.response_cache import ResponseCache, normalize_requirements
+
+    scenario = load_scenario(args.scenario)
+    agents = {a.name: a for a in (implementation_roadmap_agent, project_reality_check_agent)}
+    backend = FakeBackend(latency=LatencyModel(args.median_ms, sigma=0.2,
+                                               per_output_token_ms=args.per_token_ms),
+                          time_scale=args.time_scale,
+                          search_results=scenario.get("search_results"))
+    for agent in agents.values():
+        install_fakes(agent, backend)
+    run_config = None if args.no_stream else RunConfig(streaming_mode=StreamingMode.SSE)
+
+    embedder = embedder_from_env() or HashingEmbedder()
+
+    def embed(text):
+        # The same key the agents look up with
+        key = reuse.requirements_key({"requirements": parse_requirements(text).to_state()})
+        return embedder.embed([normalize_requirements(key)])[0]
+
+    original = embed(BASE_REQUIREMENTS)
+    similarity = {project: round(cosine(original, embed(text)), 3)
+                  for project, text in PROJECTS.items()}
+
+    results = {"similarity_to_original": similarity}
+    cache = ResponseCache(embedder=embedder)
+    if args.threshold is not None:
+        cache.threshold = args.threshold
+    for mode, mode_cache in (("generated", None), ("reused", cache)):
+        reuse._default_response_cache = mode_cache
+        rows = results[mode] = asyncio.run(run_mode(agents, scenario, args, run_config))
+        print(f"--- {mode}")
+        for r in rows:
+            print(f"{r['agent']:<30} {r['project']:<13} sim {similarity[r['project']]:.2f}  "
+                  f"{'hit ' if r['hit'] else 'miss'}  turn {r['wall_s']:>5.1f}s  "
+                  f"first text {r['ttft_s']:>5.1f}s")
+    hits = [r for r in results["reused"] if r["hit"]]
+    generated = results["generated"]
+    print(f"scale misses (similar wording, different budget/timeline/team): "
+          f"{cache.stats()['scale_misses']}")
+    if hits:
+        print(f"hits {len(hits)}/{len(results['reused'])} at threshold {cache.threshold}: "
+              f"turn p50 {percentile([r['wall_s'] for r in hits], 50):.1f}s "
+              f"(first text {percentile([r['ttft_s'] for r in hits], 50):.1f}s) vs generated "
+              f"{percentile([r['wall_s'] for r in generated], 50):.1f}s "
+              f"(first text {percentile([r['ttft_s'] for r in generated], 50):.1f}s), simulated time")
+    results["cache"] = cache.stats()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# Architecture Assistant - Session Store Benchmark
+#
+# Append and load throughput of session services with many sessions active
+# at once: every session appends its events concurrently, then every
+# session is loaded back.
+#
+#   python -m architecture_assistant.benchmarks.session_store --sessions 10000
+#   python -m architecture_assistant.benchmarks.session_store --services pooled,adk
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from ..server.session_store import PooledSqliteSessionService
+
+APP_NAME = "architecture_assistant_bench"
+REPLY = ("Great question! For a two-sided marketplace like this, most teams start "
+         "with a single web app and a managed database, then add mobile apps once "
+         "they have repeat customers. ") * 3
+
+
+def make_service(kind, path):
+    if kind == "pooled":
+        return PooledSqliteSessionService(path)
+    if kind == "adk":
+        from google.adk.sessions.sqlite_session_service import SqliteSessionService
+        return SqliteSessionService(path)
+    if kind == "memory":
+        return InMemorySessionService()
+    raise ValueError(f"Unknown service {kind!r}")
+
+
+def make_event(index):
+    author = "user" if index % 2 == 0 else "requirements_discovery_agent"
+    return Event(
+        author=author,
+        invocation_id=f"inv-{index // 2}",
+        content=types.Content(role="user" if author == "user" else "model",
+                              parts=[types.Part(text=REPLY)]),
+        actions=EventActions(state_delta={"turns": index} if index % 2 else {}),
+    )
+
+
+async def run_service(kind, sessions, events_per_session, path):
+    service = make_service(kind, path)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        service.create_session(app_name=APP_NAME, user_id=f"user-{i % 1000}")
+        for i in range(sessions)), return_exceptions=True)
+    create_s = time.perf_counter() - started
+    # e.g. "database is locked" when a store cannot handle the contention
+    errors = [type(r).__name__ for r in results if isinstance(r, Exception)]
+    created = [r for r in results if not isinstance(r, Exception)]
+
+    append_latencies = []
+
+    async def converse(session):
+        for index in range(events_per_session):
+            t0 = time.perf_counter()
+            try:
+                await service.append_event(session, make_event(index))
+            except Exception as e:
+                errors.append(type(e).__name__)
+                return
+            append_latencies.append(time.perf_counter() - t0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(converse(s) for s in created))
+    append_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    loaded = await asyncio.gather(*(
+        service.get_session(app_name=APP_NAME, user_id=s.user_id, session_id=s.id)
+        for s in created))
+    load_s = time.perf_counter() - started
+    appends = len(append_latencies)
+    assert sum(len(s.events) for s in loaded) == appends
+
+    append_latencies.sort()
+    result = {
+        "sessions": len(created),
+        "events": appends,
+        "errors": len(errors),
+        "creates_per_second": round(len(created) / create_s, 1),
+        "appends_per_second": round(appends / append_s, 1),
+        "append_p50_ms": round(statistics.median(append_latencies) * 1000, 2),
+        "append_p99_ms": round(append_latencies[int(0.99 * (len(append_latencies) - 1))]
+                               * 1000, 2),
+        "loads_per_second": round(len(created) / load_s, 1),
+    }
+    if kind == "pooled":
+        result["events_per_batch"] = round(service.stats()["events_per_batch"], 1)
+        service.close()
+    elif kind == "adk":
+        await service.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Session store throughput benchmark")
+    parser.add_argument("--sessions", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=6, help="Events per session")
+    parser.add_argument("--services", default="pooled,memory",
+                        help="Comma-separated: pooled, adk, memory")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind in args.services.split(","):
+            path = os.path.join(tmp, f"{kind}.sqlite3")
+            results[kind] = asyncio.run(run_service(kind, args.sessions, args.events, path))
+            r = results[kind]
+            print(f"{kind:<8} appends {r['appends_per_second']:>10.1f}/s "
+                  f"(p50 {r['append_p50_ms']} ms, p99 {r['append_p99_ms']} ms)  "
+                  f"loads {r['loads_per_second']:>9.1f}/s  "
+                  f"creates {r['creates_per_second']:>9.1f}/s  "
+                  f"errors {r['errors']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
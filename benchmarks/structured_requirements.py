@@ -0,0 +1,141 @@
+# Architecture Assistant - Structured Requirements Benchmark
+#
+# Runs a scenario with downstream agents reading the full conversation and
+# with them reading the structured requirements from discovery plus the
+# latest turns. --discovery-turns adds scripted discovery exchanges so the
+# transcript is as long as a real discovery. Simulated latency includes a
+# per-input-token cost, so smaller requests are also faster. Reports input
+# tokens and simulated latency per call for the reality check, the
+# architecture loop and the roadmap.
+#
+#   python -m architecture_assistant.benchmarks.structured_requirements
+#   python -m architecture_assistant.benchmarks.structured_requirements --discovery-turns 0
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import statistics
+
+from .fake_llm import FakeBackend, LatencyModel
+from .harness import configure_offline_environment, load_scenario, run_benchmark
+
+DOWNSTREAM_AGENTS = [
+    "project_reality_check_agent",
+    "analyze_requirements_agent",
+    "double_check_agent",
+    "implementation_roadmap_agent",
+]
+
+# (user message, discovery reply) pairs cycled to lengthen discovery
+DISCOVERY_EXCHANGES = [
+    ("Most of my friends work 10-hour days downtown and either leave their dogs alone all day or "
+     "pay a neighbour cash when they can find one. They've tried Rover but say it takes days to "
+     "find someone they trust, and walkers cancel at the last minute.",
+     "That last-minute cancellation pain is really telling. When a walker cancels, what do "
+     "owners do today, and how much would they pay to never worry about it again?"),
+    ("They scramble, usually leave work early or ask a family member. I think they'd pay a bit "
+     "more than Rover, maybe $25 a walk, if they knew someone vetted would always show up and "
+     "they could see the walk happening.",
+     "So reliability and visibility matter more than price. Let's think about the walkers: "
+     "what makes a college student choose your app over babysitting or delivery gigs?"),
+    ("Flexible hours between classes, getting paid the same day, and honestly they like dogs. "
+     "Students near UT already do this informally through Facebook groups, but payments are "
+     "awkward and there's no way to build a reputation.",
+     "Same-day pay and a portable reputation are strong hooks for the supply side. How would "
+     "you vet walkers so owners feel safe handing over their keys?"),
+    ("Background checks, an in-person meet and greet, and maybe a short trial walk with me "
+     "watching at first. Later, reviews from owners should do most of the work. Keys are a big "
+     "deal, some people have lockboxes, others would meet the walker the first time.",
+     "Trust at the door is the heart of the product. What happens if something goes wrong on "
+     "a walk, like an injured dog or a lost key, and who's responsible?"),
+    ("I haven't figured that out. I assume we need insurance, and some kind of support line. "
+     "Rover has a guarantee, so owners probably expect something similar from day one, even "
+     "if we're small.",
+     "That's an important expectation to plan for. Thinking about the first six months, how "
+     "will you know PawPals is working? What numbers would tell you to keep going?"),
+    ("If we get 100 owners booking at least twice a week and walkers earning enough to stay, "
+     "I'd call it a success. I'd also want cancellations under 2%, since that's the whole "
+     "reason people would switch.",
+     "Those are clear, measurable goals. Is there anything about the timing, your own "
+     "availability or money that would change how quickly you can move?"),
+]
+
+
+def lengthen_discovery(scenario, exchanges):
+    """Scenario with extra discovery exchanges before the summary."""
+    scenario = copy.deepcopy(scenario)
+    extra = [DISCOVERY_EXCHANGES[i % len(DISCOVERY_EXCHANGES)] for i in range(exchanges)]
+    scenario["turns"][2:2] = [message for message, _ in extra]
+    scenario["responses"]["requirements_discovery_agent"][1:1] = [
+        {"text": reply} for _, reply in extra]
+    return scenario
+
+
+def run_mode(structured, scenario, args):
+    from ..agents import search
+    from ..services.search_cache import default_search_cache
+
+    default_search_cache().clear()
+    os.environ["STRUCTURED_REQUIREMENTS_ENABLED"] = "true" if structured else "false"
+    search._default_prefetcher = search._UNSET  # Its semaphore belongs to the previous loop
+    backend = FakeBackend(latency=LatencyModel(args.median_ms, sigma=0.0,
+                                               per_input_token_ms=args.per_input_token_ms),
+                          time_scale=args.time_scale,
+                          search_results=scenario.get("search_results"))
+    result = asyncio.run(run_benchmark(scenario, args.conversations, 1, backend=backend))
+    per_agent = {}
+    for agent in DOWNSTREAM_AGENTS:
+        calls = [c for c in backend.calls if c["agent"] == agent]
+        if calls:
+            per_agent[agent] = {
+                "calls": len(calls),
+                "input_tokens_per_call": round(statistics.mean(c["input_tokens"] for c in calls)),
+                "simulated_ms_per_call": round(statistics.mean(c["simulated_s"] for c in calls) * 1000),
+            }
+    return {
+        "failed_turns": result["summary"]["failed_turns"],
+        "input_tokens_per_conversation": result["summary"]["input_tokens_per_conversation"],
+        "per_agent": per_agent,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Structured requirements benchmark")
+    parser.add_argument("--scenario", default="pawpals")
+    parser.add_argument("--discovery-turns", type=int, default=12,
+                        help="Extra scripted discovery exchanges before the summary")
+    parser.add_argument("--conversations", type=int, default=2)
+    parser.add_argument("--median-ms", type=float, default=800.0)
+    parser.add_argument("--per-input-token-ms", type=float, default=0.1,
+                        help="Simulated prompt processing cost per uncached input token")
+    parser.add_argument("--time-scale", type=float, default=0.0)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")  # Every conversation writes its own
+    configure_offline_environment()
+    scenario = lengthen_discovery(load_scenario(args.scenario), args.discovery_turns)
+
+    results = {mode: run_mode(structured, scenario, args)
+               for mode, structured in (("full history", False), ("structured", True))}
+    before, after = results["full history"]["per_agent"], results["structured"]["per_agent"]
+    print(f"{'agent':<30}{'tokens/call':>24}{'simulated ms/call':>24}")
+    for agent in DOWNSTREAM_AGENTS:
+        if agent not in before or agent not in after:
+            continue
+        b, a = before[agent], after[agent]
+        print(f"{agent:<30}{b['input_tokens_per_call']:>10} -> {a['input_tokens_per_call']:<10}"
+              f"{b['simulated_ms_per_call']:>10} -> {a['simulated_ms_per_call']:<10}")
+    b = results["full history"]["input_tokens_per_conversation"]
+    a = results["structured"]["input_tokens_per_conversation"]
+    print(f"input tokens per conversation {b} -> {a} ({(a - b) / b:+.0%}); failed turns "
+          f"{results['full history']['failed_turns']} -> {results['structured']['failed_turns']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
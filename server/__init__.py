@@ -0,0 +1,6 @@
+# Architecture Assistant - Serving
+#
+# Production front ends for root_agent and the infrastructure behind them
+# (durable sessions). Requires FastAPI and uvicorn (installed with
+# google-adk). Run from the directory that contains the package, e.g.
+# `python -m architecture_assistant.server.streaming`.
@@ -0,0 +1,228 @@
+# Architecture Assistant - Multi-Process Serving
+#
+# Runs the streaming app in N worker processes behind one async front end,
+# so CPU-bound work (callbacks, JSON, event handling) is spread across cores
+# instead of contending on one interpreter's GIL.
+# - Workers share sessions through the SQLite session store (SESSION_DB_PATH)
+# - The front end picks session ids itself and routes every request for a
+#   session to the same worker (hash of the id), so per-process caches stay
+#   warm and a session never has two writers
+# - Crashed workers are restarted on the same port; their sessions resume
+#   from the shared store
+#
+#   python -m architecture_assistant.server.cluster --workers 4 --port 8080
+
+import argparse
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+import zlib
+from contextlib import asynccontextmanager
+from urllib.parse import quote, urlencode
+
+import httpx
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_APP_FACTORY = f"{__package__}.streaming:create_app"
+_READY_TIMEOUT_S = 60.0
+_SUPERVISE_INTERVAL_S = 1.0
+
+
+def load_factory(path):
+    """'package.module:function' -> function."""
+    module_name, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def _run_worker(factory_path, host, port):
+    import uvicorn
+
+    uvicorn.run(load_factory(factory_path)(), host=host, port=port, log_level="warning")
+
+
+class WorkerPool:
+    """N worker processes each serving factory_path's app on its own port.
+
+    Args:
+        workers: Number of worker processes.
+        factory_path: 'module:function' returning the ASGI app.
+        base_port: Worker i listens on base_port + i.
+    """
+
+    def __init__(self, workers, factory_path=DEFAULT_APP_FACTORY,
+                 host="127.0.0.1", base_port=9100):
+        self.workers = workers
+        self.factory_path = factory_path
+        self.host = host
+        self.base_port = base_port
+        self._context = multiprocessing.get_context("spawn")
+        self.processes = [None] * workers
+        self.restarts = 0
+
+    def url(self, index):
+        return f"http://{self.host}:{self.base_port + index}"
+
+    def worker_for(self, session_id):
+        """Session affinity: a session always maps to the same worker."""
+        return zlib.crc32(session_id.encode()) % self.workers
+
+    def start(self):
+        for index in range(self.workers):
+            self._spawn(index)
+
+    def _spawn(self, index):
+        process = self._context.Process(
+            target=_run_worker, name=f"worker-{index}", daemon=True,
+            args=(self.factory_path, self.host, self.base_port + index))
+        process.start()
+        self.processes[index] = process
+
+    async def wait_ready(self, client, timeout=_READY_TIMEOUT_S):
+        deadline = time.monotonic() + timeout
+        for index in range(self.workers):
+            while True:
+                try:
+                    if (await client.get(f"{self.url(index)}/healthz")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Worker {index} did not become ready")
+                await asyncio.sleep(0.1)
+
+    async def supervise(self):
+        """Restart workers that exit (e.g. after a crash)."""
+        while True:
+            await asyncio.sleep(_SUPERVISE_INTERVAL_S)
+            for index, process in enumerate(self.processes):
+                if process is not None and not process.is_alive():
+                    logger.warning("Worker %d exited (%s); restarting", index,
+                                   process.exitcode)
+                    self.restarts += 1
+                    self._spawn(index)
+
+    def stop(self):
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            if process is not None:
+                process.join(timeout=5)
+
+
+def create_frontend(pool):
+    """Async front end proxying sessions to their worker."""
+    client = httpx.AsyncClient(timeout=httpx.Timeout(None, connect=5.0),
+                               limits=httpx.Limits(max_connections=None))
+
+    @asynccontextmanager
+    async def lifespan(app):
+        pool.start()
+        try:
+            await pool.wait_ready(client)
+            supervisor = asyncio.create_task(pool.supervise())
+            yield
+            supervisor.cancel()
+        finally:
+            await client.aclose()
+            pool.stop()
+
+    app = FastAPI(title="Architecture Assistant (cluster)", lifespan=lifespan)
+
+    @app.post("/sessions")
+    async def create_session(request: Request):
+        body = await request.json() if await request.body() else {}
+        body["session_id"] = body.get("session_id") or uuid.uuid4().hex
+        worker = pool.worker_for(body["session_id"])
+        response = await client.post(f"{pool.url(worker)}/sessions", json=body)
+        return Response(response.content, status_code=response.status_code,
+                        media_type=response.headers.get("content-type"))
+
+    @app.post("/sessions/{session_id}/messages")
+    async def send_message(session_id: str, request: Request):
+        worker = pool.worker_for(session_id)
+        upstream = client.build_request(
+            "POST", f"{pool.url(worker)}/sessions/{quote(session_id, safe='')}/messages",
+            content=await request.body(), headers={"Content-Type": "application/json"})
+        response = await client.send(upstream, stream=True)
+        if response.status_code != 200:
+            body = await response.aread()
+            await response.aclose()
+            return Response(body, status_code=response.status_code,
+                            media_type=response.headers.get("content-type"))
+
+        async def relay():
+            try:
+                async for chunk in response.aiter_raw():
+                    yield chunk
+            finally:
+                await response.aclose()
+
+        return StreamingResponse(relay(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache",
+                                          "X-Accel-Buffering": "no",
+                                          "X-Worker": str(worker)})
+
+    @app.websocket("/sessions/{session_id}/ws")
+    async def chat_socket(websocket: WebSocket, session_id: str, user_id: str = "user"):
+        import websockets
+
+        worker = pool.worker_for(session_id)
+        url = (f"{pool.url(worker).replace('http', 'ws', 1)}"
+               f"/sessions/{quote(session_id, safe='')}/ws?{urlencode({'user_id': user_id})}")
+        await websocket.accept()
+        async with websockets.connect(url) as upstream:
+            async def client_to_worker():
+                try:
+                    while True:
+                        await upstream.send(await websocket.receive_text())
+                except WebSocketDisconnect:
+                    await upstream.close()
+
+            async def worker_to_client():
+                async for message in upstream:
+                    await websocket.send_text(message)
+
+            tasks = [asyncio.create_task(client_to_worker()),
+                     asyncio.create_task(worker_to_client())]
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                task.cancel()
+
+    @app.get("/healthz")
+    async def healthz():
+        alive = sum(p is not None and p.is_alive() for p in pool.processes)
+        return {"status": "ok" if alive == pool.workers else "degraded",
+                "workers": pool.workers, "alive": alive, "restarts": pool.restarts}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Multi-process Architecture Assistant server")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--worker-base-port", type=int, default=9100)
+    parser.add_argument("--app-factory", default=DEFAULT_APP_FACTORY,
+                        help="module:function building each worker's app")
+    args = parser.parse_args()
+
+    pool = WorkerPool(args.workers, args.app_factory, base_port=args.worker_base_port)
+    uvicorn.run(create_frontend(pool), host=args.host, port=args.port, log_level="warning")
+
+
+__all__ = ['WorkerPool', 'create_frontend', 'load_factory']
+
+
+if __name__ == "__main__":
+    main()
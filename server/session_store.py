@@ -0,0 +1,393 @@
+# Architecture Assistant - Durable SQLite Session Service
+#
+# ADK session service that keeps sessions and events in SQLite (WAL mode),
+# so a worker restart does not lose in-progress conversations and several
+# processes on one machine can share the same sessions.
+# - A small pool of connections runs queries on worker threads; WAL lets
+#   readers proceed while a write is in progress
+# - Event appends are group-committed: appends arriving within a short
+#   window are written in one transaction, and each caller waits until its
+#   event is durable
+# - Sessions and events are indexed by app/user/session
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.errors.session_not_found_error import SessionNotFoundError
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session, State
+from google.adk.sessions.base_session_service import ListSessionsResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_BATCH_WINDOW_MS = 2.0
+DEFAULT_MAX_BATCH = 256
+_BUSY_TIMEOUT_MS = 30000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    update_time REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE INDEX IF NOT EXISTS sessions_by_update ON sessions (app_name, update_time);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    invocation_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    event_data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_session
+    ON events (app_name, user_id, session_id, timestamp);
+"""
+
+
+def _split_state(state):
+    """Split a state dict into (app, user, session) parts; temp: is dropped."""
+    app, user, session = {}, {}, {}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            app[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session[key] = value
+    return app, user, session
+
+
+def _merge_state(app_state, user_state, session_state):
+    merged = dict(session_state)
+    merged.update({State.APP_PREFIX + k: v for k, v in app_state.items()})
+    merged.update({State.USER_PREFIX + k: v for k, v in user_state.items()})
+    return merged
+
+
+def _dumps(value):
+    return json.dumps(value, default=str)
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared by worker threads."""
+
+    def __init__(self, path, size=DEFAULT_POOL_SIZE):
+        self.path = path
+        if path in ("", ":memory:"):
+            # A private memory database is only visible to its own connection
+            path, size = ":memory:", 1
+        self._connections = queue.Queue()
+        for _ in range(max(1, size)):
+            conn = sqlite3.connect(path, check_same_thread=False,
+                                   isolation_level=None, timeout=_BUSY_TIMEOUT_MS / 1000)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={_BUSY_TIMEOUT_MS}")
+            self._connections.put(conn)
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def connection(self):
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            self._connections.put(conn)
+
+    async def run(self, fn, *args):
+        """Run fn(conn, *args) on a worker thread with a pooled connection."""
+        def call():
+            with self.connection() as conn:
+                return fn(conn, *args)
+        return await asyncio.to_thread(call)
+
+    def close(self):
+        while not self._connections.empty():
+            self._connections.get_nowait().close()
+
+
+class PooledSqliteSessionService(BaseSessionService):
+    """Persistent ADK session service with pooled connections and batched appends.
+
+    Args:
+        path: SQLite file (":memory:" for a process-local database).
+        pool_size: Pooled connections (concurrent readers).
+        batch_window_ms: How long the first pending append waits for others
+            to join its transaction.
+        max_batch: Appends written per transaction at most.
+    """
+
+    def __init__(self, path, pool_size=DEFAULT_POOL_SIZE,
+                 batch_window_ms=DEFAULT_BATCH_WINDOW_MS, max_batch=DEFAULT_MAX_BATCH):
+        self.pool = ConnectionPool(path, pool_size)
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self._pending = []
+        self._flush_task = None
+        self.batches = 0
+        self.appended = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            path=os.getenv("SESSION_DB_PATH", ".sessions.sqlite3"),
+            pool_size=int(os.getenv("SESSION_DB_POOL_SIZE", DEFAULT_POOL_SIZE)),
+            batch_window_ms=float(os.getenv("SESSION_DB_BATCH_WINDOW_MS",
+                                            DEFAULT_BATCH_WINDOW_MS)),
+        )
+
+    # ----- sessions -----
+
+    async def create_session(self, *, app_name, user_id, state=None, session_id=None):
+        session_id = (session_id or "").strip() or uuid.uuid4().hex
+        app_delta, user_delta, session_state = _split_state(state)
+        now = time.time()
+
+        def create(conn):
+            with self._transaction(conn):
+                try:
+                    conn.execute(
+                        "INSERT INTO sessions (app_name, user_id, id, state, create_time,"
+                        " update_time) VALUES (?, ?, ?, ?, ?, ?)",
+                        (app_name, user_id, session_id, _dumps(session_state), now, now))
+                except sqlite3.IntegrityError:
+                    raise AlreadyExistsError(
+                        f"Session with id {session_id} already exists.") from None
+                app_state = self._update_scope(conn, "app", app_name, None, app_delta, now)
+                user_state = self._update_scope(conn, "user", app_name, user_id,
+                                                user_delta, now)
+            return _merge_state(app_state, user_state, session_state)
+
+        merged = await self.pool.run(create)
+        return Session(app_name=app_name, user_id=user_id, id=session_id, state=merged,
+                       events=[], last_update_time=now)
+
+    async def get_session(self, *, app_name, user_id, session_id, config=None):
+        def load(conn):
+            row = conn.execute(
+                "SELECT state, update_time FROM sessions"
+                " WHERE app_name=? AND user_id=? AND id=?",
+                (app_name, user_id, session_id)).fetchone()
+            if row is None:
+                return None
+            query = ["SELECT event_data FROM events"
+                     " WHERE app_name=? AND user_id=? AND session_id=?"]
+            params = [app_name, user_id, session_id]
+            if config and config.after_timestamp:
+                query.append("AND timestamp >= ?")
+                params.append(config.after_timestamp)
+            query.append("ORDER BY timestamp DESC, seq DESC")
+            if config and config.num_recent_events is not None:
+                query.append("LIMIT ?")
+                params.append(config.num_recent_events)
+            events = [r["event_data"] for r in conn.execute(" ".join(query), params)]
+            return (row["state"], row["update_time"], events,
+                    self._scope_state(conn, "app", app_name, None),
+                    self._scope_state(conn, "user", app_name, user_id))
+
+        loaded = await self.pool.run(load)
+        if loaded is None:
+            return None
+        state, update_time, events, app_state, user_state = loaded
+        return Session(
+            app_name=app_name, user_id=user_id, id=session_id,
+            state=_merge_state(app_state, user_state, json.loads(state)),
+            events=[Event.model_validate_json(e) for e in reversed(events)],
+            last_update_time=update_time,
+        )
+
+    async def list_sessions(self, *, app_name, user_id=None):
+        def load(conn):
+            if user_id is None:
+                rows = conn.execute(
+                    "SELECT id, user_id, state, update_time FROM sessions"
+                    " WHERE app_name=? ORDER BY update_time, user_id, id",
+                    (app_name,)).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT id, user_id, state, update_time FROM sessions"
+                    " WHERE app_name=? AND user_id=? ORDER BY update_time, id",
+                    (app_name, user_id)).fetchall()
+            app_state = self._scope_state(conn, "app", app_name, None)
+            users = {r["user_id"]: self._scope_state(conn, "user", app_name, r["user_id"])
+                     for r in rows}
+            return rows, app_state, users
+
+        rows, app_state, users = await self.pool.run(load)
+        return ListSessionsResponse(sessions=[
+            Session(app_name=app_name, user_id=r["user_id"], id=r["id"],
+                    state=_merge_state(app_state, users[r["user_id"]], json.loads(r["state"])),
+                    events=[], last_update_time=r["update_time"])
+            for r in rows
+        ])
+
+    async def delete_session(self, *, app_name, user_id, session_id):
+        def delete(conn):
+            with self._transaction(conn):
+                conn.execute("DELETE FROM events WHERE app_name=? AND user_id=?"
+                             " AND session_id=?", (app_name, user_id, session_id))
+                conn.execute("DELETE FROM sessions WHERE app_name=? AND user_id=? AND id=?",
+                             (app_name, user_id, session_id))
+
+        await self.flush()
+        await self.pool.run(delete)
+
+    async def get_user_state(self, *, app_name, user_id):
+        return await self.pool.run(self._scope_state, "user", app_name, user_id)
+
+    # ----- events -----
+
+    async def append_event(self, session, event):
+        if event.partial:
+            return event
+        self._apply_temp_state(session, event)
+        event = self._trim_temp_delta_state(event)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((session, event, future))
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush_pending())
+        await future
+        session.last_update_time = event.timestamp
+        return self._commit_event_to_session(session, event)
+
+    async def flush(self):
+        """Wait until every pending append has been written."""
+        if self._flush_task is not None:
+            await asyncio.shield(self._flush_task)
+
+    async def _flush_pending(self):
+        # Give concurrent appends a moment to join this transaction.
+        if len(self._pending) < self.max_batch:
+            await asyncio.sleep(self.batch_window)
+        try:
+            while self._pending:
+                batch, self._pending = (self._pending[:self.max_batch],
+                                        self._pending[self.max_batch:])
+                try:
+                    errors = await asyncio.to_thread(self._write_batch, batch)
+                except Exception as e:
+                    errors = [e] * len(batch)
+                for (_, _, future), error in zip(batch, errors):
+                    if future.done():
+                        continue
+                    if error is None:
+                        future.set_result(None)
+                    else:
+                        future.set_exception(error)
+        finally:
+            self._flush_task = None
+
+    def _write_batch(self, batch):
+        """Write a batch of appends in one transaction; returns per-item errors."""
+        errors = []
+        with self.pool.connection() as conn, self._transaction(conn):
+            for session, event, _ in batch:
+                errors.append(self._write_event(conn, session, event))
+        self.batches += 1
+        self.appended += sum(error is None for error in errors)
+        return errors
+
+    def _write_event(self, conn, session, event):
+        key = (session.app_name, session.user_id, session.id)
+        row = conn.execute("SELECT state FROM sessions WHERE app_name=? AND user_id=?"
+                           " AND id=?", key).fetchone()
+        if row is None:
+            return SessionNotFoundError(f"Session {session.id} not found.")
+        now = event.timestamp
+        session_state = None
+        if event.actions and event.actions.state_delta:
+            app_delta, user_delta, session_delta = _split_state(event.actions.state_delta)
+            self._update_scope(conn, "app", session.app_name, None, app_delta, now)
+            self._update_scope(conn, "user", session.app_name, session.user_id,
+                               user_delta, now)
+            if session_delta:
+                session_state = {**json.loads(row["state"]), **session_delta}
+        if session_state is None:
+            conn.execute("UPDATE sessions SET update_time=? WHERE app_name=? AND user_id=?"
+                         " AND id=?", (now, *key))
+        else:
+            conn.execute("UPDATE sessions SET state=?, update_time=? WHERE app_name=?"
+                         " AND user_id=? AND id=?", (_dumps(session_state), now, *key))
+        conn.execute(
+            "INSERT INTO events (id, app_name, user_id, session_id, invocation_id,"
+            " timestamp, event_data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (event.id, *key, event.invocation_id, now,
+             event.model_dump_json(exclude_none=True)))
+        return None
+
+    # ----- helpers -----
+
+    @contextmanager
+    def _transaction(self, conn):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _scope_state(conn, scope, app_name, user_id):
+        if scope == "app":
+            row = conn.execute("SELECT state FROM app_states WHERE app_name=?",
+                               (app_name,)).fetchone()
+        else:
+            row = conn.execute("SELECT state FROM user_states WHERE app_name=? AND user_id=?",
+                               (app_name, user_id)).fetchone()
+        return json.loads(row["state"]) if row else {}
+
+    def _update_scope(self, conn, scope, app_name, user_id, delta, now):
+        """Merge delta into app or user state (inside a transaction)."""
+        state = self._scope_state(conn, scope, app_name, user_id)
+        if not delta:
+            return state
+        state.update(delta)
+        if scope == "app":
+            conn.execute("INSERT OR REPLACE INTO app_states (app_name, state, update_time)"
+                         " VALUES (?, ?, ?)", (app_name, _dumps(state), now))
+        else:
+            conn.execute("INSERT OR REPLACE INTO user_states (app_name, user_id, state,"
+                         " update_time) VALUES (?, ?, ?, ?)",
+                         (app_name, user_id, _dumps(state), now))
+        return state
+
+    def stats(self):
+        return {"appended": self.appended, "batches": self.batches,
+                "events_per_batch": self.appended / self.batches if self.batches else 0.0}
+
+    def close(self):
+        self.pool.close()
+
+
+__all__ = ['ConnectionPool', 'PooledSqliteSessionService']
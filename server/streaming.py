@@ -0,0 +1,199 @@
+# Architecture Assistant - Streaming Chat Server
+#
+# Runs root_agent with ADK's SSE streaming mode and forwards partial text
+# from whichever agent holds the turn as soon as it arrives, over Server-Sent
+# Events or a websocket. Handoffs and tool calls are sent as separate events
+# so clients can show "handing you to..." or "researching..." states, and
+# every turn ends with a "done" event carrying its time to first token.
+#
+#   python -m architecture_assistant.server.streaming --port 8080
+#
+# Event types: text (delta), message (complete agent message), handoff,
+# tool_call, tool_result, error, done.
+
+import argparse
+import json
+import logging
+import time
+
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.runners import Runner
+from google.genai import types
+from pydantic import BaseModel
+
+from ..services.telemetry import default_telemetry
+from .session_store import PooledSqliteSessionService
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = "architecture_assistant"
+TRANSFER_TOOL = "transfer_to_agent"
+
+
+class NewSession(BaseModel):
+    user_id: str = "user"
+    session_id: str | None = None  # Chosen by the cluster front end for affinity
+
+
+class UserMessage(BaseModel):
+    message: str
+    user_id: str = "user"
+
+
+class TurnEvents:
+    """Translates one turn's ADK events into client events.
+
+    Partial events become text deltas. A final event repeats the text that
+    was already streamed, so it only becomes a "message" event (plus a delta
+    when nothing was streamed, e.g. replies produced by local callbacks).
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ttft_s = None
+        self._streaming_author = None
+
+    def translate(self, event):
+        author = event.author
+        parts = event.content.parts if event.content and event.content.parts else []
+        text = "".join(p.text for p in parts if p.text and not p.thought)
+        payloads = []
+
+        if event.partial:
+            if text:
+                self._streaming_author = author
+                payloads.append(self._delta(author, text))
+            return payloads
+
+        if text and author != "user":
+            if self._streaming_author != author:
+                payloads.append(self._delta(author, text))
+            payloads.append({"type": "message", "author": author, "text": text})
+        self._streaming_author = None
+
+        for part in parts:
+            call, response = part.function_call, part.function_response
+            if call and call.name == TRANSFER_TOOL:
+                payloads.append({"type": "handoff", "from": author,
+                                 "to": (call.args or {}).get("agent_name")})
+            elif call:
+                payloads.append({"type": "tool_call", "author": author,
+                                 "name": call.name, "args": call.args or {}})
+            elif response and response.name != TRANSFER_TOOL:
+                payloads.append({"type": "tool_result", "author": author,
+                                 "name": response.name})
+        return payloads
+
+    def done(self):
+        return {"type": "done",
+                "ttft_ms": None if self.ttft_s is None else round(self.ttft_s * 1000, 1),
+                "duration_ms": round((time.perf_counter() - self.started) * 1000, 1)}
+
+    def _delta(self, author, text):
+        if self.ttft_s is None:
+            self.ttft_s = time.perf_counter() - self.started
+        return {"type": "text", "author": author, "delta": text}
+
+
+async def stream_turn(runner, user_id, session_id, message):
+    """Run one user turn with streaming and yield client event dicts."""
+    turn = TurnEvents()
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+    content = types.Content(role="user", parts=[types.Part(text=message)])
+    try:
+        async for event in runner.run_async(user_id=user_id, session_id=session_id,
+                                            new_message=content, run_config=run_config):
+            for payload in turn.translate(event):
+                yield payload
+    except Exception as e:  # Surface the failure to the client, then end the turn
+        logger.exception("Turn failed for session %s", session_id)
+        yield {"type": "error", "message": str(e)}
+    done = turn.done()
+    telemetry = default_telemetry()
+    if telemetry is not None:
+        telemetry.record_turn(turn.ttft_s, done["duration_ms"] / 1000)
+    yield done
+
+
+def sse_format(payload):
+    return f"event: {payload['type']}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
+def create_app(agent=None, session_service=None, app_name=APP_NAME):
+    """FastAPI app serving agent (default: root_agent) with streaming replies."""
+    if agent is None:
+        from ..agent import root_agent as agent
+    session_service = session_service or PooledSqliteSessionService.from_env()
+    runner = Runner(app_name=app_name, agent=agent, session_service=session_service)
+    app = FastAPI(title="Architecture Assistant")
+
+    async def require_session(user_id, session_id):
+        session = await session_service.get_session(app_name=app_name, user_id=user_id,
+                                                    session_id=session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Unknown session")
+
+    @app.post("/sessions")
+    async def create_session(body: NewSession):
+        try:
+            session = await session_service.create_session(
+                app_name=app_name, user_id=body.user_id, session_id=body.session_id)
+        except AlreadyExistsError:
+            raise HTTPException(status_code=409, detail="Session already exists") from None
+        return {"session_id": session.id, "user_id": session.user_id}
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    @app.post("/sessions/{session_id}/messages")
+    async def send_message(session_id: str, body: UserMessage):
+        await require_session(body.user_id, session_id)
+
+        async def events():
+            async for payload in stream_turn(runner, body.user_id, session_id, body.message):
+                yield sse_format(payload)
+
+        return StreamingResponse(events(), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache",
+                                          "X-Accel-Buffering": "no"})
+
+    @app.websocket("/sessions/{session_id}/ws")
+    async def chat_socket(websocket: WebSocket, session_id: str, user_id: str = "user"):
+        await websocket.accept()
+        try:
+            await require_session(user_id, session_id)
+        except HTTPException:
+            await websocket.close(code=4404)
+            return
+        try:
+            while True:
+                request = await websocket.receive_json()
+                async for payload in stream_turn(runner, user_id, session_id,
+                                                 request.get("message", "")):
+                    await websocket.send_text(json.dumps(payload, default=str))
+        except WebSocketDisconnect:
+            pass
+
+    app.state.runner = runner
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Streaming Architecture Assistant server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+    uvicorn.run(create_app(), host=args.host, port=args.port)
+
+
+__all__ = ['TurnEvents', 'create_app', 'sse_format', 'stream_turn']
+
+
+if __name__ == "__main__":
+    main()
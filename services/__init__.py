@@ -0,0 +1,13 @@
+# Copyright 2025
+# Architecture Assistant - Shared Runtime Services
+#
+# Framework-independent building blocks (caches, stores, text utilities)
+# used by the agents in ../agents
+
+from .search_cache import SearchCache, default_search_cache, normalize_query
+
+__all__ = [
+    'SearchCache',
+    'default_search_cache',
+    'normalize_query',
+]
@@ -0,0 +1,179 @@
+# Architecture Assistant - Deterministic Architecture Checks
+#
+# Rule-based review of an analyze_requirements_agent proposal. Clear-cut
+# proposals are approved or rejected locally; anything ambiguous is left to
+# the LLM validator (double_check_agent). Technologies are judged only where
+# the Technology Stack section lists them, and only when not ruled out.
+
+import re
+from dataclasses import dataclass, field
+
+APPROVE = "approve"
+REJECT = "reject"
+UNSURE = "unsure"
+
+# Section name -> patterns for its heading line (a markdown heading or a
+# line in bold); words elsewhere in the prose don't count
+REQUIRED_SECTIONS = {
+    "architecture pattern": [r"\barchitectur(e|al) pattern", r"\bpattern\b", r"\barchitecture\b"],
+    "technology stack": [r"\btech(nology)? stack\b", r"\bstack\b", r"\btechnolog(y|ies)\b"],
+    "key design decisions": [r"\bdecisions?\b"],
+    "implementation approach": [r"\bimplementation\b", r"\bapproach\b", r"\bphases?\b",
+                                r"\broll-?out\b"],
+}
+_HEADING_RE = re.compile(r"^[ \t]*(?:#{1,6}[ \t]+|\*\*|__)(.+)$", re.MULTILINE)
+_MD_HEADING_RE = re.compile(r"^[ \t]*(#{1,6})[ \t]+(.+)$")
+
+# Requirement signal -> (patterns in the requirements, technologies in the
+# Technology Stack section that cover it). Only concrete technologies count:
+# "mobile-friendly later" doesn't build an iOS app
+STACK_EXPECTATIONS = {
+    "mobile app": (
+        [r"\bmobile\b", r"\bios\b", r"\bandroid\b", r"app store", r"\bphone app\b"],
+        [r"react native", r"\bflutter\b", r"\bswift(ui)?\b", r"\bkotlin\b", r"\bionic\b",
+         r"\bexpo\b", r"\bcapacitor\b", r"\bxamarin\b", r"\.net maui\b"],
+    ),
+    "payments": (
+        [r"\bpayments?\b", r"\bpay\b", r"billing", r"subscriptions?", r"checkout"],
+        [r"\bstripe\b", r"\bpaypal\b", r"\bbraintree\b", r"\badyen\b", r"\bpaddle\b",
+         r"\brevenuecat\b", r"\bstorekit\b", r"google play billing", r"square (payments|sdk)"],
+    ),
+    "real-time updates": (
+        [r"real[- ]time", r"live tracking", r"\bgps\b", r"\btracking\b", r"\bchat\b"],
+        [r"websockets?", r"socket\.io", r"\bfirebase\b", r"\bsupabase realtime\b",
+         r"\bpusher\b", r"\bably\b", r"\bmqtt\b", r"\bsignalr\b", r"\bmapbox\b",
+         r"google maps"],
+    ),
+}
+
+# A clause with one of these words rules a technology out or puts it off
+_NEGATION_RE = re.compile(
+    r"\b(avoid\w*|instead of|rather than|not|no|never|without|skip\w*|defer\w*|"
+    r"later|phase [2-9]|don't|won't|isn't)\b")
+_CLAUSE_RE = re.compile(r"[.;!?](?:\s|$)|\n")
+
+# Small teams and budgets -> stack terms that are clear over-engineering
+SMALL_SCALE_PATTERNS = [
+    r"limited budget", r"tight budget", r"small budget", r"\bsolo\b",
+    r"\bbootstrapp", r"\bjust me\b", r"one developer", r"small team",
+]
+HEAVY_STACK_PATTERNS = {
+    "microservices": r"microservices",
+    "Kubernetes": r"kubernetes|\bk8s\b",
+    "Kafka": r"\bkafka\b",
+}
+
+
+@dataclass
+class ValidationResult:
+    verdict: str
+    missing_sections: list = field(default_factory=list)
+    conflicts: list = field(default_factory=list)
+    uncovered: list = field(default_factory=list)
+
+    def feedback(self):
+        """Actionable feedback for the architecture analyzer."""
+        lines = []
+        if self.missing_sections:
+            lines.append("The proposal is missing these required sections: "
+                         + ", ".join(self.missing_sections) + ".")
+        for conflict in self.conflicts:
+            lines.append(conflict)
+        for signal in self.uncovered:
+            lines.append(f"The requirements call for {signal}, but the "
+                         "technology stack does not address it.")
+        return "\n".join(f"- {l}" for l in lines)
+
+
+def _mentions(text, patterns):
+    return any(re.search(p, text) for p in patterns)
+
+
+def _headings(text):
+    return "\n".join(title.strip(" *_#:") for title in _HEADING_RE.findall(text))
+
+
+def _stack_section(text):
+    """Body of the Technology Stack section ("" if there is none).
+
+    Under a markdown heading it runs to the next heading of the same or a
+    higher level; under a bold line, to the next heading or bold line.
+    """
+    patterns = REQUIRED_SECTIONS["technology stack"]
+    lines = text.splitlines()
+    for start, line in enumerate(lines):
+        heading = _HEADING_RE.match(line)
+        if heading is None or not _mentions(heading.group(1).strip(" *_#:"), patterns):
+            continue
+        level = _MD_HEADING_RE.match(line)
+        body = []
+        for line in lines[start + 1:]:
+            if level is None and _HEADING_RE.match(line):
+                break
+            inner = _MD_HEADING_RE.match(line)
+            if level is not None and inner and len(inner.group(1)) <= len(level.group(1)):
+                break
+            body.append(line)
+        return "\n".join(body)
+    return ""
+
+
+def _affirmed(text, pattern):
+    """Whether a clause of text mentions pattern without negating it."""
+    return any(re.search(pattern, clause) and not _NEGATION_RE.search(clause)
+               for clause in _CLAUSE_RE.split(text))
+
+
+def validate_architecture(proposal, requirements):
+    """Check a proposal's structure and its fit with the requirements text.
+
+    Approves only when at least one requirement signal (STACK_EXPECTATIONS
+    or SMALL_SCALE_PATTERNS) was checked; otherwise the LLM reviews it.
+    """
+    if not proposal or not proposal.strip():
+        return ValidationResult(UNSURE)
+    proposal_lc = proposal.lower()
+    requirements_lc = (requirements or "").lower()
+
+    headings = _headings(proposal_lc)
+    missing = [name for name, patterns in REQUIRED_SECTIONS.items()
+               if not _mentions(headings, patterns)]
+    if missing:
+        return ValidationResult(REJECT, missing_sections=missing)
+    if not requirements_lc:
+        return ValidationResult(UNSURE)
+
+    # Technologies count only where the stack lists them, and not when the
+    # clause rules them out ("we avoid microservices")
+    stack = _stack_section(proposal_lc)
+    conflicts = []
+    small_scale = _mentions(requirements_lc, SMALL_SCALE_PATTERNS)
+    if small_scale:
+        for name, pattern in HEAVY_STACK_PATTERNS.items():
+            if _affirmed(stack, pattern):
+                conflicts.append(f"{name} is heavy for the small team and budget "
+                                 "in the requirements; propose something simpler.")
+    if conflicts:
+        return ValidationResult(REJECT, conflicts=conflicts)
+    if small_scale and _mentions(proposal_lc, HEAVY_STACK_PATTERNS.values()):
+        return ValidationResult(UNSURE)   # Mentioned, but not clearly chosen
+
+    signals = [signal for signal, (needs, _) in STACK_EXPECTATIONS.items()
+               if _mentions(requirements_lc, needs)]
+    uncovered = [signal for signal in signals
+                 if not any(_affirmed(stack, p) for p in STACK_EXPECTATIONS[signal][1])]
+    if uncovered:
+        # A gap may be deliberate (e.g. payments deferred); let the LLM judge.
+        return ValidationResult(UNSURE, uncovered=uncovered)
+    if not signals and not small_scale:
+        return ValidationResult(UNSURE)   # Nothing in the requirements was checked
+    return ValidationResult(APPROVE)
+
+
+__all__ = [
+    'APPROVE',
+    'REJECT',
+    'UNSURE',
+    'ValidationResult',
+    'validate_architecture',
+]
@@ -0,0 +1,210 @@
+# Architecture Assistant - Rolling Conversation Compaction
+#
+# Long sessions (a 40-turn discovery followed by the architecture and roadmap
+# loops) would otherwise send an ever-growing history on every model call.
+# Before each call the history is fitted to a token budget:
+# - the most recent turns are kept verbatim
+# - handoff messages and the requirements summary are always kept verbatim
+#   (their text only: a transfer call in the same content would lose its
+#   function response to the summaries, which Gemini rejects)
+# - everything older is replaced by short per-turn summaries, which are
+#   cached by content hash so they are computed once per turn
+
+import hashlib
+import os
+import re
+from collections import OrderedDict
+
+from .handoff import HANDOFF_MARKER
+from .tokens import estimate_content_tokens, estimate_tokens
+
+DEFAULT_TOKEN_BUDGET = 8000
+DEFAULT_KEEP_RECENT_TURNS = 4
+_SUMMARY_CACHE_SIZE = 4096
+
+REQUIREMENTS_MARKER = "What We Discovered Together"
+# Content containing any of these markers is never summarized away
+PINNED_MARKERS = (HANDOFF_MARKER, REQUIREMENTS_MARKER)
+
+SUMMARY_HEADER = "[Summary of earlier conversation]"
+
+# ADK re-labels other agents' messages as user content starting with this
+_FOR_CONTEXT_PREFIX = "For context:"
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def content_text(content):
+    return "\n".join(p.text for p in content.parts or [] if p.text)
+
+
+def extractive_summary(role, text, max_chars=160):
+    """First sentence (or heading) of a message, trimmed to max_chars."""
+    lines = [l.strip(" #*-") for l in text.splitlines() if l.strip(" #*-")]
+    if not lines:
+        return ""
+    first = _SENTENCE_RE.split(lines[0], maxsplit=1)[0]
+    if len(first) > max_chars:
+        first = first[:max_chars - 1].rstrip() + "…"
+    return f"{role}: {first}"
+
+
+def is_user_message(content):
+    """True for genuine user messages (not other agents' relabeled replies)."""
+    if content.role != "user":
+        return False
+    text = content_text(content)
+    return bool(text) and not text.startswith(_FOR_CONTEXT_PREFIX)
+
+
+def _is_pinned(content):
+    text = content_text(content)
+    return any(marker in text for marker in PINNED_MARKERS)
+
+
+def _pinned_text(content, types):
+    """content without function call/response parts, which aren't pinned with it."""
+    parts = [p for p in content.parts or [] if not (p.function_call or p.function_response)]
+    if len(parts) == len(content.parts or []):
+        return content
+    return types.Content(role=content.role, parts=parts)
+
+
+def split_turns(contents):
+    """Group contents into turns, each starting at a genuine user message."""
+    turns = []
+    for content in contents:
+        if not turns or is_user_message(content):
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+class HistoryCompactor:
+    """Fits llm_request.contents to a token budget.
+
+    Args:
+        token_budget: Target size of the history in (estimated) tokens.
+        keep_recent_turns: Number of latest turns that are never summarized.
+        summarizer: Callable (role, text) -> one-line summary.
+    """
+
+    def __init__(self, token_budget=DEFAULT_TOKEN_BUDGET,
+                 keep_recent_turns=DEFAULT_KEEP_RECENT_TURNS,
+                 summarizer=extractive_summary):
+        self.token_budget = token_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.summarizer = summarizer
+        self._summaries = OrderedDict()
+        self.compactions = 0
+        self.summaries_computed = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            token_budget=int(os.getenv("HISTORY_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET)),
+            keep_recent_turns=int(os.getenv("HISTORY_KEEP_RECENT_TURNS",
+                                            DEFAULT_KEEP_RECENT_TURNS)),
+        )
+
+    def compact(self, contents):
+        """Return a (possibly) shorter list of contents within the budget."""
+        from google.genai import types
+
+        before = estimate_content_tokens(contents)
+        turns = split_turns(contents)
+        if before <= self.token_budget or len(turns) <= self.keep_recent_turns:
+            return contents
+
+        recent = [c for turn in turns[-self.keep_recent_turns:] for c in turn]
+        budget = self.token_budget - estimate_content_tokens(recent)
+
+        # Walk older turns newest-first so the budget favors recent context.
+        older = []
+        for turn in reversed(turns[:-self.keep_recent_turns]):
+            pinned = [_pinned_text(c, types) for c in turn if _is_pinned(c)]
+            lines = [self._summary(c) for c in turn if not _is_pinned(c)]
+            lines = [l for l in lines if l]
+            cost = estimate_content_tokens(pinned) + sum(estimate_tokens(l) for l in lines)
+            if cost > budget and not pinned:
+                continue
+            if cost > budget:
+                lines = []
+            budget -= cost
+            older.append((lines, pinned))
+        older.reverse()
+
+        compacted, pending = [], []
+        for lines, pinned in older:
+            pending.extend(lines)
+            if pinned:
+                if pending:
+                    compacted.append(_summary_content(types, pending))
+                    pending = []
+                compacted.extend(pinned)
+        if pending:
+            compacted.append(_summary_content(types, pending))
+        compacted.extend(recent)
+
+        self.compactions += 1
+        self.tokens_before += before
+        self.tokens_after += estimate_content_tokens(compacted)
+        return compacted
+
+    def stats(self):
+        return {
+            "compactions": self.compactions,
+            "summaries_computed": self.summaries_computed,
+            "cached_summaries": len(self._summaries),
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+        }
+
+    def _summary(self, content):
+        text = content_text(content)
+        if not text:
+            return ""
+        role = "Assistant" if content.role == "model" else "User"
+        key = hashlib.sha256(f"{role}\0{text}".encode()).hexdigest()
+        summary = self._summaries.get(key)
+        if summary is None:
+            summary = self.summarizer(role, text)
+            self.summaries_computed += 1
+            self._summaries[key] = summary
+            while len(self._summaries) > _SUMMARY_CACHE_SIZE:
+                self._summaries.popitem(last=False)
+        else:
+            self._summaries.move_to_end(key)
+        return summary
+
+
+def _summary_content(types, lines):
+    text = SUMMARY_HEADER + "\n" + "\n".join(f"- {l}" for l in lines)
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+_default_compactor = None
+
+
+def default_compactor():
+    global _default_compactor
+    if _default_compactor is None:
+        _default_compactor = HistoryCompactor.from_env()
+    return _default_compactor
+
+
+def compact_history_callback(callback_context, llm_request):
+    """before_model_callback: keep the request history within budget."""
+    llm_request.contents = default_compactor().compact(llm_request.contents)
+    return None
+
+
+__all__ = [
+    'HistoryCompactor',
+    'compact_history_callback',
+    'default_compactor',
+    'extractive_summary',
+    'is_user_message',
+    'split_turns',
+]
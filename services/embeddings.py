@@ -0,0 +1,126 @@
+# Architecture Assistant - Text Embeddings
+#
+# Dense vectors for similarity lookups (knowledge index, response cache).
+# The local embedder hashes words and word pairs into a fixed number of
+# dimensions: no model, no network, deterministic across processes. The
+# Gemini embedder is better at paraphrases but costs an API call per batch.
+# Vectors are L2-normalized, so cosine similarity is a dot product.
+# MappedVectors reads a flat float32 file through mmap, so large indexes
+# are paged in on demand instead of loaded up front.
+
+import hashlib
+import math
+import mmap
+import os
+from array import array
+
+from .text import tokenize
+
+DEFAULT_DIM = 256
+DEFAULT_GEMINI_MODEL = "text-embedding-004"
+
+
+def _normalize(vector):
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def cosine(a, b):
+    """Similarity of two normalized vectors."""
+    return sum(x * y for x, y in zip(a, b))
+
+
+class HashingEmbedder:
+    """Signed feature hashing of words and adjacent word pairs."""
+
+    def __init__(self, dim=DEFAULT_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _embed_one(self, text):
+        tokens = tokenize(text, drop_stopwords=True)
+        vector = [0.0] * self.dim
+        for feature in tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]:
+            digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        return _normalize(vector)
+
+    def embed(self, texts):
+        return [self._embed_one(text) for text in texts]
+
+
+class GeminiEmbedder:
+    """Gemini embedding model (needs GOOGLE_API_KEY)."""
+
+    def __init__(self, model=DEFAULT_GEMINI_MODEL, client=None):
+        self.model = model
+        self.name = f"gemini-{model}"
+        self._client = client
+        self.dim = None
+
+    def embed(self, texts):
+        if self._client is None:
+            from google import genai
+
+            self._client = genai.Client()
+        response = self._client.models.embed_content(model=self.model, contents=list(texts))
+        vectors = [_normalize(list(e.values)) for e in response.embeddings]
+        if vectors:
+            self.dim = len(vectors[0])
+        return vectors
+
+
+def embedder_from_env():
+    """EMBEDDINGS_BACKEND=local (default) | gemini | off; None when off."""
+    backend = os.getenv("EMBEDDINGS_BACKEND", "local").lower()
+    if backend == "off":
+        return None
+    if backend == "gemini":
+        return GeminiEmbedder(os.getenv("EMBEDDINGS_MODEL", DEFAULT_GEMINI_MODEL))
+    return HashingEmbedder(int(os.getenv("EMBEDDINGS_DIM", DEFAULT_DIM)))
+
+
+def write_vectors(path, vectors):
+    """Write equal-length vectors to path as one flat float32 array."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        for vector in vectors:
+            array("f", vector).tofile(f)
+    os.replace(tmp, path)
+
+
+class MappedVectors:
+    """Read-only rows of a write_vectors file, memory-mapped."""
+
+    def __init__(self, path, dim):
+        self.dim = dim
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._view = memoryview(self._map).cast("f") if size else memoryview(array("f"))
+        self.rows = len(self._view) // dim if dim else 0
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, row):
+        if not 0 <= row < self.rows:
+            raise IndexError(row)
+        return self._view[row * self.dim:(row + 1) * self.dim]
+
+    def close(self):
+        self._view.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+__all__ = [
+    'GeminiEmbedder',
+    'HashingEmbedder',
+    'MappedVectors',
+    'cosine',
+    'embedder_from_env',
+    'write_vectors',
+]
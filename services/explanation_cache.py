@@ -0,0 +1,144 @@
+# Architecture Assistant - Pre-generated Trade-off Explanations
+#
+# The same handful of trade-offs (monolith vs microservices, SQL vs NoSQL,
+# ...) come up in almost every conversation, and the educator writes a fresh
+# several-hundred-token explanation each time. The explanations are written
+# once as markdown files; a question that matches one is answered with the
+# stored explanation and only a short "For Your Situation" paragraph is
+# generated against the session's context.
+#
+# Explanation files start with one "<!-- option: regex -->" line per side of
+# the trade-off, followed by the explanation in the educator's format.
+
+import logging
+import re
+import statistics
+from collections import Counter, deque
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_OPTION_RE = re.compile(r"^<!--\s*option:\s*(?P<pattern>.+?)\s*-->\s*$")
+_TITLE_RE = re.compile(r"^##\s*Decision:\s*(?P<title>.+)$", re.MULTILINE)
+# A question naming one side only asks for the trade-off when it compares
+# that side with an unnamed alternative: "microservices or something
+# simpler?", "the alternatives to Postgres". Compared with anything else
+# ("SQL injection or XSS"), it is some other question
+_COMPARE_WORDS = (r"vs\.?|versus|or|compared?\s+(?:to|with)|instead\s+of|rather\s+than"
+                  r"|over")
+_ALTERNATIVE = (r"(?:something|anything)(?:\s+(?:else|simpler|lighter|cheaper|different))?"
+                r"|(?:the\s+)?alternatives?|(?:the\s+)?other\s+(?:options?|approaches?)"
+                r"|the\s+other\s+(?:one|way)")
+_COMPARED_BEFORE_RE = re.compile(
+    rf"\b(?:{_ALTERNATIVE})\s+(?:{_COMPARE_WORDS}|to)\s+$", re.IGNORECASE)
+_COMPARED_AFTER_RE = re.compile(
+    rf"^\s+(?:{_COMPARE_WORDS}|and|with|to)\s+(?:{_ALTERNATIVE})\b", re.IGNORECASE)
+_LATENCY_WINDOW = 200
+
+
+@dataclass
+class Explanation:
+    key: str
+    title: str
+    options: list      # Compiled regexes, one per side of the trade-off
+    text: str
+
+    def score(self, message):
+        """Number of sides the message mentions (0 = not about this trade-off)."""
+        return sum(1 for option in self.options if option.search(message))
+
+    def compared(self, message):
+        """Whether a side the message mentions is compared with an unnamed alternative."""
+        for option in self.options:
+            for match in option.finditer(message):
+                if (_COMPARED_BEFORE_RE.search(message[:match.start()])
+                        or _COMPARED_AFTER_RE.match(message[match.end():])):
+                    return True
+        return False
+
+
+def load_explanation(path):
+    """Parse one explanation file; raises ValueError if it has no options."""
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    options = []
+    while lines and (match := _OPTION_RE.match(lines[0])):
+        options.append(re.compile(match.group("pattern"), re.IGNORECASE))
+        lines.pop(0)
+    if not options:
+        raise ValueError(f"{path}: no '<!-- option: ... -->' lines")
+    text = "\n".join(lines).strip()
+    title = _TITLE_RE.search(text)
+    return Explanation(key=Path(path).stem, title=title.group("title").strip() if title
+                       else Path(path).stem, options=options, text=text)
+
+
+class ExplanationCache:
+    """Stored explanations with hit-rate and latency bookkeeping.
+
+    Args:
+        directory: Folder of *.md explanation files.
+    """
+
+    def __init__(self, directory):
+        self.explanations = {}
+        for path in sorted(Path(directory).glob("*.md")):
+            try:
+                explanation = load_explanation(path)
+            except ValueError as exc:
+                logger.warning("Skipping explanation: %s", exc)
+                continue
+            self.explanations[explanation.key] = explanation
+        self.lookups = 0
+        self.hits = Counter()
+        # Seconds per answered question: personalized hits vs full generation
+        self._hit_latency = deque(maxlen=_LATENCY_WINDOW)
+        self._miss_latency = deque(maxlen=_LATENCY_WINDOW)
+
+    def match(self, message):
+        """Best-matching explanation for a question, or None.
+
+        A message matches when it names both sides of a trade-off, or one
+        side compared with an unnamed alternative ("microservices or something
+        simpler?"). Other mentions ("how do I protect against SQL injection or
+        XSS?") don't.
+        """
+        if not message:
+            return None
+        self.lookups += 1
+        best, best_score = None, 0
+        for explanation in self.explanations.values():
+            score = explanation.score(message)
+            if score > best_score:
+                best, best_score = explanation, score
+        if best is None or (best_score < 2 and not best.compared(message)):
+            return None
+        self.hits[best.key] += 1
+        return best
+
+    def record_hit(self, seconds):
+        """Time spent personalizing a stored explanation."""
+        self._hit_latency.append(seconds)
+
+    def record_miss(self, seconds):
+        """Time spent generating an explanation from scratch."""
+        self._miss_latency.append(seconds)
+
+    def stats(self):
+        hits = sum(self.hits.values())
+        hit_s = statistics.median(self._hit_latency) if self._hit_latency else None
+        miss_s = statistics.median(self._miss_latency) if self._miss_latency else None
+        saved = (round(max(0.0, miss_s - hit_s) * hits, 3)
+                 if hit_s is not None and miss_s is not None else None)
+        return {
+            "lookups": self.lookups,
+            "hits": hits,
+            "hit_rate": round(hits / self.lookups, 3) if self.lookups else None,
+            "hits_by_topic": dict(self.hits),
+            "personalized_p50_ms": round(hit_s * 1000, 1) if hit_s is not None else None,
+            "generated_p50_ms": round(miss_s * 1000, 1) if miss_s is not None else None,
+            "estimated_saved_s": saved,
+        }
+
+
+__all__ = ['Explanation', 'ExplanationCache', 'load_explanation']
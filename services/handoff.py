@@ -0,0 +1,111 @@
+# Architecture Assistant - Handoff Signal Detection
+#
+# Local matching of the two signals that end a sub-agent's turn:
+# - the agent's own MANDATORY HANDOFF MESSAGE at the end of its reply
+# - a user completion phrase ("Looks good", "Got it", ...)
+# Both are read straight from the agent prompts so the prompts stay the
+# single source of truth.
+
+import re
+from difflib import SequenceMatcher
+
+from .text import normalize_text
+
+# Every handoff message contains this sentence fragment
+HANDOFF_MARKER = "hand you back to the main assistant"
+
+DEFAULT_FUZZY_THRESHOLD = 0.85
+# Completion phrases only count in short replies; longer messages usually
+# carry new information the agent must respond to.
+MAX_COMPLETION_WORDS = 12
+MIN_PHRASE_COVERAGE = 0.5
+
+_QUOTED_RE = re.compile(r'"([^"\n]+)"')
+_PHRASE_LINE_RE = re.compile(r'^\s*-\s*"([^"]+)"\s*$', re.MULTILINE)
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SENTENCE_END_RE = re.compile(r"[.!?]+(?:\s+|$)")
+
+
+def _canonical(text):
+    return " ".join(_PUNCT_RE.sub(" ", normalize_text(text)).split())
+
+
+def parse_handoff_spec(prompt):
+    """Extract (handoff_message, completion_phrases) from an agent prompt."""
+    handoff = None
+    section = prompt.split("MANDATORY HANDOFF MESSAGE", 1)
+    if len(section) == 2:
+        match = _QUOTED_RE.search(section[1])
+        handoff = match.group(1) if match else None
+    criteria = prompt.split("COMPLETION CRITERIA", 1)
+    phrases = []
+    if len(criteria) == 2:
+        block = criteria[1].split("\n## ", 1)[0]
+        phrases = _PHRASE_LINE_RE.findall(block)
+    return handoff, phrases
+
+
+class HandoffDetector:
+    """Exact and fuzzy matching of handoff and completion signals.
+
+    Args:
+        handoff_message: The agent's mandatory handoff message.
+        completion_phrases: User phrases that mean the agent is done.
+        fuzzy_threshold: Minimum SequenceMatcher ratio for a fuzzy match.
+    """
+
+    def __init__(self, handoff_message, completion_phrases,
+                 fuzzy_threshold=DEFAULT_FUZZY_THRESHOLD):
+        self.handoff_message = handoff_message
+        self._handoff = _canonical(handoff_message or "")
+        self.completion_phrases = list(completion_phrases)
+        self._phrases = [(p, _canonical(p)) for p in self.completion_phrases]
+        self.fuzzy_threshold = fuzzy_threshold
+
+    @classmethod
+    def from_prompt(cls, prompt, **kwargs):
+        handoff, phrases = parse_handoff_spec(prompt)
+        return cls(handoff, phrases, **kwargs)
+
+    def is_handoff(self, text):
+        """True if an agent reply ends its turn with the handoff message.
+
+        The message only counts at the end of the reply; a reply that ends in
+        a question is still waiting for the user.
+        """
+        canonical = _canonical(text)
+        if not canonical or not self._handoff or text.rstrip().endswith("?"):
+            return False
+        tail = canonical[-int(len(self._handoff) * 1.2):]
+        sentences = [s for s in _SENTENCE_END_RE.split(text.strip()) if s.strip()]
+        if self._handoff in tail or HANDOFF_MARKER in _canonical(sentences[-1]):
+            return True
+        return SequenceMatcher(None, tail, self._handoff).ratio() >= self.fuzzy_threshold
+
+    def match_completion(self, text):
+        """Return (phrase, score) if a user message is a completion signal."""
+        if not text or "?" in text:
+            return None
+        canonical = _canonical(text)
+        if not canonical or len(canonical.split()) > MAX_COMPLETION_WORDS:
+            return None
+        best = None
+        for phrase, phrase_canonical in self._phrases:
+            if phrase_canonical in canonical:
+                # Share of the message the phrase covers: "ok got it" matches,
+                # "that makes sense but I'm worried about cost" does not.
+                score = len(phrase_canonical) / len(canonical)
+                threshold = MIN_PHRASE_COVERAGE
+            else:
+                score = SequenceMatcher(None, canonical, phrase_canonical).ratio()
+                threshold = self.fuzzy_threshold
+            if score >= threshold and (best is None or score > best[1]):
+                best = (phrase, score)
+        return best
+
+
+__all__ = [
+    'HANDOFF_MARKER',
+    'HandoffDetector',
+    'parse_handoff_spec',
+]
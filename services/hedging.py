@@ -0,0 +1,181 @@
+# Architecture Assistant - Hedged Calls and Deadlines
+#
+# Tail-latency control for calls whose callers block on them (searches).
+# A call that hasn't finished by the recent p90 latency gets a duplicate;
+# whichever finishes first wins and the other is cancelled. Every call can
+# also carry a deadline, after which both are cancelled and the caller falls
+# back to whatever it has.
+# - The hedge delay is learned from recent call latencies
+# - At most max_hedge_fraction of recent calls may be duplicated, so a slow
+#   backend doesn't double the load
+# - stats() reports latency percentiles and the duplicate-request overhead
+
+import asyncio
+import logging
+import os
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERCENTILE = 90
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_WINDOW = 200
+DEFAULT_MAX_HEDGE_FRACTION = 0.2
+DEFAULT_DEADLINE_SECONDS = 20.0
+
+
+class DeadlineExceeded(TimeoutError):
+    """A hedged call (and its duplicate) didn't finish before its deadline."""
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+class Hedger:
+    """Runs calls with a learned hedge delay and an optional deadline.
+
+    Args:
+        hedging: Start duplicates at all (deadlines and stats work either way).
+        percentile: Latency percentile after which a duplicate is started.
+        min_samples: Calls observed before the delay is learned; until then
+            initial_delay_s is used (None = don't hedge yet).
+        max_hedge_fraction: Cap on duplicated calls among the recent window.
+        deadline_s: Default per-call deadline (None = no deadline).
+    """
+
+    def __init__(self, hedging=True, percentile=DEFAULT_PERCENTILE,
+                 min_samples=DEFAULT_MIN_SAMPLES, window=DEFAULT_WINDOW,
+                 max_hedge_fraction=DEFAULT_MAX_HEDGE_FRACTION, initial_delay_s=None,
+                 deadline_s=DEFAULT_DEADLINE_SECONDS):
+        self.hedging = hedging
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_hedge_fraction = max_hedge_fraction
+        self.initial_delay_s = initial_delay_s
+        self.deadline_s = deadline_s
+        # What callers waited; a lower bound on the primary's latency when a
+        # hedge won or the deadline hit, which keeps the learned delay honest
+        self._latency = deque(maxlen=window)
+        self._hedged = deque(maxlen=window)     # Whether each recent call was duplicated
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadlines_exceeded = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls):
+        """SEARCH_HEDGING_ENABLED, SEARCH_HEDGE_PERCENTILE, SEARCH_HEDGE_MAX_FRACTION,
+        SEARCH_HEDGE_INITIAL_DELAY_SECONDS and SEARCH_DEADLINE_SECONDS (0 = none)."""
+        initial = float(os.getenv("SEARCH_HEDGE_INITIAL_DELAY_SECONDS", "8"))
+        deadline = float(os.getenv("SEARCH_DEADLINE_SECONDS", DEFAULT_DEADLINE_SECONDS))
+        return cls(
+            hedging=os.getenv("SEARCH_HEDGING_ENABLED", "true").lower() == "true",
+            percentile=float(os.getenv("SEARCH_HEDGE_PERCENTILE", DEFAULT_PERCENTILE)),
+            max_hedge_fraction=float(os.getenv("SEARCH_HEDGE_MAX_FRACTION",
+                                               DEFAULT_MAX_HEDGE_FRACTION)),
+            initial_delay_s=initial or None,
+            deadline_s=deadline or None,
+        )
+
+    def hedge_delay(self):
+        """Seconds after which a duplicate starts, or None (don't hedge)."""
+        if not self.hedging:
+            return None
+        if len(self._latency) < self.min_samples:
+            return self.initial_delay_s
+        return _percentile(self._latency, self.percentile)
+
+    def _may_hedge(self):
+        return sum(self._hedged) < self.max_hedge_fraction * max(len(self._hedged), 1) + 1
+
+    def remaining(self, deadline_at):
+        """Seconds until an absolute loop-time deadline (None = no deadline)."""
+        if deadline_at is None:
+            return None
+        return deadline_at - asyncio.get_running_loop().time()
+
+    async def run(self, call, deadline_at=None):
+        """Await call(), hedged; returns the first successful result.
+
+        Args:
+            call: Zero-argument function returning a new awaitable per attempt.
+            deadline_at: Absolute event-loop time; defaults to now + deadline_s.
+
+        Raises:
+            DeadlineExceeded: Nothing finished before the deadline.
+            Exception: The last attempt's error if every attempt failed.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        if deadline_at is None and self.deadline_s:
+            deadline_at = started + self.deadline_s
+        delay = self.hedge_delay()
+        primary = asyncio.ensure_future(call())
+        pending = {primary}
+        hedged = False
+        error = None
+        self.calls += 1
+        try:
+            while pending:
+                waits = []
+                if delay is not None and not hedged:
+                    waits.append(started + delay - loop.time())
+                if deadline_at is not None:
+                    waits.append(deadline_at - loop.time())
+                timeout = max(0.0, min(waits)) if waits else None
+                done, pending = await asyncio.wait(pending, timeout=timeout,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        elapsed = loop.time() - started
+                        self._record(elapsed, hedged)
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+                now = loop.time()
+                if deadline_at is not None and now >= deadline_at:
+                    self.deadlines_exceeded += 1
+                    self._record(now - started, hedged)
+                    raise DeadlineExceeded(f"No result within {now - started:.1f}s")
+                if (delay is not None and not hedged and pending
+                        and now >= started + delay and self._may_hedge()):
+                    hedged = True
+                    self.hedges += 1
+                    pending.add(asyncio.ensure_future(call()))
+                elif delay is not None and not hedged and now >= started + delay:
+                    delay = None  # Over the hedge budget: just wait
+            self.errors += 1
+            self._hedged.append(hedged)
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _record(self, elapsed, hedged):
+        self._latency.append(elapsed)
+        self._hedged.append(hedged)
+
+    def stats(self):
+        def ms(pct):
+            return round(_percentile(self._latency, pct) * 1000, 1) if self._latency else None
+
+        delay = self.hedge_delay()
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "duplicate_overhead": round(self.hedges / self.calls, 3) if self.calls else None,
+            "deadlines_exceeded": self.deadlines_exceeded,
+            "errors": self.errors,
+            "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None,
+            "p50_ms": ms(50),
+            "p90_ms": ms(90),
+            "p99_ms": ms(99),
+        }
+
+
+__all__ = ['DeadlineExceeded', 'Hedger']
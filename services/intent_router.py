@@ -0,0 +1,155 @@
+# Architecture Assistant - Local Intent Router
+#
+# Keyword rules plus TF-IDF nearest-example similarity. High-confidence
+# messages are routed without asking the orchestrator model; everything else
+# falls back to it. A keyword hit alone can't reach the threshold (the
+# message must also resemble an example). Negated messages ("I don't want
+# microservices") and acknowledgements ("Thanks! That explains the risks")
+# always fall back: bag-of-words scores can't tell them from requests that
+# use the same words. Counters track how often we route
+# locally and how often our prediction agrees with the model when it
+# decides instead.
+
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+from .text import tokenize
+
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_MIN_MARGIN = 0.15
+KEYWORD_WEIGHT = 0.3       # Below DEFAULT_THRESHOLD: keywords only add to similarity
+SIMILARITY_WEIGHT = 0.7
+
+_NEGATION_RE = re.compile(
+    r"\b(?:not|no|never|without|nor|cannot"
+    r"|(?:do|does|did|is|are|was|were|wo|ca|could|would|should)n['’]?t)\b", re.IGNORECASE)
+# Reaction to the last reply, unless it goes on to ask something
+_ACKNOWLEDGEMENT_RE = re.compile(
+    r"^\W*(?:thanks|thank you|ok(?:ay)?|got it|great|perfect|cool|nice|yes|yep|sure|right"
+    r"|sounds good|makes sense|understood|i see)\b[^?]*$", re.IGNORECASE)
+
+
+def _features(text):
+    tokens = tokenize(text, drop_stopwords=True)
+    return tokens + [f"{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+
+
+@dataclass
+class RoutingDecision:
+    target: str            # Best-scoring route, even when not confident
+    confidence: float
+    margin: float
+    confident: bool
+    scores: dict = field(default_factory=dict)
+    fallback_reason: str = None   # "negation" or "acknowledgement"
+
+
+class IntentRouter:
+    """Scores a message against labeled examples and keyword rules.
+
+    Args:
+        examples: {route: [example messages]}
+        keywords: {route: [regex patterns]}; any match adds KEYWORD_WEIGHT
+            (capped below the threshold, so similarity is needed too).
+        threshold: Minimum score for a confident decision.
+        min_margin: Minimum lead over the second-best route.
+    """
+
+    def __init__(self, examples, keywords=None, threshold=DEFAULT_THRESHOLD,
+                 min_margin=DEFAULT_MIN_MARGIN):
+        self.threshold = threshold
+        self.min_margin = min_margin
+        self.keywords = {route: [re.compile(p, re.IGNORECASE) for p in patterns]
+                         for route, patterns in (keywords or {}).items()}
+        documents = [(route, _features(text))
+                     for route, texts in examples.items() for text in texts]
+        document_frequency = Counter(f for _, feats in documents for f in set(feats))
+        total = len(documents)
+        self._idf = {f: math.log((1 + total) / (1 + df)) + 1
+                     for f, df in document_frequency.items()}
+        self._examples = [(route, self._vector(feats)) for route, feats in documents]
+        self.routes = sorted(set(examples) | set(self.keywords))
+        # Metrics
+        self.routed_locally = Counter()
+        self.fallbacks = 0
+        self.shadow = Counter()   # agreement with the model on fallbacks
+        self.confusion = defaultdict(Counter)
+
+    def _vector(self, feats):
+        counts = Counter(feats)
+        vector = {f: (1 + math.log(n)) * self._idf.get(f, 0.0) for f, n in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {f: v / norm for f, v in vector.items() if v}
+
+    def classify(self, text):
+        vector = self._vector(_features(text))
+        similarity = dict.fromkeys(self.routes, 0.0)
+        for route, example in self._examples:
+            score = sum(w * example.get(f, 0.0) for f, w in vector.items())
+            similarity[route] = max(similarity[route], score)
+        scores = {}
+        for route in self.routes:
+            keyword_hit = any(p.search(text) for p in self.keywords.get(route, []))
+            scores[route] = (KEYWORD_WEIGHT * keyword_hit
+                             + SIMILARITY_WEIGHT * similarity[route])
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        best, confidence = ranked[0]
+        margin = confidence - (ranked[1][1] if len(ranked) > 1 else 0.0)
+        reason = ("negation" if _NEGATION_RE.search(text)
+                  else "acknowledgement" if _ACKNOWLEDGEMENT_RE.match(text) else None)
+        confident = (confidence >= self.threshold and margin >= self.min_margin
+                     and reason is None)
+        return RoutingDecision(best, confidence, margin, confident, scores, reason)
+
+    def record_local(self, decision):
+        self.routed_locally[decision.target] += 1
+
+    def record_fallback(self, predicted, actual):
+        """Compare our (unconfident) prediction with the model's choice."""
+        self.fallbacks += 1
+        if actual is None:
+            return
+        self.shadow["agree" if predicted == actual else "disagree"] += 1
+        self.confusion[actual][predicted] += 1
+
+    def evaluate(self, labeled):
+        """Accuracy and coverage on [(message, expected_route), ...].
+
+        expected_route None marks messages that should fall back to the
+        model (acknowledgements, answers to an agent's question); routing
+        one of those counts as a false route.
+        """
+        routable = [(text, expected) for text, expected in labeled if expected is not None]
+        routed = correct = false_routes = 0
+        for text, expected in labeled:
+            decision = self.classify(text)
+            if not decision.confident:
+                continue
+            if expected is None:
+                false_routes += 1
+                continue
+            routed += 1
+            correct += decision.target == expected
+        fallback_samples = len(labeled) - len(routable)
+        return {
+            "samples": len(labeled),
+            "coverage": routed / len(routable) if routable else 0.0,
+            "accuracy": correct / routed if routed else 0.0,
+            "false_route_rate": false_routes / fallback_samples if fallback_samples else 0.0,
+        }
+
+    def stats(self):
+        local = sum(self.routed_locally.values())
+        compared = self.shadow["agree"] + self.shadow["disagree"]
+        return {
+            "routed_locally": local,
+            "fallbacks": self.fallbacks,
+            "local_rate": local / (local + self.fallbacks) if local + self.fallbacks else 0.0,
+            "by_route": dict(self.routed_locally),
+            "shadow_accuracy": self.shadow["agree"] / compared if compared else None,
+        }
+
+
+__all__ = ['IntentRouter', 'RoutingDecision']
@@ -0,0 +1,362 @@
+# Architecture Assistant - Local Knowledge Index
+#
+# BM25 (plus optional embedding vectors) over curated markdown and JSON
+# documents, consulted before a web search. Answers only when the best
+# passages cover the question well; otherwise the caller goes to the web.
+# - Markdown is split into one chunk per heading section (long sections
+#   are split again by paragraph); JSON files hold {"title", "text"} items
+# - build() is incremental: files whose content hash hasn't changed keep
+#   their chunks and vectors
+# - The index is a JSON manifest plus a memory-mapped float32 vector file
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import time
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass
+
+from .embeddings import MappedVectors, cosine, embedder_from_env, write_vectors
+from .text import tokenize
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = ".knowledge_index"
+DEFAULT_MIN_COVERAGE = 0.7
+DEFAULT_VECTOR_WEIGHT = 0.3
+RERANK_CANDIDATES = 50
+UNKNOWN_TERM_WEIGHT = 2.0
+_LATENCY_WINDOW = 1000
+MAX_CHUNK_WORDS = 180
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_HEADING_RE = re.compile(r"^(#{1,3})\s+(.+?)\s*$", re.MULTILINE)
+
+
+def _terms(text):
+    """Tokens without stopwords, with a naive plural "s" stripped."""
+    return [t[:-1] if len(t) > 3 and t.endswith("s") and not t.endswith("ss") else t
+            for t in tokenize(text, drop_stopwords=True)]
+
+
+@dataclass
+class KnowledgeHit:
+    source: str
+    title: str
+    text: str
+    score: float
+
+
+def _split_long(text):
+    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+    chunk, words = [], 0
+    for paragraph in paragraphs:
+        length = len(paragraph.split())
+        if chunk and words + length > MAX_CHUNK_WORDS:
+            yield "\n\n".join(chunk)
+            chunk, words = [], 0
+        chunk.append(paragraph)
+        words += length
+    if chunk:
+        yield "\n\n".join(chunk)
+
+
+def chunk_markdown(text, default_title):
+    """[(title, text)] with one entry per heading section."""
+    matches = list(_HEADING_RE.finditer(text))
+    doc_title = next((m.group(2) for m in matches if len(m.group(1)) == 1), default_title)
+    sections = []
+    if matches and text[:matches[0].start()].strip():
+        sections.append((doc_title, text[:matches[0].start()]))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        title = match.group(2) if match.group(2) == doc_title else f"{doc_title} › {match.group(2)}"
+        sections.append((title, text[match.end():end]))
+    if not matches:
+        sections.append((doc_title, text))
+    return [(title, part) for title, body in sections for part in _split_long(body)]
+
+
+def chunk_json(data, default_title):
+    """[(title, text)] from a list of {"title", "text"} items or a {title: text} dict."""
+    if isinstance(data, dict):
+        data = [{"title": title, "text": text} for title, text in data.items()]
+    chunks = []
+    for item in data:
+        text = item.get("text") or item.get("answer") or ""
+        if isinstance(text, list):
+            text = "\n".join(f"- {line}" for line in text)
+        if text.strip():
+            chunks.append((item.get("title") or item.get("question") or default_title, text))
+    return chunks
+
+
+def _read_chunks(path):
+    name = os.path.splitext(os.path.basename(path))[0].replace("_", " ")
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    if path.endswith(".json"):
+        return chunk_json(json.loads(content), name)
+    return chunk_markdown(content, name)
+
+
+def _iter_documents(directories):
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.endswith((".md", ".json")):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, os.path.dirname(os.path.abspath(directory))), path
+
+
+class KnowledgeIndex:
+    """BM25 + vector index over a directory of curated documents.
+
+    Args:
+        path: Directory holding the manifest and vector file.
+        embedder: Embedder for the vector half, or None for BM25 only.
+        min_coverage: Share of the question's terms (IDF-weighted) that the
+            top passages must contain before answer() uses them.
+        vector_weight: Weight of vector similarity in the ranking score.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, embedder=None,
+                 min_coverage=DEFAULT_MIN_COVERAGE, vector_weight=DEFAULT_VECTOR_WEIGHT):
+        self.path = path
+        self.embedder = embedder
+        self.min_coverage = min_coverage
+        self.vector_weight = vector_weight if embedder is not None else 0.0
+        self.chunks = []
+        self.files = {}
+        self._embedder_name = None
+        self._vectors = None
+        self._postings = {}
+        self._lengths = []
+        self._average_length = 0.0
+        # Metrics
+        self.lookups = 0
+        self.answered = 0
+        self.query_seconds = deque(maxlen=_LATENCY_WINDOW)   # Recent lookups only
+
+    @classmethod
+    def from_env(cls):
+        """KNOWLEDGE_INDEX_PATH, KNOWLEDGE_MIN_COVERAGE and EMBEDDINGS_BACKEND."""
+        return cls(
+            path=os.getenv("KNOWLEDGE_INDEX_PATH", DEFAULT_INDEX_PATH),
+            embedder=embedder_from_env(),
+            min_coverage=float(os.getenv("KNOWLEDGE_MIN_COVERAGE", DEFAULT_MIN_COVERAGE)),
+        )
+
+    @property
+    def _manifest_path(self):
+        return os.path.join(self.path, "manifest.json")
+
+    @property
+    def _vectors_path(self):
+        return os.path.join(self.path, "vectors.f32")
+
+    def build(self, directories):
+        """Index directories, re-chunking and re-embedding changed files only.
+
+        Returns:
+            {"files", "changed", "removed", "chunks", "embedded", "seconds"}
+        """
+        started = time.perf_counter()
+        self._load_manifest()
+        old_vectors = self._vectors
+        embedder_name = self.embedder.name if self.embedder is not None else None
+        vectors_reusable = embedder_name is None or (
+            self._embedder_name == embedder_name and old_vectors is not None)
+        documents = []
+        for source, path in _iter_documents(directories):
+            with open(path, "rb") as f:
+                documents.append((source, path, hashlib.sha1(f.read()).hexdigest()))
+        files = {source: digest for source, _, digest in documents}
+        if files == self.files and vectors_reusable:
+            self._index_postings()  # Nothing to rewrite
+            return {"files": len(files), "changed": 0, "removed": 0, "chunks": len(self.chunks),
+                    "embedded": 0, "seconds": round(time.perf_counter() - started, 4)}
+        by_file = defaultdict(list)
+        for index, chunk in enumerate(self.chunks):
+            by_file[chunk["source"]].append(index)
+
+        chunks, vectors, pending = [], [], []
+        changed = 0
+        for source, path, digest in documents:
+            if self.files.get(source) == digest and vectors_reusable:
+                for index in by_file[source]:
+                    chunks.append(self.chunks[index])
+                    if embedder_name is not None:
+                        vectors.append(list(old_vectors[index]))
+                continue
+            changed += 1
+            for title, text in _read_chunks(path):
+                terms = Counter(_terms(f"{title}\n{text}"))
+                chunks.append({"source": source, "title": title, "text": text.strip(),
+                               "terms": dict(terms)})
+                vectors.append(None)
+                pending.append(len(chunks) - 1)
+
+        embedded = 0
+        if self.embedder is not None and pending:
+            fresh = self.embedder.embed([f"{chunks[i]['title']}\n{chunks[i]['text']}"
+                                         for i in pending])
+            for index, vector in zip(pending, fresh):
+                vectors[index] = vector
+            embedded = len(pending)
+        removed = set(self.files) - set(files)
+
+        os.makedirs(self.path, exist_ok=True)
+        if old_vectors is not None:
+            old_vectors.close()
+            self._vectors = None
+        dim = len(vectors[0]) if self.embedder is not None and vectors else 0
+        if dim:
+            write_vectors(self._vectors_path, vectors)
+        manifest = {"version": INDEX_VERSION, "embedder": embedder_name, "dim": dim,
+                    "files": files, "chunks": chunks}
+        tmp = f"{self._manifest_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._manifest_path)
+        self.load()
+        seconds = time.perf_counter() - started
+        logger.info("Knowledge index: %d files (%d changed, %d removed), %d chunks in %.2fs",
+                    len(files), changed, len(removed), len(chunks), seconds)
+        return {"files": len(files), "changed": changed, "removed": len(removed),
+                "chunks": len(chunks), "embedded": embedded, "seconds": round(seconds, 4)}
+
+    def _load_manifest(self):
+        self.chunks, self.files, self._embedder_name = [], {}, None
+        if self._vectors is not None:
+            self._vectors.close()
+            self._vectors = None
+        try:
+            with open(self._manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+        if manifest.get("version") != INDEX_VERSION:
+            return
+        self.chunks = manifest["chunks"]
+        self.files = manifest["files"]
+        self._embedder_name = manifest.get("embedder")
+        dim = manifest.get("dim") or 0
+        if dim and os.path.exists(self._vectors_path):
+            self._vectors = MappedVectors(self._vectors_path, dim)
+
+    def load(self):
+        """Read the index from path and build the in-memory postings."""
+        self._load_manifest()
+        self._index_postings()
+        return self
+
+    def _index_postings(self):
+        postings = defaultdict(list)
+        self._lengths = []
+        for index, chunk in enumerate(self.chunks):
+            for term, count in chunk["terms"].items():
+                postings[term].append((index, count))
+            self._lengths.append(sum(chunk["terms"].values()))
+        self._postings = dict(postings)
+        self._average_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+
+    def _idf(self, term):
+        total = len(self.chunks)
+        frequency = len(self._postings.get(term, ()))
+        return math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+
+    def _bm25(self, terms):
+        scores = defaultdict(float)
+        for term in set(terms):
+            idf = self._idf(term)
+            for index, count in self._postings.get(term, ()):
+                norm = 1 - BM25_B + BM25_B * self._lengths[index] / (self._average_length or 1)
+                scores[index] += idf * count * (BM25_K1 + 1) / (count + BM25_K1 * norm)
+        return scores
+
+    def search(self, query, k=3):
+        """Best k distinct passages for query, best first; [] if nothing matches.
+
+        Vectors only rerank the top BM25 candidates, so query time doesn't
+        grow with the number of chunks sharing a common word.
+        """
+        scores = self._bm25(_terms(query))
+        if not scores:
+            return []
+        top = max(scores.values())
+        # Identical passages (a document copied into two folders) count once
+        candidates, seen = [], set()
+        for index in sorted(scores, key=scores.get, reverse=True):
+            if self.chunks[index]["text"] not in seen:
+                seen.add(self.chunks[index]["text"])
+                candidates.append(index)
+                if len(candidates) == RERANK_CANDIDATES:
+                    break
+        ranked = {index: scores[index] / top for index in candidates}
+        if self.vector_weight and self._vectors is not None and self.embedder is not None:
+            query_vector = self.embedder.embed([query])[0]
+            ranked = {index: (1 - self.vector_weight) * score
+                      + self.vector_weight * max(0.0, cosine(query_vector, self._vectors[index]))
+                      for index, score in ranked.items()}
+        best = sorted(ranked, key=ranked.get, reverse=True)[:k]
+        return [KnowledgeHit(self.chunks[i]["source"], self.chunks[i]["title"],
+                             self.chunks[i]["text"], round(ranked[i], 4)) for i in best]
+
+    def coverage(self, query, hits):
+        """Weighted share of query terms present in the best single passage.
+
+        Passages are not pooled: unrelated passages that each hold some of
+        the words don't answer the question together. Terms the index has
+        never seen weigh double: passages can't answer a question about
+        something none of the documents mention.
+        """
+        terms = set(_terms(query))
+        if not terms or not hits:
+            return 0.0
+        weights = {term: 1.0 if term in self._postings else UNKNOWN_TERM_WEIGHT for term in terms}
+        total = sum(weights.values())
+        return max(sum(w for t, w in weights.items() if t in found) / total
+                   for found in (set(_terms(f"{hit.title}\n{hit.text}")) for hit in hits))
+
+    def answer(self, query, k=3):
+        """Formatted passages if the index covers query well enough, else None."""
+        started = time.perf_counter()
+        hits = self.search(query, k)
+        covered = self.coverage(query, hits)
+        self.lookups += 1
+        self.query_seconds.append(time.perf_counter() - started)
+        if covered < self.min_coverage:
+            logger.debug("Knowledge index miss (coverage %.2f): %r", covered, query)
+            return None
+        self.answered += 1
+        lines = [f"From the curated knowledge base (coverage {covered:.0%}):"]
+        for hit in hits:
+            lines.append(f"\n**{hit.title}** ({hit.source})\n{hit.text}")
+        return "\n".join(lines)
+
+    def stats(self):
+        timings = sorted(self.query_seconds)
+
+        def ms(pct):
+            if not timings:
+                return None
+            return round(timings[min(len(timings) - 1, round(pct / 100 * (len(timings) - 1)))] * 1000, 3)
+
+        return {
+            "chunks": len(self.chunks),
+            "files": len(self.files),
+            "lookups": self.lookups,
+            "answered": self.answered,
+            "web_searches_avoided_rate": round(self.answered / self.lookups, 3) if self.lookups else None,
+            "query_p50_ms": ms(50),
+            "query_p99_ms": ms(99),
+        }
+
+
+__all__ = ['KnowledgeHit', 'KnowledgeIndex', 'chunk_json', 'chunk_markdown']
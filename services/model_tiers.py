@@ -0,0 +1,203 @@
+# Architecture Assistant - Model Tiers and Latency Budgets
+#
+# Agents are assigned a tier (lite / standard / advanced) instead of a model
+# id. The registry maps tiers to models, can be changed at runtime, and
+# tracks each agent's recent latency and cost against its budget. An agent
+# that breaches its budget falls back to the next faster tier for a cooldown
+# period, then gets its assigned tier back.
+
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 20          # Recent calls per agent checked against the budget
+DEFAULT_MIN_CALLS = 5        # Calls needed before a budget can be breached
+DEFAULT_COOLDOWN_SECONDS = 300.0
+BUDGET_PERCENTILE = 90
+
+
+@dataclass
+class ModelTier:
+    name: str
+    model: str
+    input_usd_per_mtok: float
+    output_usd_per_mtok: float
+
+
+@dataclass(frozen=True)
+class TierBudget:
+    """Per-call budget, compared against the p90 of an agent's recent calls."""
+    latency_ms: float = None
+    cost_usd: float = None
+
+
+# Fastest first; fallbacks move towards the start of the list
+DEFAULT_TIERS = [
+    ModelTier("lite", "gemini-2.0-flash-lite", 0.075, 0.30),
+    ModelTier("standard", "gemini-2.0-flash", 0.10, 0.40),
+    ModelTier("advanced", "gemini-2.5-pro", 1.25, 10.00),
+]
+
+
+def _parse_pairs(value):
+    """'a=x, b=y' -> {'a': 'x', 'b': 'y'}"""
+    pairs = (item.split("=", 1) for item in (value or "").split(",") if "=" in item)
+    return {k.strip(): v.strip() for k, v in pairs}
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+class ModelRegistry:
+    """Which model each agent uses, with budget-driven fallback.
+
+    Args:
+        tiers: ModelTier list, fastest first.
+        assignments: {agent_name: tier name}; others use default_tier.
+        budgets: {agent_name: TierBudget}; agents without one never fall back.
+        cooldown_s: How long a fallback lasts before the assigned tier is retried.
+    """
+
+    def __init__(self, tiers=None, assignments=None, budgets=None, default_tier="standard",
+                 window=DEFAULT_WINDOW, min_calls=DEFAULT_MIN_CALLS,
+                 cooldown_s=DEFAULT_COOLDOWN_SECONDS):
+        self.tiers = list(tiers or [ModelTier(**vars(t)) for t in DEFAULT_TIERS])
+        self.assignments = dict(assignments or {})
+        self.budgets = dict(budgets or {})
+        self.default_tier = default_tier
+        self.window = window
+        self.min_calls = min_calls
+        self.cooldown_s = cooldown_s
+        self._recent = {}       # agent -> deque of (latency_s, cost_usd)
+        self._fallback = {}     # agent -> (tier name, until)
+        self._calls = {}
+        self._fallbacks = {}
+
+    @classmethod
+    def from_env(cls, assignments=None, budgets=None):
+        """MODEL_TIER_OVERRIDES="agent=tier,..." and MODEL_TIER_MODELS="tier=model,..."."""
+        registry = cls(
+            assignments={**(assignments or {}),
+                         **_parse_pairs(os.getenv("MODEL_TIER_OVERRIDES"))},
+            budgets=budgets if os.getenv("MODEL_BUDGETS_ENABLED", "true").lower() == "true"
+            else {},
+            cooldown_s=float(os.getenv("MODEL_FALLBACK_COOLDOWN_SECONDS",
+                                       DEFAULT_COOLDOWN_SECONDS)),
+        )
+        for tier, model in _parse_pairs(os.getenv("MODEL_TIER_MODELS")).items():
+            registry.set_model(tier, model)
+        return registry
+
+    def _tier(self, name):
+        for tier in self.tiers:
+            if tier.name == name:
+                return tier
+        raise KeyError(f"Unknown model tier {name!r}; known: {[t.name for t in self.tiers]}")
+
+    # ----- Runtime configuration -----
+
+    def assign(self, agent_name, tier_name):
+        """Move an agent to another tier; takes effect on its next model call."""
+        self._tier(tier_name)
+        self.assignments[agent_name] = tier_name
+        self._fallback.pop(agent_name, None)
+        self._recent.pop(agent_name, None)
+
+    def set_model(self, tier_name, model, input_usd_per_mtok=None, output_usd_per_mtok=None):
+        """Point a tier at another model (e.g. when a new model version ships)."""
+        tier = self._tier(tier_name)
+        tier.model = model
+        if input_usd_per_mtok is not None:
+            tier.input_usd_per_mtok = input_usd_per_mtok
+        if output_usd_per_mtok is not None:
+            tier.output_usd_per_mtok = output_usd_per_mtok
+
+    # ----- Lookups -----
+
+    def tier_for(self, agent_name):
+        """Current tier name: the assigned one, or its fallback while cooling down."""
+        fallback = self._fallback.get(agent_name)
+        if fallback is not None:
+            if time.monotonic() < fallback[1]:
+                return fallback[0]
+            # Cooldown over: retry the assigned tier with a fresh window
+            del self._fallback[agent_name]
+            self._recent.pop(agent_name, None)
+        return self.assignments.get(agent_name, self.default_tier)
+
+    def model_for(self, agent_name):
+        return self._tier(self.tier_for(agent_name)).model
+
+    def cost(self, model, input_tokens, output_tokens):
+        for tier in self.tiers:
+            if tier.model == model:
+                return (input_tokens * tier.input_usd_per_mtok
+                        + output_tokens * tier.output_usd_per_mtok) / 1e6
+        return 0.0
+
+    # ----- Budget tracking -----
+
+    def record(self, agent_name, model, latency_s, input_tokens=0, output_tokens=0):
+        """Record one finished model call; falls back if the budget is breached."""
+        self._calls[agent_name] = self._calls.get(agent_name, 0) + 1
+        recent = self._recent.setdefault(agent_name, deque(maxlen=self.window))
+        recent.append((latency_s, self.cost(model, input_tokens, output_tokens)))
+        budget = self.budgets.get(agent_name)
+        if budget is None or len(recent) < self.min_calls:
+            return
+        breach = self._breach(budget, recent)
+        if breach:
+            self._fall_back(agent_name, breach)
+
+    def _breach(self, budget, recent):
+        if budget.latency_ms is not None:
+            p90_ms = _percentile([l for l, _ in recent], BUDGET_PERCENTILE) * 1000
+            if p90_ms > budget.latency_ms:
+                return f"p90 latency {p90_ms:.0f} ms > {budget.latency_ms:.0f} ms"
+        if budget.cost_usd is not None:
+            p90_cost = _percentile([c for _, c in recent], BUDGET_PERCENTILE)
+            if p90_cost > budget.cost_usd:
+                return f"p90 cost ${p90_cost:.5f} > ${budget.cost_usd:.5f}"
+        return None
+
+    def _fall_back(self, agent_name, reason):
+        current = self.tier_for(agent_name)
+        index = [t.name for t in self.tiers].index(current)
+        if index == 0:
+            return  # Already on the fastest tier
+        faster = self.tiers[index - 1].name
+        self._fallback[agent_name] = (faster, time.monotonic() + self.cooldown_s)
+        self._recent.pop(agent_name, None)
+        self._fallbacks[agent_name] = self._fallbacks.get(agent_name, 0) + 1
+        logger.warning("%s over budget (%s); falling back from %s to %s for %.0fs",
+                       agent_name, reason, current, faster, self.cooldown_s)
+
+    def stats(self):
+        agents = sorted(set(self.assignments) | set(self._calls))
+        result = {}
+        for agent_name in agents:
+            recent = self._recent.get(agent_name) or []
+            result[agent_name] = {
+                "assigned": self.assignments.get(agent_name, self.default_tier),
+                "tier": self.tier_for(agent_name),
+                "model": self.model_for(agent_name),
+                "calls": self._calls.get(agent_name, 0),
+                "fallbacks": self._fallbacks.get(agent_name, 0),
+                "recent_p90_ms": (round(_percentile([l for l, _ in recent], BUDGET_PERCENTILE)
+                                        * 1000, 1) if recent else None),
+            }
+        return result
+
+
+__all__ = [
+    'DEFAULT_TIERS',
+    'ModelRegistry',
+    'ModelTier',
+    'TierBudget',
+]
@@ -0,0 +1,226 @@
+# Architecture Assistant - Speculative Research Prefetch
+#
+# When discovery produces its "What We Discovered Together" summary, the
+# reality check will almost certainly research the same few things (costs,
+# timelines, failure points, regulations). While the user reads and confirms
+# the summary, those searches run in the background and land in the search
+# cache, so the reality check starts with its research done.
+# - Prefetches are per session and cancelled when a newer summary replaces
+#   them or the reality check no longer needs them
+# - Budgets cap queries per summary, concurrent searches and searches per hour
+# - Stats report how many prefetched results were actually used
+
+import asyncio
+import logging
+import os
+import re
+import time
+import weakref
+from collections import OrderedDict, deque
+
+from .search_cache import normalize_query
+from .text import tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_QUERIES = 4
+DEFAULT_MAX_CONCURRENCY = 2
+DEFAULT_HOURLY_BUDGET = 100
+DEFAULT_WAIT_SECONDS = 5.0
+_MAX_SESSIONS = 1024  # Sessions whose prefetched results are kept
+
+_FIELD_RE = re.compile(r"^\s*[-*]\s*(?P<label>[^:]+):\s*(?P<value>.+)$", re.MULTILINE)
+# Words that describe the summary rather than the project
+_FILLER = {"affordable", "busy", "can", "cant", "customers", "easily", "easy", "find",
+           "finding", "help", "helping", "need", "needs", "notice", "people",
+           "professionals", "reliable", "short", "trusted", "users", "want", "way"}
+
+# Mirrors the reality check's "WHEN TO USE SEARCH" list, most useful first
+QUERY_TEMPLATES = [
+    "typical cost to build a {project} app MVP",
+    "how long does it take to build a {project} app",
+    "common failure points for {project} startups",
+    "regulations and legal requirements for {project} businesses",
+    "minimum viable team to build a {project} app",
+]
+
+
+def summary_fields(summary):
+    """{lowercased label: value} for the "- Label: value" lines of a summary."""
+    return {m.group("label").strip().lower(): m.group("value").strip()
+            for m in _FIELD_RE.finditer(summary or "")}
+
+
+def project_phrase(summary, max_words=5):
+    """A short search phrase for the project, from the problem statement."""
+    fields = summary_fields(summary)
+    source = next((v for k, v in fields.items() if k.startswith("problem")), "")
+    source = source or next((v for k, v in fields.items() if k.startswith("how you")), "")
+    words = [w for w in tokenize(source, drop_stopwords=True) if w not in _FILLER]
+    return " ".join(words[:max_words])
+
+
+def research_queries(summary, max_queries=DEFAULT_MAX_QUERIES):
+    """Research queries the reality check is likely to run for this summary."""
+    project = project_phrase(summary)
+    if not project:
+        return []
+    return [t.format(project=project) for t in QUERY_TEMPLATES[:max_queries]]
+
+
+class SpeculativePrefetcher:
+    """Runs likely searches ahead of time and stores them in a SearchCache.
+
+    Args:
+        search: async (query) -> result text; the same search the agents use.
+        cache: SearchCache the results are written to.
+        max_queries: Queries prefetched per summary.
+        max_concurrency: Prefetch searches running at once (all sessions).
+        hourly_budget: Prefetch searches started per rolling hour (all sessions).
+    """
+
+    def __init__(self, search, cache, max_queries=DEFAULT_MAX_QUERIES,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 hourly_budget=DEFAULT_HOURLY_BUDGET):
+        self.search = search
+        self.cache = cache
+        self.max_queries = max_queries
+        self.max_concurrency = max_concurrency
+        self.hourly_budget = hourly_budget
+        self._semaphores = weakref.WeakKeyDictionary()   # event loop -> semaphore
+        self._started = deque()         # start times within the last hour
+        self._tasks = {}                # session -> {key: task}
+        self._results = OrderedDict()   # session -> {key: (query, result)}
+        self._inflight = {}             # key -> task (any session)
+        self._prefetched_keys = set()
+        self._used_keys = set()
+        self.counts = {"scheduled": 0, "completed": 0, "failed": 0, "cancelled": 0,
+                       "skipped_cached": 0, "skipped_budget": 0, "used": 0}
+
+    @classmethod
+    def from_env(cls, search, cache):
+        return cls(
+            search, cache,
+            max_queries=int(os.getenv("PREFETCH_MAX_QUERIES", DEFAULT_MAX_QUERIES)),
+            max_concurrency=int(os.getenv("PREFETCH_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+            hourly_budget=int(os.getenv("PREFETCH_HOURLY_BUDGET", DEFAULT_HOURLY_BUDGET)),
+        )
+
+    def schedule(self, session_id, summary):
+        """Start background searches for summary, replacing older ones."""
+        self.cancel(session_id)
+        self._results.pop(session_id, None)
+        results = self._results[session_id] = {}
+        while len(self._results) > _MAX_SESSIONS:
+            self._results.popitem(last=False)
+        tasks = self._tasks[session_id] = {}
+        for query in research_queries(summary, self.max_queries):
+            key = normalize_query(query)
+            if key in tasks:
+                continue
+            cached = self.cache.get(query)
+            if cached is not None:
+                self.counts["skipped_cached"] += 1
+                results[key] = (query, cached)
+                continue
+            if not self._take_budget():
+                self.counts["skipped_budget"] += 1
+                continue
+            self.counts["scheduled"] += 1
+            task = asyncio.get_running_loop().create_task(self._run(session_id, key, query))
+            tasks[key] = self._inflight[key] = task
+        if not tasks:
+            del self._tasks[session_id]
+        return list(tasks)
+
+    async def _run(self, session_id, key, query):
+        try:
+            async with self._semaphore():
+                result = await self.search(query)
+            if result:
+                self.cache.put(query, result)
+                self._prefetched_keys.add(key)
+                if session_id in self._results:
+                    self._results[session_id][key] = (query, result)
+            self.counts["completed"] += 1
+        except asyncio.CancelledError:
+            self.counts["cancelled"] += 1
+            raise
+        except Exception as e:
+            self.counts["failed"] += 1
+            logger.warning("Prefetch failed for %r: %s", query, e)
+        finally:
+            tasks = self._tasks.get(session_id)
+            if tasks is not None and tasks.get(key) is asyncio.current_task():
+                del tasks[key]
+                if not tasks:   # Don't keep an entry per session that ever prefetched
+                    del self._tasks[session_id]
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+    def _semaphore(self):
+        # One per event loop: a semaphore is bound to the loop it first waits on
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(max(1, self.max_concurrency))
+        return semaphore
+
+    def _take_budget(self):
+        now = time.monotonic()
+        while self._started and now - self._started[0] > 3600:
+            self._started.popleft()
+        if len(self._started) >= self.hourly_budget:
+            return False
+        self._started.append(now)
+        return True
+
+    def cancel(self, session_id):
+        """Cancel a session's outstanding prefetches (finished ones are kept)."""
+        for task in list(self._tasks.pop(session_id, {}).values()):
+            task.cancel()
+
+    def cancel_all(self):
+        for session_id in list(self._tasks):
+            self.cancel(session_id)
+
+    async def wait(self, session_id, timeout=DEFAULT_WAIT_SECONDS):
+        """Wait up to timeout for a session's prefetches, then cancel the rest."""
+        pending = list(self._tasks.get(session_id, {}).values())
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
+        self.cancel(session_id)
+
+    def inflight(self, query):
+        """Running prefetch task for query, if any (to await instead of searching)."""
+        return self._inflight.get(normalize_query(query))
+
+    def results(self, session_id):
+        """[(query, result)] prefetched for a session; marks them used."""
+        found = list(self._results.get(session_id, {}).items())
+        for key, _ in found:
+            self._mark_used(key)
+        return [pair for _, pair in found]
+
+    def record_lookup(self, query):
+        """Note a search cache hit; counts as used if it was prefetched."""
+        self._mark_used(normalize_query(query))
+
+    def _mark_used(self, key):
+        if key in self._prefetched_keys and key not in self._used_keys:
+            self._used_keys.add(key)
+            self.counts["used"] += 1
+
+    def stats(self):
+        completed = self.counts["completed"]
+        return {**self.counts,
+                "in_flight": len(self._inflight),
+                "hit_rate": self.counts["used"] / completed if completed else 0.0}
+
+
+__all__ = [
+    'SpeculativePrefetcher',
+    'project_phrase',
+    'research_queries',
+    'summary_fields',
+]
@@ -0,0 +1,247 @@
+# Architecture Assistant - Static Prompt Prefix Cache
+#
+# Every agent re-sends a large, unchanging system instruction (plus its tool
+# declarations) on every turn. This module registers that static prefix once
+# with a cache backend and rewrites later requests to reference the cached
+# prefix instead of repeating it.
+#
+# Backends:
+# - GeminiContextCacheBackend: Gemini explicit context caching (production)
+# - LocalPromptCacheBackend: in-process stand-in for offline runs and benchmarks
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_MIN_TOKENS = 1024
+DEFAULT_MAX_PREFIXES = 256
+_MAX_TRACKED_TURNS = 1000
+
+
+class LocalPromptCacheBackend:
+    """Keeps registered prefixes in memory; handles look like 'local/<hash>'."""
+
+    def __init__(self):
+        self.entries = {}
+
+    async def create(self, *, model, agent_name, system_instruction, tools,
+                     tool_config, ttl_seconds):
+        name = "local/" + hashlib.sha256(
+            (model + (system_instruction or "")).encode()
+        ).hexdigest()[:16]
+        self.entries[name] = {
+            "model": model,
+            "agent_name": agent_name,
+            "system_instruction": system_instruction,
+            "tools": tools,
+            "tool_config": tool_config,
+        }
+        return name
+
+    def resolve(self, name):
+        """Return the prefix registered under name (used by fake models)."""
+        return self.entries.get(name)
+
+
+class GeminiContextCacheBackend:
+    """Registers prefixes with Gemini explicit context caching."""
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client()
+        return self._client
+
+    async def create(self, *, model, agent_name, system_instruction, tools,
+                     tool_config, ttl_seconds):
+        from google.genai import types
+
+        cached = await self.client.aio.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                display_name=f"{agent_name}-static-prefix",
+                system_instruction=system_instruction,
+                tools=tools,
+                tool_config=tool_config,
+                ttl=f"{int(ttl_seconds)}s",
+            ),
+        )
+        return cached.name
+
+
+class PromptCache:
+    """Registers static agent prefixes once and points later calls at them.
+
+    Args:
+        backend: Object with an async create(...) returning a cache handle.
+        ttl_seconds: Lifetime of a registered prefix; re-registered on expiry.
+        min_tokens: Prefixes smaller than this are never cached (Gemini
+            rejects small caches and they save little).
+        max_prefixes: Handles kept; expired, then least recently used ones
+            are dropped (the remote cache expires on its own TTL).
+    """
+
+    def __init__(self, backend, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 min_tokens=DEFAULT_MIN_TOKENS, max_prefixes=DEFAULT_MAX_PREFIXES):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.max_prefixes = max_prefixes
+        self._handles = OrderedDict()   # fingerprint -> (name, expires_at, tokens), LRU order
+        self._registering = set()       # fingerprints being registered right now
+        self._uncacheable = set()
+        self.turn_savings = OrderedDict()   # invocation_id -> tokens saved
+        self.hits = 0
+        self.registrations = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build from PROMPT_CACHE_* environment variables (None if disabled)."""
+        kind = os.getenv("PROMPT_CACHE_BACKEND", "gemini").lower()
+        if kind in ("", "off", "none"):
+            return None
+        backend = (LocalPromptCacheBackend() if kind == "local"
+                   else GeminiContextCacheBackend())
+        return cls(
+            backend,
+            ttl_seconds=float(os.getenv("PROMPT_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+            min_tokens=int(os.getenv("PROMPT_CACHE_MIN_TOKENS", DEFAULT_MIN_TOKENS)),
+            max_prefixes=int(os.getenv("PROMPT_CACHE_MAX_PREFIXES", DEFAULT_MAX_PREFIXES)),
+        )
+
+    async def apply(self, agent_name, invocation_id, llm_request):
+        """Swap the static prefix of llm_request for a cached reference."""
+        config = llm_request.config
+        if config is None or config.cached_content or not config.system_instruction:
+            return
+        prefix_tokens = _prefix_tokens(config)
+        if prefix_tokens < self.min_tokens:
+            return
+        fingerprint = _fingerprint(llm_request.model, config)
+        if fingerprint in self._uncacheable:
+            return
+
+        handle = self._handles.get(fingerprint)
+        if handle is not None and handle[1] <= time.time():
+            del self._handles[fingerprint]
+            handle = None
+        if handle is None:
+            if fingerprint in self._registering:
+                return  # A concurrent call is registering it; don't pay twice
+            self._registering.add(fingerprint)
+            try:
+                name = await self.backend.create(
+                    model=llm_request.model,
+                    agent_name=agent_name,
+                    system_instruction=config.system_instruction,
+                    tools=config.tools,
+                    tool_config=config.tool_config,
+                    ttl_seconds=self.ttl_seconds,
+                )
+            except Exception as exc:  # Keep serving uncached requests
+                logger.warning("Prompt cache registration failed for %s: %s",
+                               agent_name, exc)
+                self._uncacheable.add(fingerprint)
+                return
+            finally:
+                self._registering.discard(fingerprint)
+            self.registrations += 1
+            # Leave a safety margin so we never reference an expired cache.
+            self._remember(fingerprint,
+                           (name, time.time() + self.ttl_seconds * 0.9, prefix_tokens))
+            # The registering call still pays for the prefix.
+            return
+
+        self._handles.move_to_end(fingerprint)
+        config.cached_content = handle[0]
+        config.system_instruction = None
+        config.tools = None
+        config.tool_config = None
+        self.hits += 1
+        self._record(invocation_id, handle[2])
+
+    def report(self):
+        """Input tokens saved, per turn and overall."""
+        per_turn = list(self.turn_savings.values())
+        return {
+            "registered_prefixes": len(self._handles),
+            "registrations": self.registrations,
+            "cached_calls": self.hits,
+            "tokens_saved_total": sum(per_turn),
+            "tokens_saved_last_turn": per_turn[-1] if per_turn else 0,
+            "tokens_saved_per_turn_avg": sum(per_turn) / len(per_turn) if per_turn else 0.0,
+        }
+
+    def _remember(self, fingerprint, handle):
+        now = time.time()
+        for key in [k for k, (_, expires_at, _) in self._handles.items() if expires_at <= now]:
+            del self._handles[key]
+        self._handles[fingerprint] = handle
+        while len(self._handles) > self.max_prefixes:
+            self._handles.popitem(last=False)
+
+    def _record(self, invocation_id, tokens):
+        self.turn_savings[invocation_id] = self.turn_savings.get(invocation_id, 0) + tokens
+        self.turn_savings.move_to_end(invocation_id)
+        while len(self.turn_savings) > _MAX_TRACKED_TURNS:
+            self.turn_savings.popitem(last=False)
+
+
+def _prefix_tokens(config):
+    tools = json.dumps([t.model_dump(mode="json", exclude_none=True)
+                        for t in config.tools or []])
+    return estimate_tokens(str(config.system_instruction)) + estimate_tokens(tools)
+
+
+def _fingerprint(model, config):
+    payload = {
+        "model": model,
+        "system_instruction": str(config.system_instruction),
+        "tools": [t.model_dump(mode="json", exclude_none=True) for t in config.tools or []],
+        "tool_config": (config.tool_config.model_dump(mode="json", exclude_none=True)
+                        if config.tool_config else None),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+_default_cache = None
+_default_loaded = False
+
+
+def default_prompt_cache():
+    """Process-wide prompt cache from the environment (None when disabled)."""
+    global _default_cache, _default_loaded
+    if not _default_loaded:
+        _default_cache = PromptCache.from_env()
+        _default_loaded = True
+    return _default_cache
+
+
+async def prompt_cache_callback(callback_context, llm_request):
+    """before_model_callback: reference the cached static prefix if available."""
+    cache = default_prompt_cache()
+    if cache is not None:
+        await cache.apply(callback_context.agent_name,
+                          callback_context.invocation_id, llm_request)
+    return None
+
+
+__all__ = [
+    'PromptCache',
+    'LocalPromptCacheBackend',
+    'GeminiContextCacheBackend',
+    'default_prompt_cache',
+    'prompt_cache_callback',
+]
@@ -0,0 +1,100 @@
+# Architecture Assistant - Prompt Composition
+#
+# Agent instructions are assembled from shared, versioned fragments (scope
+# boundaries, search usage, completion criteria, handoff message) plus each
+# agent's own sections. Prompts are compiled once when the agent module is
+# imported; the compiled prompt records which fragment versions it was built
+# from, so a fragment change shows up in token reports and cache keys.
+
+import hashlib
+import re
+from dataclasses import dataclass
+
+from .tokens import estimate_tokens
+
+_PLACEHOLDER_RE = re.compile(r"\{(\w+)\}")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def _render_value(value):
+    """Lists and tuples become "- item" lines; everything else str()."""
+    if isinstance(value, (list, tuple)):
+        return "\n".join(f"- {item}" for item in value)
+    return str(value)
+
+
+@dataclass(frozen=True)
+class Fragment:
+    """A reusable prompt block with {placeholders}.
+
+    Bump version whenever the wording changes.
+    """
+    name: str
+    version: int
+    template: str
+
+    @property
+    def placeholders(self):
+        return set(_PLACEHOLDER_RE.findall(self.template))
+
+    def render(self, **params):
+        missing = self.placeholders - set(params)
+        if missing:
+            raise ValueError(f"Fragment {self.name!r} needs {sorted(missing)}")
+        return _PLACEHOLDER_RE.sub(lambda m: _render_value(params[m.group(1)]), self.template)
+
+    def __call__(self, **params):
+        """Bind parameters now; compose() renders the fragment."""
+        return _Bound(self, params)
+
+
+@dataclass(frozen=True)
+class _Bound:
+    fragment: Fragment
+    params: dict
+
+
+class CompiledPrompt(str):
+    """A composed instruction: a plain str for ADK, plus provenance.
+
+    Attributes:
+        fragments: ("name@version", ...) of the shared fragments used.
+        fingerprint: Short hash of the final text.
+    """
+
+    fragments: tuple
+    fingerprint: str
+
+    @property
+    def tokens(self):
+        return estimate_tokens(self)
+
+
+def _tidy(text):
+    lines = [line.rstrip() for line in text.strip("\n").splitlines()]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines))
+
+
+def compose(*blocks):
+    """Join fragments and literal sections into one CompiledPrompt.
+
+    Blocks are Fragments (without parameters), fragments bound with
+    parameters (``BOUNDARIES(never=[...])``) or literal strings; they are
+    separated by a blank line. Literal sections are used verbatim.
+    """
+    parts, used = [], []
+    for block in blocks:
+        if isinstance(block, Fragment):
+            block = block()
+        if isinstance(block, _Bound):
+            parts.append(block.fragment.render(**block.params))
+            used.append(f"{block.fragment.name}@{block.fragment.version}")
+        elif block:
+            parts.append(block)
+    prompt = CompiledPrompt(_tidy("\n\n".join(_tidy(p) for p in parts)) + "\n")
+    prompt.fragments = tuple(used)
+    prompt.fingerprint = hashlib.sha256(prompt.encode()).hexdigest()[:12]
+    return prompt
+
+
+__all__ = ['CompiledPrompt', 'Fragment', 'compose']
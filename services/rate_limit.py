@@ -0,0 +1,312 @@
+# Architecture Assistant - Model Call Rate Limiting
+#
+# A token-bucket limiter in front of every model call, with a priority queue
+# so that when quota is tight the orchestrator's replies to the user go
+# first, specialists next, search after them and speculative work last.
+# - Requests and tokens per minute are limited together; the bucket refills
+#   at 90% of the quota with a 10% burst, so no rolling window ever exceeds it
+# - Output tokens are charged after the call, once they are known
+# - Waiters age: a low-priority call waits at most aging_s per priority level
+#   behind newer high-priority calls, so background work can't starve
+# - With a shared SQLite file the quota is shared by all worker processes
+# - stats() and Prometheus lines report queue depth and wait times
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from .telemetry import METRIC_PREFIX, Histogram
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0   # The orchestrator's replies to the user
+PRIORITY_AGENT = 1         # Specialist agents
+PRIORITY_SEARCH = 2        # search_agent, called as a tool
+PRIORITY_BACKGROUND = 3    # Speculative work nobody is waiting for yet
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_AGENT: "agent",
+                  PRIORITY_SEARCH: "search", PRIORITY_BACKGROUND: "background"}
+
+DEFAULT_WINDOW_SECONDS = 60.0
+DEFAULT_BURST_FRACTION = 0.1
+DEFAULT_AGING_SECONDS = 10.0
+_MAX_SLEEP_SECONDS = 1.0   # Re-check at least this often (shared quotas refill elsewhere)
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Overrides the agent's priority for model calls made in this context
+call_priority = contextvars.ContextVar("call_priority", default=None)
+
+
+class LocalQuota:
+    """Request and token buckets for one process.
+
+    Args:
+        requests_per_minute: 0 = unlimited.
+        tokens_per_minute: 0 = unlimited.
+        window_s: Rolling window the provider enforces the quota over.
+        burst_fraction: Share of the window's quota that may be used at once.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute, window_s=DEFAULT_WINDOW_SECONDS,
+                 burst_fraction=DEFAULT_BURST_FRACTION):
+        self.limits = (requests_per_minute * window_s / 60.0, tokens_per_minute * window_s / 60.0)
+        self.capacity = tuple(limit * burst_fraction for limit in self.limits)
+        self.rates = tuple(limit * (1 - burst_fraction) / window_s for limit in self.limits)
+        self._levels = list(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = max(0.0, now - self._updated)
+        self._updated = now
+        self._levels = [min(cap, level + rate * elapsed)
+                        for level, cap, rate in zip(self._levels, self.capacity, self.rates)]
+
+    @staticmethod
+    def _wait(levels, costs, capacity, rates):
+        """Seconds until every bucket holds its cost (0 = now)."""
+        wait = 0.0
+        for level, cost, cap, rate in zip(levels, costs, capacity, rates):
+            if not rate:
+                continue  # Unlimited
+            # A request bigger than the burst goes through from a full bucket
+            need = min(cost, cap)
+            if level < need:
+                wait = max(wait, (need - level) / rate)
+        return wait
+
+    def try_take(self, tokens):
+        """Take one request and tokens now, or return the seconds to wait."""
+        with self._lock:
+            self._refill(time.monotonic())
+            costs = (1, tokens)
+            wait = self._wait(self._levels, costs, self.capacity, self.rates)
+            if wait == 0.0:
+                self._levels = [level - cost if rate else level
+                                for level, cost, rate in zip(self._levels, costs, self.rates)]
+            return wait
+
+    def charge(self, tokens):
+        """Charge tokens after the fact (may leave the bucket in debt)."""
+        if not self.rates[1]:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._levels[1] -= tokens
+
+
+class SharedQuota(LocalQuota):
+    """LocalQuota whose bucket levels live in SQLite, shared across processes."""
+
+    def __init__(self, path, requests_per_minute, tokens_per_minute, name="gemini", **kwargs):
+        super().__init__(requests_per_minute, tokens_per_minute, **kwargs)
+        self.name = name
+        self._db = sqlite3.connect(path, timeout=5.0, isolation_level=None,
+                                   check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit ("
+            " name TEXT PRIMARY KEY,"
+            " requests REAL NOT NULL,"
+            " tokens REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        # Wall clock, not monotonic: every process must read the same time
+        self._db.execute("INSERT OR IGNORE INTO rate_limit VALUES (?, ?, ?, ?)",
+                         (name, *self.capacity, time.time()))
+
+    def _update(self, change):
+        """Run change(levels) -> (levels, result) in one write transaction."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                requests, tokens, updated = self._db.execute(
+                    "SELECT requests, tokens, updated_at FROM rate_limit WHERE name = ?",
+                    (self.name,)).fetchone()
+                now = time.time()
+                elapsed = max(0.0, now - updated)
+                levels = [min(cap, level + rate * elapsed) for level, cap, rate
+                          in zip((requests, tokens), self.capacity, self.rates)]
+                levels, result = change(levels)
+                self._db.execute(
+                    "UPDATE rate_limit SET requests = ?, tokens = ?, updated_at = ?"
+                    " WHERE name = ?", (*levels, now, self.name))
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            return result
+
+    def try_take(self, tokens):
+        def take(levels):
+            costs = (1, tokens)
+            wait = self._wait(levels, costs, self.capacity, self.rates)
+            if wait == 0.0:
+                levels = [level - cost if rate else level
+                          for level, cost, rate in zip(levels, costs, self.rates)]
+            return levels, wait
+
+        return self._update(take)
+
+    def charge(self, tokens):
+        if self.rates[1]:
+            self._update(lambda levels: ([levels[0], levels[1] - tokens], None))
+
+
+class RateLimiter:
+    """Priority queue in front of a quota.
+
+    Args:
+        quota: LocalQuota or SharedQuota.
+        aging_s: Queue position given up per priority level; a background
+            call is never overtaken by calls that arrived more than
+            3 * aging_s after it.
+    """
+
+    def __init__(self, quota, aging_s=DEFAULT_AGING_SECONDS):
+        self.quota = quota
+        self.aging_s = aging_s
+        self._queue = []      # (sort key, sequence, priority, tokens, future)
+        self._sequence = itertools.count()
+        self._dispatcher = None
+        self.queued = defaultdict(int)
+        self.max_queued = defaultdict(int)
+        self.granted = defaultdict(int)
+        self.throttled = defaultdict(int)
+        self.waits = defaultdict(lambda: Histogram(WAIT_BUCKETS))
+
+    @classmethod
+    def from_env(cls):
+        """RATE_LIMIT_RPM / RATE_LIMIT_TPM (0 = unlimited); None if both are 0."""
+        rpm = float(os.getenv("RATE_LIMIT_RPM", "0"))
+        tpm = float(os.getenv("RATE_LIMIT_TPM", "0"))
+        if not rpm and not tpm:
+            return None
+        shared_path = os.getenv("RATE_LIMIT_SHARED_PATH", "")
+        quota = SharedQuota(shared_path, rpm, tpm) if shared_path else LocalQuota(rpm, tpm)
+        return cls(quota, aging_s=float(os.getenv("RATE_LIMIT_AGING_SECONDS",
+                                                  DEFAULT_AGING_SECONDS)))
+
+    async def acquire(self, priority, tokens=0):
+        """Wait until the call may go ahead; returns the seconds waited."""
+        started = time.monotonic()
+        if not self._queue and self.quota.try_take(tokens) == 0.0:
+            self._grant(priority, 0.0)
+            return 0.0
+        future = asyncio.get_running_loop().create_future()
+        key = started + priority * self.aging_s
+        heapq.heappush(self._queue, (key, next(self._sequence), priority, tokens, future))
+        self.queued[priority] += 1
+        self.max_queued[priority] = max(self.max_queued[priority], self.queued[priority])
+        self.throttled[priority] += 1
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        try:
+            await future
+        finally:
+            if not future.done() or future.cancelled():
+                self.queued[priority] -= 1  # Cancelled while waiting
+        waited = time.monotonic() - started
+        self._grant(priority, waited)
+        return waited
+
+    def charge(self, tokens):
+        """Tokens used beyond what acquire() reserved (e.g. output tokens)."""
+        if tokens > 0:
+            self.quota.charge(tokens)
+
+    def _grant(self, priority, waited):
+        self.granted[priority] += 1
+        self.waits[priority].observe(waited)
+
+    async def _dispatch(self):
+        while self._queue:
+            _, _, priority, tokens, future = self._queue[0]
+            if future.done():  # Cancelled
+                heapq.heappop(self._queue)
+                continue
+            wait = self.quota.try_take(tokens)
+            if wait == 0.0:
+                heapq.heappop(self._queue)
+                self.queued[priority] -= 1
+                future.set_result(None)
+                continue
+            await asyncio.sleep(min(wait, _MAX_SLEEP_SECONDS))
+
+    def stats(self):
+        def ms(priority, pct):
+            value = self.waits[priority].percentile(pct)
+            return round(value * 1000, 1) if value is not None else None
+
+        priorities = sorted(set(self.granted) | set(self.queued))
+        return {
+            PRIORITY_NAMES.get(p, str(p)): {
+                "queued": self.queued[p],
+                "max_queued": self.max_queued[p],
+                "granted": self.granted[p],
+                "throttled": self.throttled[p],
+                "wait_p50_ms": ms(p, 50),
+                "wait_p95_ms": ms(p, 95),
+                "wait_max_ms": round(max(self.waits[p].values, default=0.0) * 1000, 1),
+            }
+            for p in priorities
+        }
+
+    def render_prometheus(self):
+        """Queue depth, grants and wait-time histograms in Prometheus text format."""
+        name = f"{METRIC_PREFIX}_rate_limit"
+        lines = [f"# HELP {name}_queue_depth Model calls waiting for quota.",
+                 f"# TYPE {name}_queue_depth gauge"]
+        priorities = sorted(set(self.granted) | set(self.queued))
+        labels = {p: f'priority="{PRIORITY_NAMES.get(p, p)}"' for p in priorities}
+        lines += [f"{name}_queue_depth{{{labels[p]}}} {self.queued[p]}" for p in priorities]
+        lines += [f"# HELP {name}_granted_total Model calls let through.",
+                  f"# TYPE {name}_granted_total counter"]
+        lines += [f"{name}_granted_total{{{labels[p]}}} {self.granted[p]}" for p in priorities]
+        lines += [f"# HELP {name}_wait_seconds Time model calls waited for quota.",
+                  f"# TYPE {name}_wait_seconds histogram"]
+        for p in priorities:
+            hist = self.waits[p]
+            for bound, count in zip(hist.buckets, hist.counts):
+                lines.append(f'{name}_wait_seconds_bucket{{{labels[p]},le="{bound}"}} {count}')
+            lines.append(f'{name}_wait_seconds_bucket{{{labels[p]},le="+Inf"}} {hist.count}')
+            lines.append(f"{name}_wait_seconds_sum{{{labels[p]}}} {round(hist.sum, 6)}")
+            lines.append(f"{name}_wait_seconds_count{{{labels[p]}}} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+_UNSET = object()
+_default_limiter = _UNSET
+
+
+def default_rate_limiter():
+    """Process-wide limiter, or None when no quota is configured."""
+    global _default_limiter
+    if _default_limiter is _UNSET:
+        _default_limiter = RateLimiter.from_env()
+        if _default_limiter is not None:
+            from .telemetry import default_telemetry
+
+            if (telemetry := default_telemetry()) is not None:
+                telemetry.add_collector(_default_limiter.render_prometheus)
+    return _default_limiter
+
+
+__all__ = [
+    'LocalQuota',
+    'PRIORITY_AGENT',
+    'PRIORITY_BACKGROUND',
+    'PRIORITY_INTERACTIVE',
+    'PRIORITY_NAMES',
+    'PRIORITY_SEARCH',
+    'RateLimiter',
+    'SharedQuota',
+    'call_priority',
+    'default_rate_limiter',
+]
@@ -0,0 +1,240 @@
+# Architecture Assistant - Incremental Re-planning
+#
+# When the requirements change after a roadmap or architecture exists, only
+# the sections that depend on the changed fields are rewritten. A section
+# depends on a requirement field when:
+# - its heading matches a rule in the deliverable's dependency table
+#   (e.g. the MVP phase depends on the must-haves); the first rule wins
+# - its text mentions what the field is about (budget lines, durations,
+#   team roles; see FIELD_PATTERNS)
+# - it mentions a removed list item or a word dropped from the field
+#   (dropping "live tracking" touches the phase that builds it); words used
+#   in most sections ("walks" in a dog-walking roadmap) don't count
+
+import re
+import statistics
+from collections import Counter
+from dataclasses import dataclass
+
+from .requirements import REQUIREMENTS_SCHEMA, RENDER_LABELS
+from .text import tokenize
+
+# Heading regex -> requirement fields that section is always written from
+ROADMAP_DEPENDENCIES = (
+    (r"checklist", {"users", "budget", "team"}),
+    (r"phase 0|validat", {"problem", "users", "differentiators"}),
+    (r"phase 1|mvp|foundation|basic", {"must_haves", "not_needed", "team"}),
+    (r"phase [2-9]|enhance|scale|growth", {"nice_to_haves"}),
+)
+
+ARCHITECTURE_DEPENDENCIES = (
+    (r"pattern", {"team"}),
+    (r"stack|technolog", {"must_haves", "not_needed", "team"}),
+    (r"decision", {"differentiators", "team"}),
+    (r"implementation|approach", {"must_haves", "timeline"}),
+)
+
+# Field -> text that means a section was written from it
+FIELD_PATTERNS = {
+    "budget": re.compile(r"\$\s?\d|\bbudget|\bcosts?\b|\bafford", re.IGNORECASE),
+    "timeline": re.compile(r"\b(?:weeks?|months?)\s+\d|\d\s*(?:weeks?|months?)\b|\btimeline"
+                           r"|\bdeadline", re.IGNORECASE),
+    "team": re.compile(r"\bteam\b|\bdevelopers?\b|\bfreelanc|\bhir(?:e|ing)\b|\bsolo\b",
+                       re.IGNORECASE),
+}
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*$", re.MULTILINE)
+_HEADING_KEY_RE = re.compile(r"[:(\-–—]")
+
+
+@dataclass
+class Section:
+    title: str
+    text: str      # Heading line and body
+
+
+def _terms(text):
+    """Tokens without stopwords or bare numbers, with a naive plural "s" stripped."""
+    return {t[:-1] if len(t) > 3 and t.endswith("s") and not t.endswith("ss") else t
+            for t in tokenize(text, drop_stopwords=True) if not t.isdigit()}
+
+
+def split_sections(text, level=None):
+    """(preamble, sections) split at headings of level.
+
+    By default the level is the highest one used at least twice; returns
+    (text, []) when there is none.
+    """
+    if level is None:
+        headings = [len(marks) for marks, _ in _HEADING_RE.findall(text or "")]
+        levels = sorted({n for n in headings if headings.count(n) > 1})
+        if not levels:
+            return text, []
+        level = levels[0]
+    pattern = re.compile(rf"^#{{{level}}}\s+(.+?)\s*$", re.MULTILINE)
+    matches = list(pattern.finditer(text or ""))
+    if not matches:
+        return text, []
+    sections = [Section(m.group(1), text[m.start():matches[i + 1].start() if i + 1 < len(matches)
+                                         else len(text)].rstrip() + "\n")
+                for i, m in enumerate(matches)]
+    return text[:matches[0].start()], sections
+
+
+def heading_key(title):
+    """Part of a heading that survives a rewrite ("Phase 1" of "Phase 1: MVP (Weeks 1-8)")."""
+    return _HEADING_KEY_RE.split(title, maxsplit=1)[0].strip().lower()
+
+
+def diff_requirements(old, new):
+    """{field: (old, new)} for fields that differ; list order is ignored."""
+    changes = {}
+    for name, (kind, _) in REQUIREMENTS_SCHEMA.items():
+        before, after = getattr(old, name), getattr(new, name)
+        if kind is list:
+            same = {i.lower() for i in before} == {i.lower() for i in after}
+        else:
+            same = before.strip().lower() == after.strip().lower()
+        if not same:
+            changes[name] = (before, after)
+    return changes
+
+
+def describe_changes(changes):
+    """Bullet list of the changes for the model."""
+    lines = []
+    for name, (before, after) in changes.items():
+        label = RENDER_LABELS[name]
+        if isinstance(before, list):
+            removed = [i for i in before if i.lower() not in {a.lower() for a in after}]
+            added = [i for i in after if i.lower() not in {b.lower() for b in before}]
+            if added:
+                lines.append(f"- {label} added: {'; '.join(added)}")
+            if removed:
+                lines.append(f"- {label} removed: {'; '.join(removed)}")
+        else:
+            lines.append(f"- {label}: was \"{before}\", now \"{after}\"")
+    return "\n".join(lines)
+
+
+def _mentions(section_terms, text, common):
+    terms = _terms(text) - common
+    return bool(terms) and len(terms & section_terms) * 2 >= len(terms)
+
+
+def affected_sections(sections, changes, dependencies):
+    """Indices of the sections that depend on a changed field."""
+    section_terms = [_terms(section.text) for section in sections]
+    frequency = Counter(term for terms in section_terms for term in terms)
+    common = {term for term, count in frequency.items() if count * 2 > len(sections)}
+    affected = []
+    for index, section in enumerate(sections):
+        title = section.title.lower()
+        fixed = next((fields for pattern, fields in dependencies
+                      if re.search(pattern, title)), set())
+        for name, (before, after) in changes.items():
+            if name in fixed or (name in FIELD_PATTERNS
+                                 and FIELD_PATTERNS[name].search(section.text)):
+                break
+            if isinstance(before, list):
+                gone = [i for i in before if i.lower() not in {a.lower() for a in after}]
+            else:
+                gone = [" ".join(_terms(before) - _terms(after))]
+            if any(_mentions(section_terms[index], item, common) for item in gone if item):
+                break
+        else:
+            continue
+        affected.append(index)
+    return affected
+
+
+def splice_sections(preamble, sections, affected, regenerated):
+    """Deliverable with the affected sections replaced by the regenerated ones.
+
+    Regenerated sections replace affected ones in order when the counts
+    match, otherwise by heading_key; affected sections the model skipped
+    keep their old text and extra ones go after the last affected section.
+    Returns (text, reused_chars).
+    """
+    level = len(sections[affected[0]].text) - len(sections[affected[0]].text.lstrip("#"))
+    _, new_sections = split_sections(regenerated, level)
+    if not new_sections:
+        new_sections = [Section("", regenerated.strip() + "\n")] if regenerated.strip() else []
+    replacements = {}
+    if len(new_sections) == len(affected):
+        replacements = dict(zip(affected, new_sections))
+    else:
+        by_key = {heading_key(sections[i].title): i for i in affected}
+        extra = []
+        for section in new_sections:
+            index = by_key.pop(heading_key(section.title), None)
+            if index is None:
+                extra.append(section)
+            else:
+                replacements[index] = section
+        if extra:
+            last = max(affected)
+            old = replacements.get(last, sections[last])
+            replacements[last] = Section(old.title, old.text + "\n" + "".join(s.text for s in extra))
+    parts = [preamble]
+    reused = len(preamble)
+    for index, section in enumerate(sections):
+        if index in replacements:
+            parts.append(replacements[index].text)
+        else:
+            parts.append(section.text)
+            reused += len(section.text)
+        if not parts[-1].endswith("\n\n"):
+            parts.append("\n")
+    return "".join(parts).rstrip() + "\n", reused
+
+
+class ReplanStats:
+    """Incremental re-plans: share of content reused and time taken."""
+
+    def __init__(self):
+        self.replans = 0
+        self.full_regenerations = 0
+        self.sections_total = 0
+        self.sections_regenerated = 0
+        self.reused_chars = 0
+        self.total_chars = 0
+        self.replan_seconds = []
+
+    def record_replan(self, sections, regenerated, reused_chars, total_chars, seconds):
+        self.replans += 1
+        self.sections_total += sections
+        self.sections_regenerated += regenerated
+        self.reused_chars += reused_chars
+        self.total_chars += total_chars
+        self.replan_seconds.append(seconds)
+
+    def record_full(self):
+        """A changed requirement touched every section; the agent rewrote it all."""
+        self.full_regenerations += 1
+
+    def stats(self):
+        return {
+            "replans": self.replans,
+            "full_regenerations": self.full_regenerations,
+            "sections_total": self.sections_total,
+            "sections_regenerated": self.sections_regenerated,
+            "reused_fraction": round(self.reused_chars / self.total_chars, 3)
+                               if self.total_chars else None,
+            "replan_p50_ms": round(statistics.median(self.replan_seconds) * 1000, 1)
+                             if self.replan_seconds else None,
+        }
+
+
+__all__ = [
+    'ARCHITECTURE_DEPENDENCIES',
+    'ROADMAP_DEPENDENCIES',
+    'ReplanStats',
+    'Section',
+    'affected_sections',
+    'describe_changes',
+    'diff_requirements',
+    'heading_key',
+    'split_sections',
+    'splice_sections',
+]
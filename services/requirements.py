@@ -0,0 +1,177 @@
+# Architecture Assistant - Structured Requirements
+#
+# requirements_discovery_agent ends with a markdown "What We Discovered
+# Together" block. It is parsed into a typed Requirements object and kept in
+# session state as a plain dict, checked against REQUIREMENTS_SCHEMA on the
+# way in and out. Downstream agents get its compact rendering instead of
+# re-reading the discovery conversation.
+
+import re
+from dataclasses import asdict, dataclass, field, fields
+
+SCHEMA_VERSION = 1
+
+# Field -> (type, required). Lists hold one string per item.
+REQUIREMENTS_SCHEMA = {
+    "problem": (str, True),
+    "users": (str, True),
+    "differentiators": (str, False),
+    "must_haves": (list, True),
+    "nice_to_haves": (list, False),
+    "not_needed": (list, False),
+    "timeline": (str, False),
+    "budget": (str, False),
+    "team": (str, False),
+}
+
+# Summary bullet label (lowercase prefix) -> field
+_LABELS = (
+    ("problem", "problem"),
+    ("who you're helping", "users"),
+    ("users", "users"),
+    ("how you're different", "differentiators"),
+    ("different", "differentiators"),
+    ("must-have", "must_haves"),
+    ("must have", "must_haves"),
+    ("nice-to-have", "nice_to_haves"),
+    ("nice to have", "nice_to_haves"),
+    ("not needed", "not_needed"),
+    ("timeline", "timeline"),
+    ("budget", "budget"),
+    ("team", "team"),
+)
+
+# Rendered label per field, in rendering order
+RENDER_LABELS = {
+    "problem": "Problem",
+    "users": "Users",
+    "differentiators": "Differentiators",
+    "must_haves": "Must-haves",
+    "nice_to_haves": "Nice-to-haves",
+    "not_needed": "Not needed",
+    "timeline": "Timeline",
+    "budget": "Budget",
+    "team": "Team",
+}
+
+_BULLET_RE = re.compile(r"^\s*[-*]\s*\**([^:*\n]+?)\**\s*:\s*\**\s*(.+?)\s*$", re.MULTILINE)
+_PLACEHOLDER_RE = re.compile(r"^\[[^\]]*\]$")
+_ITEM_SPLIT_RE = re.compile(r"[,;](?![^(]*\))")   # Not inside parentheses
+
+
+class RequirementsError(ValueError):
+    """The summary or stored dict doesn't satisfy REQUIREMENTS_SCHEMA."""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+@dataclass
+class Requirements:
+    problem: str
+    users: str
+    must_haves: list
+    differentiators: str = ""
+    nice_to_haves: list = field(default_factory=list)
+    not_needed: list = field(default_factory=list)
+    timeline: str = ""
+    budget: str = ""
+    team: str = ""
+    version: int = SCHEMA_VERSION
+
+    def validate(self):
+        """Schema violations, or an empty list."""
+        errors = []
+        if self.version != SCHEMA_VERSION:
+            errors.append(f"version: expected {SCHEMA_VERSION}, got {self.version!r}")
+        for name, (kind, required) in REQUIREMENTS_SCHEMA.items():
+            value = getattr(self, name)
+            if not isinstance(value, kind):
+                errors.append(f"{name}: expected {kind.__name__}, got {type(value).__name__}")
+            elif kind is list and not all(isinstance(item, str) and item for item in value):
+                errors.append(f"{name}: items must be non-empty strings")
+            elif required and not value:
+                errors.append(f"{name}: required")
+        return errors
+
+    def to_state(self):
+        """JSON-serializable dict for session state."""
+        errors = self.validate()
+        if errors:
+            raise RequirementsError(errors)
+        return asdict(self)
+
+    @classmethod
+    def from_state(cls, data):
+        """Requirements from a session state dict (None if absent)."""
+        if not data:
+            return None
+        if not isinstance(data, dict):
+            raise RequirementsError([f"expected dict, got {type(data).__name__}"])
+        known = {f.name for f in fields(cls)}
+        unknown = sorted(set(data) - known)
+        missing = sorted(name for name, (_, required) in REQUIREMENTS_SCHEMA.items()
+                         if required and name not in data)
+        if unknown or missing:
+            raise RequirementsError([*(f"{name}: unknown field" for name in unknown),
+                                     *(f"{name}: required" for name in missing)])
+        requirements = cls(**data)
+        errors = requirements.validate()
+        if errors:
+            raise RequirementsError(errors)
+        return requirements
+
+    def render(self):
+        """Compact one-line-per-field text given to downstream agents."""
+        lines = []
+        for name, label in RENDER_LABELS.items():
+            value = getattr(self, name)
+            if isinstance(value, list):
+                value = "; ".join(value)
+            if value:
+                lines.append(f"- {label}: {value}")
+        return "\n".join(lines)
+
+
+def _field_for(label):
+    label = label.strip().lower()
+    for prefix, name in _LABELS:
+        if label.startswith(prefix):
+            return name
+    return None
+
+
+def parse_requirements(text):
+    """Requirements from a "What We Discovered Together" summary.
+
+    Raises RequirementsError when required fields are missing or still
+    hold the template's [placeholder] text.
+    """
+    values = {}
+    for label, value in _BULLET_RE.findall(text or ""):
+        name = _field_for(label)
+        value = value.strip().rstrip("*").strip()
+        if name is None or name in values or not value or _PLACEHOLDER_RE.match(value):
+            continue
+        if REQUIREMENTS_SCHEMA[name][0] is list:
+            value = [item.strip(" .") for item in _ITEM_SPLIT_RE.split(value) if item.strip(" .")]
+        values[name] = value
+    missing = [f"{name}: required" for name, (_, required) in REQUIREMENTS_SCHEMA.items()
+               if required and not values.get(name)]
+    if missing:
+        raise RequirementsError(missing)
+    requirements = Requirements(**values)
+    errors = requirements.validate()
+    if errors:
+        raise RequirementsError(errors)
+    return requirements
+
+
+__all__ = [
+    'RENDER_LABELS',
+    'REQUIREMENTS_SCHEMA',
+    'Requirements',
+    'RequirementsError',
+    'parse_requirements',
+]
@@ -0,0 +1,305 @@
+# Architecture Assistant - Semantic Response Cache
+#
+# Full agent outputs (reality checks, roadmaps) reused across projects whose
+# requirements are nearly the same. Entries are keyed by agent name plus an
+# embedding of the normalized requirements; a lookup returns the most
+# similar entry for that agent if it clears the similarity threshold.
+# - Entries expire after ttl_seconds; beyond max_entries the least recently
+#   used are evicted
+# - Every entry is held in memory for the similarity scan; an optional
+#   SQLite file keeps them across restarts
+# - Similar wording is not enough: an entry is only served when the budget,
+#   timeline and team it was written for are of the same scale, since a
+#   feasibility assessment is mostly about those figures
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import statistics
+import threading
+import time
+from array import array
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+from .embeddings import HashingEmbedder, cosine, embedder_from_env
+from .text import tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.85
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 2000
+# Requirement fields a served entry must share; values apart by
+# this factor or more (e.g. $50k vs $100k, 3 vs 6 months, 1 vs 2 people)
+# force a miss
+SCALE_FIELDS = ("budget", "timeline", "team")
+DEFAULT_MAX_SCALE_RATIO = 2.0
+
+_MONEY_RE = re.compile(r"\$\s*(\d+(?:,\d{3})*(?:\.\d+)?)\s*(k|m|thousand|million)?\b"
+                       r"|(\d+(?:\.\d+)?)\s*(k|m)\b")
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(?:\s*(?:-|–|to)\s*(\d+(?:\.\d+)?))?\s*"
+                          r"(day|week|month|year)s?\b")
+_PEOPLE_RE = re.compile(r"(\d+)\s*(?:people|persons?|developers?|devs?|engineers?|"
+                        r"founders?|members?)\b|team of (\d+)")
+_SOLO_RE = re.compile(r"\b(solo|just me|by myself|one[- ]person|single founder)\b")
+_WORD_NUMBERS = {"one": "1", "two": "2", "three": "3", "four": "4", "five": "5",
+                 "six": "6", "seven": "7", "eight": "8", "nine": "9", "ten": "10"}
+_MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "m": 1e6, "million": 1e6}
+_WEEKS = {"day": 1 / 7, "week": 1, "month": 4.35, "year": 52}
+
+
+def normalize_requirements(text):
+    """Requirements text reduced to its content words, in order."""
+    return " ".join(tokenize(text, drop_stopwords=True))
+
+
+def scale_of(field, text):
+    """Largest budget (dollars), timeline (weeks) or team size in text, or None."""
+    text = re.sub(r"\b(" + "|".join(_WORD_NUMBERS) + r")\b",
+                  lambda m: _WORD_NUMBERS[m.group(1)], (text or "").lower())
+    if field == "budget":
+        amounts = [float((a or b).replace(",", "")) * _MULTIPLIERS.get(unit or suffix, 1)
+                   for a, unit, b, suffix in _MONEY_RE.findall(text)]
+    elif field == "timeline":
+        amounts = [float(high or low) * _WEEKS[unit]
+                   for low, high, unit in _DURATION_RE.findall(text)]
+    else:
+        amounts = [float(a or b) for a, b in _PEOPLE_RE.findall(text)]
+        if not amounts and _SOLO_RE.search(text):
+            amounts = [1.0]
+    return max(amounts) if amounts else None
+
+
+def scale_difference(facts, other, max_ratio=DEFAULT_MAX_SCALE_RATIO):
+    """First SCALE_FIELDS field on which two projects differ materially, or None.
+
+    A field set for only one of them differs; one whose scale can't be read
+    must match word for word.
+    """
+    for field in SCALE_FIELDS:
+        a, b = (facts or {}).get(field) or "", (other or {}).get(field) or ""
+        if not a and not b:
+            continue
+        if not a or not b:
+            return field
+        x, y = scale_of(field, a), scale_of(field, b)
+        if x is None or y is None:
+            if normalize_requirements(a) != normalize_requirements(b):
+                return field
+        elif max(x, y) >= max_ratio * max(min(x, y), 1e-9):
+            return field
+    return None
+
+
+@dataclass
+class CachedResponse:
+    agent: str
+    response: str
+    similarity: float
+    requirements: str   # Normalized requirements the response was written for
+
+
+class ResponseCache:
+    """Similarity-keyed cache of agent outputs.
+
+    Args:
+        path: SQLite file, or None to keep entries in memory only.
+        embedder: Embedder for the requirements (defaults to hashing).
+        threshold: Minimum cosine similarity for a hit.
+        ttl_seconds: Entries older than this are treated as misses.
+        max_entries: Entries kept; least recently used are evicted.
+        max_scale_ratio: Factor at which budget, timeline or team sizes count
+            as different projects.
+    """
+
+    def __init__(self, path=None, embedder=None, threshold=DEFAULT_THRESHOLD,
+                 ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_scale_ratio=DEFAULT_MAX_SCALE_RATIO):
+        self.embedder = embedder or HashingEmbedder()
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_scale_ratio = max_scale_ratio
+        self._entries = OrderedDict()   # key -> entry dict, least recently used first
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = Counter()
+        self.misses = Counter()
+        self.evictions = 0
+        self.scale_misses = 0     # Similar enough, but budget/timeline/team differed
+        self.served_seconds = []
+        self.generated_seconds = []
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                " key TEXT PRIMARY KEY,"
+                " agent TEXT NOT NULL,"
+                " requirements TEXT NOT NULL,"
+                " embedder TEXT NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " response TEXT NOT NULL,"
+                " facts TEXT NOT NULL DEFAULT '{}',"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(response_cache)")}
+            if "facts" not in columns:
+                # Older entries have no facts and are never served
+                self._db.execute("ALTER TABLE response_cache"
+                                 " ADD COLUMN facts TEXT NOT NULL DEFAULT '{}'")
+            self._db.commit()
+            self._load()
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache from RESPONSE_CACHE_* environment variables."""
+        path = os.getenv("RESPONSE_CACHE_PATH", ".response_cache.sqlite3")
+        return cls(
+            path=None if path in ("", ":memory:") else path,
+            embedder=embedder_from_env(),
+            threshold=float(os.getenv("RESPONSE_CACHE_THRESHOLD", DEFAULT_THRESHOLD)),
+            ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+            max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            max_scale_ratio=float(os.getenv("RESPONSE_CACHE_MAX_SCALE_RATIO",
+                                            DEFAULT_MAX_SCALE_RATIO)),
+        )
+
+    def _load(self):
+        rows = self._db.execute(
+            "SELECT key, agent, requirements, vector, response, facts, created_at, accessed_at"
+            " FROM response_cache WHERE embedder = ? ORDER BY accessed_at",
+            (self.embedder.name,)).fetchall()
+        for key, agent, requirements, blob, response, facts, created, accessed in rows:
+            vector = array("f")
+            vector.frombytes(blob)
+            self._entries[key] = {"agent": agent, "requirements": requirements,
+                                  "vector": list(vector), "response": response,
+                                  "facts": json.loads(facts), "created_at": created,
+                                  "accessed_at": accessed}
+
+    def lookup(self, agent, requirements, facts=None):
+        """Most similar fresh entry for agent, or None below the threshold.
+
+        Args:
+            facts: {field: text} for SCALE_FIELDS; entries written for a
+                materially different budget, timeline or team are skipped.
+        """
+        normalized = normalize_requirements(requirements)
+        if not normalized:
+            return None
+        vector = self.embedder.embed([normalized])[0]
+        now = time.time()
+        with self._lock:
+            best_key, best = None, self.threshold
+            scale_miss = False
+            for key, entry in list(self._entries.items()):
+                if now - entry["created_at"] > self.ttl_seconds:
+                    self._delete(key)
+                    continue
+                if entry["agent"] != agent:
+                    continue
+                similarity = cosine(vector, entry["vector"])
+                if similarity < best:
+                    continue
+                if scale_difference(facts, entry["facts"], self.max_scale_ratio) is not None:
+                    scale_miss = True
+                    continue
+                best_key, best = key, similarity
+            if best_key is None:
+                self.scale_misses += scale_miss
+                self.misses[agent] += 1
+                if self._db is not None:
+                    self._db.commit()
+                return None
+            entry = self._entries[best_key]
+            entry["accessed_at"] = now
+            self._entries.move_to_end(best_key)
+            if self._db is not None:
+                self._db.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?",
+                                 (now, best_key))
+                self._db.commit()
+            self.hits[agent] += 1
+            return CachedResponse(agent, entry["response"], round(best, 4), entry["requirements"])
+
+    def put(self, agent, requirements, response, facts=None):
+        """Store response as agent's output for these requirements (and facts)."""
+        normalized = normalize_requirements(requirements)
+        if not normalized or not response:
+            return
+        vector = self.embedder.embed([normalized])[0]
+        key = hashlib.sha256(f"{agent}\n{normalized}".encode()).hexdigest()[:32]
+        now = time.time()
+        with self._lock:
+            facts = {field: (facts or {}).get(field) or "" for field in SCALE_FIELDS}
+            self._entries[key] = {"agent": agent, "requirements": normalized, "vector": vector,
+                                  "response": response, "facts": facts,
+                                  "created_at": now, "accessed_at": now}
+            self._entries.move_to_end(key)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO response_cache"
+                    " (key, agent, requirements, embedder, vector, response, facts,"
+                    " created_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, agent, normalized, self.embedder.name,
+                     array("f", vector).tobytes(), response, json.dumps(facts), now, now))
+            while len(self._entries) > self.max_entries:
+                self._delete(next(iter(self._entries)))
+                self.evictions += 1
+            if self._db is not None:
+                self._db.commit()
+
+    def record_hit(self, seconds):
+        """Time to serve a cached response including its personalization."""
+        self.served_seconds.append(seconds)
+
+    def record_miss(self, seconds):
+        """Time the agent took to generate the response itself."""
+        self.generated_seconds.append(seconds)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM response_cache")
+                self._db.commit()
+
+    def stats(self):
+        lookups = sum(self.hits.values()) + sum(self.misses.values())
+
+        def p50_ms(values):
+            return round(statistics.median(values) * 1000, 1) if values else None
+
+        return {
+            "lookups": lookups,
+            "hits": sum(self.hits.values()),
+            "hit_rate": round(sum(self.hits.values()) / lookups, 3) if lookups else 0.0,
+            "hits_by_agent": dict(self.hits),
+            "entries": len(self._entries),
+            "evictions": self.evictions,
+            "scale_misses": self.scale_misses,
+            "served_p50_ms": p50_ms(self.served_seconds),
+            "generated_p50_ms": p50_ms(self.generated_seconds),
+        }
+
+    def _delete(self, key):
+        # Call with self._lock held
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+
+
+__all__ = [
+    'CachedResponse',
+    'ResponseCache',
+    'SCALE_FIELDS',
+    'normalize_requirements',
+    'scale_difference',
+    'scale_of',
+]
@@ -0,0 +1,220 @@
+# Architecture Assistant - Search Result Cache
+#
+# Persistent, TTL-bounded cache for search_agent results.
+# An in-memory LRU sits in front of a SQLite table so repeated
+# "typical timeline/cost for X" questions are answered without a model call,
+# within a session and across restarts.
+# - Hits don't write: their access times are collected and written in one
+#   transaction once touch_batch have piled up, on the next put, or on flush()
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .text import tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MEMORY_ENTRIES = 512
+DEFAULT_TOUCH_BATCH = 64
+
+
+def normalize_query(query):
+    """Reduce a query to a canonical cache key.
+
+    Case, punctuation and filler words are ignored so that "What's the
+    typical cost of an MVP?" and "typical cost of MVP" share a key. Word
+    order is kept: "migrate from MySQL to Postgres" is a different question
+    from "migrate from Postgres to MySQL".
+    """
+    return " ".join(tokenize(query, drop_stopwords=True))
+
+
+class SearchCache:
+    """Two-tier (memory LRU + SQLite) cache of summarized search results.
+
+    Args:
+        path: SQLite file, or None for a purely in-memory cache.
+        ttl_seconds: Entries older than this are treated as misses.
+        max_entries: Persistent entries kept; least recently used are evicted.
+        memory_entries: Size of the in-process LRU in front of SQLite.
+        touch_batch: Hits whose access times are buffered before writing them.
+    """
+
+    def __init__(self, path=None, ttl_seconds=DEFAULT_TTL_SECONDS,
+                 max_entries=DEFAULT_MAX_ENTRIES,
+                 memory_entries=DEFAULT_MEMORY_ENTRIES,
+                 touch_batch=DEFAULT_TOUCH_BATCH):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.touch_batch = touch_batch
+        self._memory = OrderedDict()
+        self._touched = {}  # key -> accessed_at not yet written
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                " key TEXT PRIMARY KEY,"
+                " query TEXT NOT NULL,"
+                " result TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS search_cache_accessed"
+                " ON search_cache (accessed_at)"
+            )
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache from SEARCH_CACHE_* environment variables."""
+        path = os.getenv("SEARCH_CACHE_PATH", ".search_cache.sqlite3")
+        return cls(
+            path=None if path in ("", ":memory:") else path,
+            ttl_seconds=float(os.getenv("SEARCH_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+            max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        )
+
+    def get(self, query):
+        """Return the cached result for query, or None on a miss."""
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT result, created_at FROM search_cache WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None:
+                    entry = (json.loads(row[0]), row[1])
+            if entry is not None and now - entry[1] > self.ttl_seconds:
+                self._delete(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, entry)
+            if self._db is not None:
+                self._touched[key] = now
+                if len(self._touched) >= self.touch_batch:
+                    self._write_touches()
+                    self._db.commit()
+            self.hits += 1
+            return entry[0]
+
+    def put(self, query, result):
+        """Store a result (any JSON-serializable value) for query."""
+        key = normalize_query(query)
+        if not key:
+            return
+        now = time.time()
+        with self._lock:
+            self._remember(key, (result, now))
+            if self._db is None:
+                return
+            self._touched.pop(key, None)
+            self._db.execute(
+                "INSERT OR REPLACE INTO search_cache"
+                " (key, query, result, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, query, json.dumps(result), now, now),
+            )
+            self._write_touches()  # So eviction sees current access times
+            self._evict_persistent()
+            self._db.commit()
+
+    def flush(self):
+        """Write buffered access times now (e.g. before shutdown)."""
+        with self._lock:
+            if self._db is not None and self._touched:
+                self._write_touches()
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM search_cache")
+                self._db.commit()
+
+    def stats(self):
+        """Hit/miss counters since this cache was created."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+        }
+
+    # ----- internals (call with self._lock held) -----
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            if self._db is None:
+                self.evictions += 1
+
+    def _write_touches(self):
+        if self._touched:
+            self._db.executemany(
+                "UPDATE search_cache SET accessed_at = ? WHERE key = ?",
+                [(at, key) for key, at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _delete(self, key):
+        self._memory.pop(key, None)
+        self._touched.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+            self._db.commit()
+
+    def _evict_persistent(self):
+        (count,) = self._db.execute("SELECT COUNT(*) FROM search_cache").fetchone()
+        overflow = count - self.max_entries
+        if overflow <= 0:
+            return
+        self._db.execute(
+            "DELETE FROM search_cache WHERE key IN ("
+            " SELECT key FROM search_cache ORDER BY accessed_at LIMIT ?)",
+            (overflow,),
+        )
+        self.evictions += overflow
+        logger.debug("Evicted %d search cache entries", overflow)
+
+
+_default_cache = None
+
+
+def default_search_cache():
+    """Process-wide cache, created on first use so .env is already loaded."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SearchCache.from_env()
+        atexit.register(_default_cache.flush)
+    return _default_cache
+
+
+__all__ = ['SearchCache', 'default_search_cache', 'normalize_query']
@@ -0,0 +1,332 @@
+# Architecture Assistant - Per-Agent Telemetry
+#
+# Spans for every model call (input/cached/output tokens, wall time,
+# time-to-first-token) and every tool call, recorded from ADK callbacks.
+# Spans are appended to a JSONL file and aggregated into Prometheus text
+# metrics, optionally served over HTTP. Disabled by default; when disabled
+# the callbacks return after a single cached lookup.
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "architecture_assistant"
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Spans whose end callback never ran (model or tool errors) are dropped
+_MAX_OPEN_SPANS = 1024
+# Recent observations kept per histogram for percentiles
+_PERCENTILE_WINDOW = 10000
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus exposition layout."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.values = deque(maxlen=_PERCENTILE_WINDOW)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.values.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def percentile(self, pct):
+        if not self.values:
+            return None
+        ordered = sorted(self.values)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Telemetry:
+    """Collects model and tool spans per agent.
+
+    Args:
+        jsonl_path: File every finished span is appended to (None = no file).
+    """
+
+    def __init__(self, jsonl_path=None):
+        self.jsonl_path = jsonl_path
+        self._lock = threading.Lock()
+        self._open = OrderedDict()
+        self._file = None
+        self.model_calls = defaultdict(int)
+        self.tokens = defaultdict(int)            # (agent, kind) -> tokens
+        self.model_latency = defaultdict(Histogram)
+        self.model_ttft = defaultdict(Histogram)
+        self.tool_calls = defaultdict(int)        # (agent, tool, status) -> calls
+        self.tool_latency = defaultdict(Histogram)
+        self.turn_ttft = defaultdict(Histogram)   # first text the user saw
+        self.turn_latency = defaultdict(Histogram)
+        self.collectors = []                      # Extra Prometheus text sources
+
+    @classmethod
+    def from_env(cls):
+        return cls(jsonl_path=os.getenv("TELEMETRY_JSONL_PATH") or None)
+
+    def add_collector(self, render):
+        """Append render() (Prometheus text) to every metrics scrape."""
+        self.collectors.append(render)
+
+    # ----- spans -----
+
+    def start_model(self, key, agent, model=None):
+        self._start(("model", key), {"type": "model", "agent": agent, "model": model})
+
+    def model_chunk(self, key, partial=False):
+        """A model response arrived; the first one gives time to first token."""
+        span = self._open.get(("model", key))
+        if span is None:
+            return
+        if "ttft_s" not in span:
+            span["ttft_s"] = time.perf_counter() - span["_started"]
+        span["streamed"] = span.get("streamed", False) or partial
+
+    def end_model(self, key, usage=None):
+        span = self._pop(("model", key))
+        if span is None:
+            return None
+        span.setdefault("ttft_s", span["duration_s"])
+        span.setdefault("streamed", False)
+        span["input_tokens"] = getattr(usage, "prompt_token_count", None) or 0
+        span["cached_tokens"] = getattr(usage, "cached_content_token_count", None) or 0
+        span["output_tokens"] = getattr(usage, "candidates_token_count", None) or 0
+        with self._lock:
+            agent = span["agent"]
+            self.model_calls[agent] += 1
+            for kind in ("input", "cached", "output"):
+                self.tokens[(agent, kind)] += span[f"{kind}_tokens"]
+            self.model_latency[agent].observe(span["duration_s"])
+            self.model_ttft[agent].observe(span["ttft_s"])
+        self._export(span)
+        return span
+
+    def start_tool(self, key, agent, tool):
+        self._start(("tool", key), {"type": "tool", "agent": agent, "tool": tool})
+
+    def end_tool(self, key, status="ok"):
+        span = self._pop(("tool", key))
+        if span is None:
+            return None
+        span["status"] = status
+        with self._lock:
+            self.tool_calls[(span["agent"], span["tool"], status)] += 1
+            self.tool_latency[span["tool"]].observe(span["duration_s"])
+        self._export(span)
+        return span
+
+    def record_turn(self, ttft_s, duration_s, mode="stream"):
+        """A whole user turn as seen by a client (mode: stream or batch)."""
+        with self._lock:
+            if ttft_s is not None:
+                self.turn_ttft[mode].observe(ttft_s)
+            self.turn_latency[mode].observe(duration_s)
+
+    def _start(self, key, span):
+        span["invocation_id"] = key[1][0]
+        span["start"] = time.time()
+        span["_started"] = time.perf_counter()
+        self._open[key] = span
+        while len(self._open) > _MAX_OPEN_SPANS:
+            self._open.popitem(last=False)
+
+    def _pop(self, key):
+        span = self._open.pop(key, None)
+        if span is not None:
+            span["duration_s"] = time.perf_counter() - span.pop("_started")
+        return span
+
+    def _export(self, span):
+        if not self.jsonl_path:
+            return
+        line = json.dumps(span, default=str)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.jsonl_path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ----- reporting -----
+
+    def summary(self):
+        """Per-agent calls, tokens and latency percentiles (seconds)."""
+        with self._lock:
+            return {
+                agent: {
+                    "calls": calls,
+                    "input_tokens": self.tokens[(agent, "input")],
+                    "cached_tokens": self.tokens[(agent, "cached")],
+                    "output_tokens": self.tokens[(agent, "output")],
+                    "latency_p50_s": self.model_latency[agent].percentile(50),
+                    "latency_p95_s": self.model_latency[agent].percentile(95),
+                    "ttft_p50_s": self.model_ttft[agent].percentile(50),
+                }
+                for agent, calls in sorted(self.model_calls.items())
+            }
+
+    def render_prometheus(self):
+        """Metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+
+        def sample(name, labels, value):
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{METRIC_PREFIX}_{name}{{{label_text}}} {value}")
+
+        def histogram(name, help_text, histograms, label):
+            header(name, "histogram", help_text)
+            for key, hist in sorted(histograms.items()):
+                for bound, count in zip(hist.buckets, hist.counts):
+                    sample(f"{name}_bucket", {label: key, "le": bound}, count)
+                sample(f"{name}_bucket", {label: key, "le": "+Inf"}, hist.count)
+                sample(f"{name}_sum", {label: key}, round(hist.sum, 6))
+                sample(f"{name}_count", {label: key}, hist.count)
+
+        with self._lock:
+            header("model_calls_total", "counter", "Model calls per agent.")
+            for agent, calls in sorted(self.model_calls.items()):
+                sample("model_calls_total", {"agent": agent}, calls)
+            header("model_tokens_total", "counter", "Model tokens per agent and kind.")
+            for (agent, kind), tokens in sorted(self.tokens.items()):
+                sample("model_tokens_total", {"agent": agent, "kind": kind}, tokens)
+            histogram("model_latency_seconds", "Model call wall time per agent.",
+                      self.model_latency, "agent")
+            histogram("model_ttft_seconds", "Model time to first token per agent.",
+                      self.model_ttft, "agent")
+            header("tool_calls_total", "counter", "Tool calls per agent, tool and status.")
+            for (agent, tool, status), calls in sorted(self.tool_calls.items()):
+                sample("tool_calls_total", {"agent": agent, "tool": tool, "status": status},
+                       calls)
+            histogram("tool_latency_seconds", "Tool call wall time per tool.",
+                      self.tool_latency, "tool")
+            histogram("turn_ttft_seconds", "Time until a client saw the first reply text.",
+                      self.turn_ttft, "mode")
+            histogram("turn_latency_seconds", "Whole user turn wall time.",
+                      self.turn_latency, "mode")
+        return "\n".join(lines) + "\n" + "".join(render() for render in self.collectors)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def serve_metrics(telemetry, port, host="0.0.0.0"):
+    """Serve telemetry.render_prometheus() at /metrics from a daemon thread."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = telemetry.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="telemetry-metrics",
+                     daemon=True).start()
+    logger.info("Serving Prometheus metrics on %s:%s/metrics", host, server.server_port)
+    return server
+
+
+_UNSET = object()
+_default_telemetry = _UNSET
+
+
+def default_telemetry():
+    """Shared Telemetry, or None when TELEMETRY_ENABLED is not true."""
+    global _default_telemetry
+    if _default_telemetry is _UNSET:
+        telemetry = None
+        if os.getenv("TELEMETRY_ENABLED", "false").lower() == "true":
+            telemetry = Telemetry.from_env()
+            port = int(os.getenv("TELEMETRY_METRICS_PORT", "0"))
+            if port:
+                serve_metrics(telemetry, port)
+        _default_telemetry = telemetry
+    return _default_telemetry
+
+
+# ===== ADK CALLBACKS =====
+
+def _model_key(callback_context):
+    return (callback_context.invocation_id, callback_context.agent_name)
+
+
+def _tool_key(tool_context):
+    return (tool_context.invocation_id, tool_context.function_call_id)
+
+
+def telemetry_before_model(callback_context, llm_request):
+    """before_model_callback: opens the model span (keep it last)."""
+    telemetry = default_telemetry()
+    if telemetry is not None:
+        telemetry.start_model(_model_key(callback_context), callback_context.agent_name,
+                              llm_request.model)
+    return None
+
+
+def telemetry_after_model(callback_context, llm_response):
+    """after_model_callback: first-token time, then tokens on the final response."""
+    telemetry = default_telemetry()
+    if telemetry is None:
+        return None
+    key = _model_key(callback_context)
+    telemetry.model_chunk(key, partial=bool(llm_response.partial))
+    if not llm_response.partial:
+        telemetry.end_model(key, llm_response.usage_metadata)
+    return None
+
+
+def telemetry_before_tool(tool, args, tool_context):
+    telemetry = default_telemetry()
+    if telemetry is not None:
+        telemetry.start_tool(_tool_key(tool_context), tool_context.agent_name, tool.name)
+    return None
+
+
+def telemetry_after_tool(tool, args, tool_context, tool_response):
+    telemetry = default_telemetry()
+    if telemetry is not None:
+        failed = isinstance(tool_response, dict) and bool(
+            tool_response.get("error") or tool_response.get("failed_queries"))
+        telemetry.end_tool(_tool_key(tool_context), "error" if failed else "ok")
+    return None
+
+
+__all__ = [
+    'Histogram',
+    'Telemetry',
+    'default_telemetry',
+    'serve_metrics',
+    'telemetry_after_model',
+    'telemetry_after_tool',
+    'telemetry_before_model',
+    'telemetry_before_tool',
+]
@@ -0,0 +1,33 @@
+# Architecture Assistant - Text Utilities
+#
+# Small, dependency-free helpers for tokenizing and normalizing text
+
+import re
+import unicodedata
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:[.+#][a-z0-9]+)*")
+_APOSTROPHE_RE = re.compile(r"['\u2019](?:s\b)?")
+
+# Words that carry no meaning for matching research queries
+STOPWORDS = frozenset("""
+a an and are as at be by can could do does for from how i in is it its me my
+of on or our please should so that the their them there these this to we what
+when where which who why will with would you your
+""".split())
+
+
+def normalize_text(text):
+    """Lowercase and NFKC-normalize text, collapsing whitespace."""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return " ".join(text.split())
+
+
+def tokenize(text, drop_stopwords=False):
+    """Split text into lowercase word tokens."""
+    tokens = _WORD_RE.findall(_APOSTROPHE_RE.sub("", normalize_text(text)))
+    if drop_stopwords:
+        tokens = [t for t in tokens if t not in STOPWORDS]
+    return tokens
+
+
+__all__ = ['STOPWORDS', 'normalize_text', 'tokenize']
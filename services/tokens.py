@@ -0,0 +1,30 @@
+# Architecture Assistant - Token Estimation
+#
+# Cheap, offline token estimates used for budgets and savings reports.
+# Gemini averages roughly four characters per token for English prose.
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text):
+    """Approximate token count of a string (0 for empty/None)."""
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def estimate_content_tokens(contents):
+    """Approximate token count of a list of google.genai Content objects."""
+    total = 0
+    for content in contents or []:
+        for part in content.parts or []:
+            if part.text:
+                total += estimate_tokens(part.text)
+            elif part.function_call:
+                total += estimate_tokens(str(part.function_call.args)) + 8
+            elif part.function_response:
+                total += estimate_tokens(str(part.function_response.response)) + 8
+    return total
+
+
+__all__ = ['CHARS_PER_TOKEN', 'estimate_tokens', 'estimate_content_tokens']
@@ -0,0 +1 @@
+# Architecture Assistant - Tests
@@ -0,0 +1,38 @@
+# Architecture Assistant - Explanation Cache Matching Tests
+#
+# Questions that should get a stored trade-off explanation, and questions
+# that only mention one side of a trade-off and must reach the model.
+#
+#   python -m pytest tests
+
+import pytest
+
+from ..agents.education import EXPLANATIONS_DIR
+from ..services.explanation_cache import ExplanationCache
+
+CACHE = ExplanationCache(EXPLANATIONS_DIR)
+
+
+@pytest.mark.parametrize("message, key", [
+    ("Should we go with microservices or keep it as one app?", "monolith_vs_microservices"),
+    ("Do we need SQL or NoSQL for our data?", "sql_vs_nosql"),
+    ("Should we host in the cloud or on our own servers?", "cloud_vs_on_premise"),
+    ("Is agile or waterfall better for a fixed budget?", "agile_vs_waterfall"),
+    ("Microservices or something simpler?", "monolith_vs_microservices"),
+    ("What are the alternatives to Postgres?", "sql_vs_nosql"),
+    ("Compare Postgres with the other options", "sql_vs_nosql"),
+])
+def test_comparisons_match(message, key):
+    explanation = CACHE.match(message)
+    assert explanation is not None and explanation.key == key
+
+
+@pytest.mark.parametrize("message", [
+    "Should I worry about SQL injection?",
+    "How do I protect against SQL injection or XSS?",
+    "Is Postgres or MySQL faster for reads?",
+    "Should we use microservices?",
+    "Can the cloud bill grow over time?",
+])
+def test_other_questions_miss(message):
+    assert CACHE.match(message) is None
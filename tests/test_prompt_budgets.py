@@ -0,0 +1,26 @@
+# Architecture Assistant - Prompt Token Budget Tests
+#
+# Every LLM agent's instruction is sent with every model call, so each agent
+# has a token budget in agents/prompts.py. These tests keep the compiled
+# instructions within them; raise a budget deliberately, not by accident.
+#
+#   python -m pytest tests
+
+import pytest
+
+from ..benchmarks.prompt_tokens import instructions, prompt_report
+from ..services.tokens import estimate_tokens
+
+REPORT = prompt_report(estimate_tokens)
+
+
+@pytest.mark.parametrize("agent_name", sorted(instructions()))
+def test_instruction_has_budget(agent_name):
+    assert REPORT[agent_name]["budget"] is not None, f"{agent_name} has no token budget"
+
+
+@pytest.mark.parametrize("agent_name", sorted(instructions()))
+def test_instruction_within_budget(agent_name):
+    r = REPORT[agent_name]
+    assert r["tokens"] <= r["budget"], (
+        f"{agent_name} instruction is {r['tokens']} tokens, over its budget of {r['budget']}")